@@ -4,10 +4,18 @@ import time
 from datetime import datetime, timedelta
 import json
 import os
+import multiprocessing
 import threading
 import logging
 import sys
 
+from tnl_control import Control
+from tnl_driver import PyAutoGUIDriver
+from tnl_logging import load_options, setup_logging
+from tnl_macro import MacroCore
+from tnl_probe import lazy_import, probe
+from tnl_ui import LOG_LINES, BoundedLog, UIChannel
+
 # GUI/automation libraries that require a display will be imported lazily
 # to avoid import-time failures on headless hosts (e.g., Streamlit Cloud).
 tk = None
@@ -15,7 +23,7 @@ ttk = None
 simpledialog = None
 messagebox = None
 filedialog = None
-Calendar = None
+tkcalendar = None
 Image = None
 ImageTk = None
 pyautogui = None
@@ -24,99 +32,90 @@ keyboard = None
 # Helper flag: True when GUI automation is available
 AUTOMATION_AVAILABLE = False
 
-# 로깅 설정
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('tnlcopy.log', encoding='utf-8'),
-        logging.StreamHandler()
-    ]
-)
+CONFIG_PATH = os.path.join(os.path.expanduser("~"), "Desktop", "tnlcopy_config.json")
+
+
+def _configure_pyautogui(module):
+    # pyautogui 를 처음 쓸 때(import 직후) 한 번 적용
+    module.FAILSAFE = True
+    module.PAUSE = 0.5
 
-class TNLMacro:
-    def __init__(self):
-        self.config_path = os.path.join(os.path.expanduser("~"), "Desktop", "tnlcopy_config.json")
+
+class TNLMacro(MacroCore):
+    def __init__(self, driver=None, config_path=CONFIG_PATH, ledger_path=None):
+        # 설정 파일과 완료 기록 원장 (모의 화면 등에서는 임시 경로를 넘긴다)
+        self.config_path = config_path
+        self.ledger_path = ledger_path or os.path.join(os.path.dirname(self.config_path),
+                                                       "tnlcopy_ledger.sqlite3")
         self.coords = {}
         self.is_running = False
         self.is_paused = False
+        self.control = Control()
         self.current_date_index = 0
         self.total_dates = 0
         self.dates = []
         self.ref_date = ""
+        # 나머지 설정 항목 기본값 (tnl_macro.CONFIG_KEYS)
+        self.apply_config({})
+        self.employee_var = None
+        self.skip_done = True
+        self.calibration_key = None
         # Try to initialize optional libraries (lazy, safe)
         self._init_optional_libs()
 
+        # 입력 드라이버 (기본: 실제 데스크톱, 자동화 불가 시 None)
+        if driver is None and pyautogui is not None:
+            driver = PyAutoGUIDriver(pyautogui)
+        self.driver = driver
+
         # If Tkinter wasn't loaded (e.g., running on Streamlit/cloud), skip GUI setup
         if tk is not None:
-            # PyAutoGUI 설정 if available
-            if pyautogui is not None:
-                try:
-                    pyautogui.FAILSAFE = True
-                    pyautogui.PAUSE = 0.5
-                except Exception:
-                    # ignore pyautogui configuration errors at init
-                    pass
-
             self.setup_gui()
         else:
             # Running in headless mode (Streamlit). Create minimal placeholders
             logging.info("Running in headless mode: GUI setup skipped")
 
     def _init_optional_libs(self):
-        """Try to import optional GUI and automation libraries safely.
-        Sets module-level globals when imports succeed. This avoids
+        """Set up the optional GUI and automation libraries safely.
+
+        Uses the cached capability probe instead of trial imports. Only
+        tkinter is needed for the window right away; tkcalendar, PIL,
+        pyautogui and keyboard (hotkeys are bound when the first run
+        starts) are bound as lazy modules that are imported on first use. This keeps construction cheap and avoids
         import-time failures on headless hosts (like Streamlit Cloud).
         """
         global tk, ttk, simpledialog, messagebox, filedialog
-        global Calendar, Image, ImageTk, pyautogui, keyboard, AUTOMATION_AVAILABLE
+        global tkcalendar, Image, ImageTk, pyautogui, keyboard, AUTOMATION_AVAILABLE
 
-        # Try tkinter (may fail on headless linux)
-        try:
-            import tkinter as _tk
-            from tkinter import ttk as _ttk, simpledialog as _sd, messagebox as _mb, filedialog as _fd
-            tk = _tk
-            ttk = _ttk
-            simpledialog = _sd
-            messagebox = _mb
-            filedialog = _fd
-        except Exception:
-            tk = None
-            ttk = None
-            simpledialog = None
-            messagebox = None
-            filedialog = None
+        caps = probe()
 
-        # tkcalendar (optional)
-        try:
-            from tkcalendar import Calendar as _Calendar
-            Calendar = _Calendar
-        except Exception:
-            Calendar = None
+        # tkinter (may fail on headless linux)
+        tk = ttk = simpledialog = messagebox = filedialog = None
+        if caps.gui:
+            try:
+                import tkinter as _tk
+                from tkinter import ttk as _ttk, simpledialog as _sd, messagebox as _mb, filedialog as _fd
+                tk = _tk
+                ttk = _ttk
+                simpledialog = _sd
+                messagebox = _mb
+                filedialog = _fd
+            except Exception:
+                tk = None
 
-        # PIL (optional)
-        try:
-            from PIL import Image as _Image, ImageTk as _ImageTk
-            Image = _Image
-            ImageTk = _ImageTk
-        except Exception:
-            Image = None
-            ImageTk = None
+        # tkcalendar, PIL (optional, loaded when a dialog first needs them)
+        tkcalendar = lazy_import("tkcalendar") if tk is not None else None
+        Image = lazy_import("PIL.Image")
+        ImageTk = lazy_import("PIL.ImageTk") if tk is not None else None
 
-        # GUI automation libs: only attempt when display is likely available
+        # GUI automation libs: only when a display is available
         AUTOMATION_AVAILABLE = False
-        try:
-            should_try = (os.name == 'nt') or ('DISPLAY' in os.environ)
-            if should_try:
-                import pyautogui as _pyautogui
-                import keyboard as _keyboard
-                pyautogui = _pyautogui
-                keyboard = _keyboard
-                AUTOMATION_AVAILABLE = True
-        except Exception:
-            pyautogui = None
-            keyboard = None
-            AUTOMATION_AVAILABLE = False
+        pyautogui = None
+        keyboard = None
+        if caps.automation:
+            keyboard = lazy_import("keyboard")
+            pyautogui = lazy_import("pyautogui", on_load=_configure_pyautogui)
+            AUTOMATION_AVAILABLE = True
     
     def setup_gui(self):
         self.root = tk.Tk()
@@ -151,12 +150,14 @@ class TNLMacro:
         main_frame.columnconfigure(1, weight=1)
         main_frame.rowconfigure(4, weight=1)
         
+        # 작업 스레드의 화면 갱신은 채널을 거쳐 메인 루프에서 한꺼번에 반영
+        self.ui = UIChannel(self.root, BoundedLog(self.log_text, LOG_LINES)).start()
+        
         # 초기 설정 로드
         self.load_config()
         
-        # ESC 키 감지 스레드
-        self.esc_thread = threading.Thread(target=self.monitor_esc_key, daemon=True)
-        self.esc_thread.start()
+        # 전역 단축키는 처음 작업을 시작할 때 등록 (ensure_hotkeys)
+        self.unbind_hotkeys = None
     
     def create_settings_section(self, parent):
         # 설정 프레임
@@ -166,16 +167,18 @@ class TNLMacro:
         # 좌표 설정 버튼
         ttk.Button(settings_frame, text="좌표 설정", 
                   command=self.set_coords_gui).grid(row=0, column=0, padx=(0, 10))
+        ttk.Button(settings_frame, text="자동 보정", 
+                  command=self.auto_calibrate_gui).grid(row=0, column=1, padx=(0, 10))
         
         # 설정 저장/불러오기
         ttk.Button(settings_frame, text="설정 저장", 
-                  command=self.save_config).grid(row=0, column=1, padx=(0, 10))
+                  command=self.save_config).grid(row=0, column=2, padx=(0, 10))
         ttk.Button(settings_frame, text="설정 불러오기", 
-                  command=self.load_config).grid(row=0, column=2)
+                  command=self.load_config).grid(row=0, column=3)
         
         # 날짜 설정
         date_frame = ttk.Frame(settings_frame)
-        date_frame.grid(row=1, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=(10, 0))
+        date_frame.grid(row=1, column=0, columnspan=4, sticky=(tk.W, tk.E), pady=(10, 0))
         
         ttk.Label(date_frame, text="작업 날짜:").grid(row=0, column=0, sticky=tk.W)
         self.date_label = ttk.Label(date_frame, text="선택되지 않음", foreground="red")
@@ -188,6 +191,8 @@ class TNLMacro:
         self.ref_date_label.grid(row=1, column=1, sticky=tk.W, padx=(10, 0), pady=(5, 0))
         ttk.Button(date_frame, text="기준일자 선택", 
                   command=self.select_ref_date).grid(row=1, column=2, padx=(10, 0), pady=(5, 0))
+        
+        self.create_employee_row(date_frame, 2)
     
     def create_progress_section(self, parent):
         # 진행률 프레임
@@ -256,8 +261,8 @@ class TNLMacro:
         timestamp = datetime.now().strftime("%H:%M:%S")
         log_entry = f"[{timestamp}] {message}\n"
         
-        self.log_text.insert(tk.END, log_entry)
-        self.log_text.see(tk.END)
+        # 화면에는 최근 로그만, 전체 기록은 tnlcopy.log 에
+        self.ui.log(log_entry)
         
         if level == "ERROR":
             logging.error(message)
@@ -293,6 +298,7 @@ class TNLMacro:
             if not self.get_coordinate(label):
                 break
         else:
+            self.save_calibration()
             messagebox.showinfo("완료", "모든 좌표가 설정되었습니다.")
             self.save_config()
             return
@@ -370,7 +376,7 @@ class TNLMacro:
         ttk.Label(frame, text="작업할 날짜를 선택하세요", 
                  font=("맑은 고딕", 12, "bold")).pack(pady=(0, 10))
         
-        cal = Calendar(frame, selectmode='day', date_pattern='yyyy-mm-dd', 
+        cal = tkcalendar.Calendar(frame, selectmode='day', date_pattern='yyyy-mm-dd', 
                       font=("맑은 고딕", 12))
         cal.pack(pady=(0, 10))
         
@@ -423,7 +429,7 @@ class TNLMacro:
         ttk.Label(frame, text="복사 기준일자를 선택하세요", 
                  font=("맑은 고딕", 12, "bold")).pack(pady=(0, 10))
         
-        cal = Calendar(frame, selectmode='day', date_pattern='yyyy-mm-dd', 
+        cal = tkcalendar.Calendar(frame, selectmode='day', date_pattern='yyyy-mm-dd', 
                       font=("맑은 고딕", 12))
         cal.pack(pady=(0, 20))
         
@@ -436,11 +442,7 @@ class TNLMacro:
         ttk.Button(frame, text="선택", command=done, style="Accent.TButton").pack()
     
     def save_config(self):
-        config = {
-            'coords': self.coords,
-            'last_ref_date': self.ref_date,
-            'last_dates': self.dates
-        }
+        config = self.config_dict()
         
         try:
             with open(self.config_path, "w", encoding="utf-8") as f:
@@ -455,9 +457,7 @@ class TNLMacro:
                 with open(self.config_path, "r", encoding="utf-8") as f:
                     config = json.load(f)
                 
-                self.coords = config.get('coords', {})
-                self.ref_date = config.get('last_ref_date', '')
-                self.dates = config.get('last_dates', [])
+                self.apply_config(config)
                 
                 if self.ref_date:
                     self.ref_date_label.config(text=self.ref_date, foreground="green")
@@ -466,6 +466,9 @@ class TNLMacro:
                     self.total_dates = len(self.dates)
                 
                 self.log_message("설정을 불러왔습니다.")
+                
+                # 현재 화면 배치에 맞는 보정 좌표 선택
+                self.apply_calibration()
             else:
                 self.log_message("저장된 설정이 없습니다.")
         except Exception as e:
@@ -474,9 +477,11 @@ class TNLMacro:
     def start_work(self):
         if not self.validate_settings():
             return
+        self.ensure_hotkeys(keyboard)
         
         self.is_running = True
         self.is_paused = False
+        self.control.start()
         self.current_date_index = 0
         
         self.start_button.config(state="disabled")
@@ -493,27 +498,41 @@ class TNLMacro:
     def pause_work(self):
         if self.is_paused:
             self.is_paused = False
-            self.pause_button.config(text="일시정지")
-            self.status_label.config(text="작업 중...", foreground="blue")
+            self.control.resume()
+            self.ui.post(self.pause_button.config, text="일시정지", key="pause_button")
+            self.ui.post(self.status_label.config, text="작업 중...", foreground="blue",
+                         key="status")
             self.log_message("작업을 재개합니다.")
         else:
             self.is_paused = True
-            self.pause_button.config(text="재개")
-            self.status_label.config(text="일시정지", foreground="orange")
+            self.control.pause()
+            self.ui.post(self.pause_button.config, text="재개", key="pause_button")
+            self.ui.post(self.status_label.config, text="일시정지", foreground="orange",
+                         key="status")
             self.log_message("작업을 일시정지합니다.")
     
     def stop_work(self):
         self.is_running = False
         self.is_paused = False
+        self.control.abort()
         
-        self.start_button.config(state="normal")
-        self.pause_button.config(state="disabled")
-        self.stop_button.config(state="disabled")
-        self.status_label.config(text="중지됨", foreground="red")
+        # 작업 스레드/단축키 스레드에서도 불리므로 채널을 거친다
+        self.ui.post(self.start_button.config, state="normal", key="start_button")
+        self.ui.post(self.pause_button.config, state="disabled", key="pause_button")
+        self.ui.post(self.stop_button.config, state="disabled", key="stop_button")
+        self.ui.post(self.status_label.config, text="중지됨", foreground="red", key="status")
         
         self.log_message("작업이 중지되었습니다.")
     
     def validate_settings(self):
+        # 도킹/해제 등으로 화면 배치가 바뀌었으면 그 배치의 보정 좌표로 바꾼다
+        # (제목줄 이미지 기준점은 작업 스레드에서 찾으므로 그때 다시 고른다)
+        if (not self.apply_calibration() and self.calibration.get("profiles")
+                and not self.calibration.get("anchor")):
+            if not messagebox.askyesno("보정 필요", "현재 화면 배치에 맞는 보정 좌표가 없습니다.\n"
+                                                "마지막으로 쓴 좌표로 계속할까요?"):
+                return False
+        
         if not self.coords:
             messagebox.showerror("오류", "좌표가 설정되지 않았습니다. 좌표를 먼저 설정하세요.")
             return False
@@ -526,101 +545,7 @@ class TNLMacro:
             messagebox.showerror("오류", "복사 기준일자가 선택되지 않았습니다.")
             return False
         
-        return True
-    
-    def work_process(self):
-        try:
-            # 복사 기준일자 입력 (한 번만)
-            self.log_message("복사 기준일자를 입력합니다...")
-            self.current_work_label.config(text="복사 기준일자 입력 중...")
-            
-            pyautogui.click(*self.coords["복사 기준일자 입력란"])
-            time.sleep(1)
-            pyautogui.hotkey('ctrl', 'a')
-            time.sleep(0.5)
-            pyautogui.press('delete')
-            time.sleep(0.5)
-            for char in self.ref_date:
-                pyautogui.press(char)
-                time.sleep(0.1)
-            time.sleep(1)
-            
-            # 날짜별 반복 작업
-            for i, date in enumerate(self.dates):
-                if not self.is_running:
-                    break
-                
-                while self.is_paused:
-                    time.sleep(0.1)
-                    if not self.is_running:
-                        break
-                
-                self.current_date_index = i
-                progress = ((i + 1) / len(self.dates)) * 100
-                self.progress_var.set(progress)
-                self.progress_text.config(text=f"{i + 1} / {len(self.dates)} ({progress:.1f}%)")
-                self.current_work_label.config(text=f"처리 중: {date}")
-                
-                self.log_message(f"날짜 {date} 처리 시작 ({i + 1}/{len(self.dates)})")
-                
-                # 날짜 입력
-                pyautogui.click(*self.coords["일자 입력란"])
-                time.sleep(1)
-                pyautogui.hotkey('ctrl', 'a')
-                time.sleep(0.5)
-                pyautogui.press('delete')
-                time.sleep(0.5)
-                for char in date:
-                    pyautogui.press(char)
-                    time.sleep(0.1)
-                time.sleep(1)
-                
-                # 조회
-                pyautogui.click(*self.coords["조회 버튼"])
-                time.sleep(2)
-                
-                # 사원 선택
-                pyautogui.click(*self.coords["사원 선택란"])
-                time.sleep(1)
-                
-                # 이전실적복사
-                pyautogui.click(*self.coords["이전실적복사 버튼"])
-                time.sleep(1)
-                
-                # 팝업 처리
-                pyautogui.press('enter')
-                time.sleep(1)
-                
-                # 복사
-                pyautogui.click(*self.coords["복사 버튼"])
-                time.sleep(1)
-                pyautogui.press('enter')
-                time.sleep(1)
-                
-                self.log_message(f"날짜 {date} 처리 완료")
-            
-            if self.is_running:
-                self.progress_var.set(100)
-                self.progress_text.config(text=f"완료! ({len(self.dates)}개 처리)")
-                self.current_work_label.config(text="작업 완료")
-                self.status_label.config(text="완료", foreground="green")
-                self.log_message("모든 작업이 완료되었습니다.")
-                
-                messagebox.showinfo("완료", "모든 작업이 완료되었습니다.")
-        
-        except Exception as e:
-            self.log_message(f"작업 중 오류 발생: {e}", "ERROR")
-            messagebox.showerror("오류", f"작업 중 오류가 발생했습니다:\n{e}")
-        finally:
-            self.stop_work()
-    
-    def monitor_esc_key(self):
-        while True:
-            if keyboard.is_pressed('esc') and self.is_running:
-                self.log_message("ESC 키가 감지되어 작업을 중단합니다.")
-                self.stop_work()
-                break
-            time.sleep(0.1)
+        return self.confirm_skip_done()
     
     def run(self):
         if tk is not None and hasattr(self, 'root'):
@@ -629,5 +554,9 @@ class TNLMacro:
             logging.info("TNLMacro.run() called in headless mode; GUI loop not started.")
 
 if __name__ == "__main__":
-    app = TNLMacro()
-    app.run()
\ No newline at end of file
+    # 자동 보정의 프로세스 풀 (PyInstaller 실행 파일에서도 동작하도록)
+    multiprocessing.freeze_support()
+    # 로그 파이프라인은 앱 시작 시에만 설정 (import 시 부작용 없음)
+    with setup_logging(**load_options(CONFIG_PATH)):
+        app = TNLMacro()
+        app.run()
\ No newline at end of file
@@ -0,0 +1,597 @@
+"""로컬 자동화 에이전트 (HTTP 작업 API + 직렬 작업 큐).
+
+데스크톱에서 상주하며 HTTP 로 작업(날짜 목록, 기준일자, 타이밍 프로필)을
+받아 큐에 넣고 한 번에 하나씩 실행한다. Tk GUI 없이 CopyRunner 엔진과
+설정 파일(tnlcopy_config.json)의 좌표/대기 설정을 그대로 쓴다.
+
+    python tnl_agent.py [--port 8765] [--token SECRET]
+    python tnl_agent.py --simulate         # 모의 ERP 화면 (Linux 는 xvfb-run -a)
+
+API (JSON):
+
+    POST /jobs                  {"dates": [...], "ref_date": "...", "profile": "...",
+                                 "employees": [...]}   # employees 는 선택 (tnl_batch 형식)
+    GET  /jobs                  작업 목록 (요약)
+    GET  /jobs/<id>?since=N&wait=S
+                                작업 상태와 N 번 이후 로그. wait 초 동안 새 로그나
+                                상태 변화를 기다렸다가 응답 (롱 폴링)
+    POST /jobs/<id>/cancel      대기 중이면 취소, 실행 중이면 다음 입력 전에 중단
+    GET  /health
+
+dates 와 ref_date 는 YYYY-MM-DD 문자열이어야 하고 employees 는 tnl_batch.Employee
+형식이어야 한다. 형식이 틀린 작업은 큐에 넣지 않고 400 으로 거절한다.
+
+데스크톱에서 실행하면 중단 단축키(설정의 hotkeys.abort, 기본 ESC)로 실행 중인
+작업을 취소할 수 있다 (복구가 보낸 escape 는 무시).
+
+--token 을 주면 모든 요청에 X-Agent-Token 헤더가 필요하다. 기본은 127.0.0.1 에만
+바인딩하고, 다른 주소(0.0.0.0 등)에 바인딩하려면 토큰이 필요하다. 끝난 작업은
+최근 MAX_FINISHED 개만 보관한다.
+"""
+
+import argparse
+import ipaddress
+import itertools
+import json
+import logging
+import os
+import re
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from tnl_calibration import run_coords
+from tnl_capture import CaptureService
+from tnl_control import DEFAULT_HOTKEYS, Aborted, Control, ControlledDriver, bind_hotkeys
+from tnl_engine import CopyRunner, StepFailed
+from tnl_ledger import Ledger
+from tnl_logging import load_options, setup_logging
+from tnl_recovery import create_recovery
+from tnl_trace import Tracer
+from tnl_wait import resolve_timing
+
+CONFIG_PATH = os.path.join(os.path.expanduser("~"), "Desktop", "tnlcopy_config.json")
+DEFAULT_PORT = 8765
+
+# 작업별로 보관하는 로그 줄 수와 롱 폴링 최대 대기 (초)
+MAX_JOB_LOG = 500
+MAX_WAIT = 30.0
+# 보관하는 끝난 작업 수 (오래된 것부터 지운다)
+MAX_FINISHED = 200
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+FINISHED = (DONE, FAILED, CANCELLED)
+
+DATE_PATTERN = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+
+def _check_date(value, field):
+    if not isinstance(value, str) or not DATE_PATTERN.fullmatch(value):
+        raise ValueError(f"{field} must be a YYYY-MM-DD string: {value!r}")
+    try:
+        datetime.strptime(value, "%Y-%m-%d")
+    except ValueError:
+        raise ValueError(f"{field} is not a valid date: {value!r}") from None
+
+
+def parse_job(body):
+    """(dates, ref_date, profile, employees) of a POST /jobs body; ValueError if malformed."""
+    from tnl_batch import Employee
+
+    dates, ref_date = body.get("dates"), body.get("ref_date")
+    if not dates or not isinstance(dates, list) or not ref_date:
+        raise ValueError("dates (list) and ref_date are required")
+    for date in dates:
+        _check_date(date, "dates")
+    _check_date(ref_date, "ref_date")
+    profile = body.get("profile")
+    if profile is not None and not isinstance(profile, str):
+        raise ValueError("profile must be a string")
+    employees = body.get("employees")
+    if employees is not None:
+        if not isinstance(employees, list):
+            raise ValueError("employees must be a list")
+        for employee in employees:
+            Employee.from_dict(employee)
+    return dates, ref_date, profile, employees or None
+
+
+class Job:
+    """One submitted copy job and its status."""
+
+    def __init__(self, job_id, dates, ref_date, profile=None, employees=None):
+        self.id = job_id
+        self.dates = list(dates)
+        self.ref_date = ref_date
+        self.profile = profile
+        self.employees = employees
+        self.state = QUEUED
+        self.error = None
+        self.done = []      # 완료한 [사원, 날짜]
+        self.failed = []    # 단계 확인에 실패한 [사원, 날짜]
+        self.skipped = 0
+        self.log = []
+        self.seq = 0
+        self.created = datetime.now().isoformat(timespec="seconds")
+        self.started = None
+        self.finished = None
+        self.cancel = threading.Event()
+        self.control = Control()
+
+    def summary(self):
+        total = len(self.dates) * (len(self.employees) if self.employees else 1)
+        return {"id": self.id, "state": self.state, "ref_date": self.ref_date,
+                "profile": self.profile, "total": total, "done": len(self.done),
+                "failed": len(self.failed), "skipped": self.skipped, "error": self.error, "created": self.created,
+                "started": self.started, "finished": self.finished}
+
+    def status(self, since=0):
+        status = self.summary()
+        status["dates"] = self.dates
+        status["employees"] = self.employees
+        status["items"] = self.done
+        status["failed_items"] = self.failed
+        status["seq"] = self.seq
+        status["log"] = [entry for entry in self.log if entry["seq"] > since]
+        return status
+
+
+class JobQueue:
+    """Thread-safe job store with a single worker running jobs in order."""
+
+    def __init__(self, execute):
+        self.execute = execute
+        self.jobs = {}
+        self._order = []
+        self._ids = itertools.count(1)
+        self._changed = threading.Condition()
+        self._worker = threading.Thread(target=self._work, name="tnl-agent-worker", daemon=True)
+        self._stopping = False
+
+    def start(self):
+        self._worker.start()
+        return self
+
+    def stop(self):
+        with self._changed:
+            self._stopping = True
+            for job in self.jobs.values():
+                job.cancel.set()
+                job.control.abort()
+            self._changed.notify_all()
+
+    def submit(self, dates, ref_date, profile=None, employees=None):
+        with self._changed:
+            job = Job(str(next(self._ids)), dates, ref_date, profile, employees)
+            self.jobs[job.id] = job
+            self._order.append(job.id)
+            self._changed.notify_all()
+        return job
+
+    def cancel(self, job_id):
+        with self._changed:
+            job = self.jobs[job_id]
+            if job.state == QUEUED:
+                self._finish(job, CANCELLED)
+            elif job.state == RUNNING:
+                job.cancel.set()
+                job.control.abort()
+                self._log(job, "취소 요청: 진행 중인 단계를 중단합니다.", "WARNING")
+            return job
+
+    def running(self):
+        """The job being executed, or None."""
+        with self._changed:
+            return next((job for job in self.jobs.values() if job.state == RUNNING), None)
+
+    def log(self, job, message, level="INFO"):
+        with self._changed:
+            self._log(job, message, level)
+
+    def update(self, job, **fields):
+        with self._changed:
+            for key, value in fields.items():
+                setattr(job, key, value)
+            job.seq += 1
+            self._changed.notify_all()
+
+    def wait_status(self, job_id, since=0, timeout=0.0):
+        """Job status with log entries after ``since``, waiting up to ``timeout``."""
+        deadline = time.monotonic() + min(timeout, MAX_WAIT)
+        with self._changed:
+            job = self.jobs[job_id]
+            while job.seq <= since and job.state not in FINISHED:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._changed.wait(remaining)
+            return job.status(since)
+
+    def summaries(self):
+        with self._changed:
+            return [self.jobs[job_id].summary() for job_id in self._order]
+
+    def _log(self, job, message, level):
+        job.seq += 1
+        job.log.append({"seq": job.seq, "time": datetime.now().isoformat(timespec="seconds"),
+                        "level": level, "message": message})
+        del job.log[:-MAX_JOB_LOG]
+        self._changed.notify_all()
+
+    def _finish(self, job, state, error=None):
+        job.state = state
+        job.error = error
+        job.finished = datetime.now().isoformat(timespec="seconds")
+        job.seq += 1
+        self._prune()
+        self._changed.notify_all()
+
+    def _prune(self):
+        finished = [job_id for job_id in self._order if self.jobs[job_id].state in FINISHED]
+        for job_id in finished[:-MAX_FINISHED]:
+            del self.jobs[job_id]
+            self._order.remove(job_id)
+
+    def _next(self):
+        with self._changed:
+            while not self._stopping:
+                for job_id in self._order:
+                    job = self.jobs[job_id]
+                    if job.state == QUEUED:
+                        job.state = RUNNING
+                        job.started = datetime.now().isoformat(timespec="seconds")
+                        job.seq += 1
+                        self._changed.notify_all()
+                        return job
+                self._changed.wait()
+        return None
+
+    def _work(self):
+        while True:
+            job = self._next()
+            if job is None:
+                return
+            try:
+                self.execute(job, self)
+            except Exception as e:
+                with self._changed:
+                    self._log(job, f"작업 중 오류 발생: {e}", "ERROR")
+                    self._finish(job, FAILED, str(e))
+                continue
+            with self._changed:
+                self._finish(job, CANCELLED if job.cancel.is_set() else DONE)
+
+
+class JobExecutor:
+    """Runs a Job on the desktop with the macro's saved configuration."""
+
+    def __init__(self, driver, config_path=CONFIG_PATH, ledger_path=None, coords=None):
+        self.driver = driver
+        self.config_path = config_path
+        self.ledger_path = ledger_path or os.path.join(os.path.dirname(config_path),
+                                                       "tnlcopy_ledger.sqlite3")
+        self.coords = coords
+
+    def load_config(self):
+        if os.path.exists(self.config_path):
+            with open(self.config_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        return {}
+
+    def __call__(self, job, queue):
+        # 작업마다 설정을 다시 읽어 GUI 에서 바꾼 좌표/대기를 반영한다
+        config = self.load_config()
+        # 설정 파일의 좌표는 지금 화면 배치에 맞는 보정 프로필에서 고른다
+        if self.coords:
+            coords = self.coords
+        else:
+            # (ERP 창 기준 좌표는 작업마다 창 위치를 한 번 확인해 화면 좌표로 바꾼다)
+            coords, _, _ = run_coords(config.get("calibration") or {}, self.driver,
+                                      config.get("coords", {}))
+            coords = {k: tuple(v) for k, v in coords.items()}
+        if not coords:
+            raise RuntimeError("좌표가 설정되지 않았습니다. 매크로에서 좌표를 먼저 설정하세요.")
+        profiles = config.get("timing_profiles", {})
+        profile = job.profile or config.get("timing_profile", "")
+        if job.profile and job.profile not in profiles:
+            raise RuntimeError(f"타이밍 프로필 '{job.profile}' 이 없습니다.")
+        waits, pause = resolve_timing(config.get("waits"), profiles, profile)
+        if pause is not None:
+            self.driver.pause = pause
+
+        def log(message, level="INFO"):
+            logging.log(getattr(logging, level, logging.INFO), f"[job {job.id}] {message}")
+            queue.log(job, message, level)
+
+        tracer = Tracer()
+        ledger = Ledger(self.ledger_path)
+        try:
+            capture = CaptureService(self.driver.screenshot)
+            # 복구가 보낸 escape 를 중단 단축키가 구분하도록 작업의 중단 제어를 거친다
+            recovery = create_recovery(ControlledDriver(self.driver, job.control),
+                                       config.get("recovery"), capture.grab, log)
+            runner = CopyRunner(self.driver, coords, waits, config.get("wait_regions"),
+                                log=log, tracer=tracer, entry_modes=config.get("entry_modes"),
+                                workflow=config.get("workflow"), capture=capture,
+                                control=job.control, verify=True, recovery=recovery)
+            if job.employees:
+                self.run_batch(job, queue, runner, ledger, config, log)
+            else:
+                self.run_dates(job, queue, runner, ledger, config.get("employee", ""), log)
+        except Aborted:
+            pass
+        finally:
+            if job.cancel.is_set():
+                log("작업이 취소되었습니다.", "WARNING")
+            tracer.close()
+            ledger.close()
+
+    def run_dates(self, job, queue, runner, ledger, employee, log):
+        dates = ledger.pending(job.dates, job.ref_date, employee)
+        queue.update(job, skipped=len(job.dates) - len(dates))
+        if not dates:
+            log("모든 날짜가 이미 완료되어 있습니다.")
+            return
+        runner.setup(job.ref_date)
+        for date in dates:
+            if job.cancel.is_set():
+                break
+            try:
+                runner.process_date(date)
+            except StepFailed:
+                # 완료 기록을 남기지 않으므로 다음 작업에서 다시 처리된다
+                queue.update(job, failed=job.failed + [[employee, date]])
+                continue
+            ledger.mark_done(date, job.ref_date, employee)
+            queue.update(job, done=job.done + [[employee, date]])
+            log(f"날짜 {date} 처리 완료 ({len(job.done)}/{len(dates)})")
+        if job.failed:
+            log(f"확인에 실패한 날짜 {len(job.failed)}개: "
+                f"{', '.join(date for _, date in job.failed)}", "WARNING")
+
+    def run_batch(self, job, queue, runner, ledger, config, log):
+        from tnl_batch import ROW_HEIGHT, BatchRunner, Employee, plan_batch
+
+        employees = [Employee.from_dict(e) for e in job.employees]
+        done = ledger.done_items(job.ref_date)
+        groups = plan_batch(employees, job.dates, done)
+        remaining = sum(len(g.employees) for g in groups)
+        queue.update(job, skipped=len(employees) * len(job.dates) - remaining)
+
+        def progress(finished, total, eta, employee, date):
+            queue.update(job, done=job.done + [[employee.name, date]])
+
+        batch = BatchRunner(runner, job.ref_date,
+                            config.get("batch", {}).get("row_height", ROW_HEIGHT),
+                            ledger=ledger, log=log)
+        batch.run(groups, checkpoint=lambda: not job.cancel.is_set(), progress=progress)
+        if batch.failed:
+            queue.update(job, failed=[[employee.name, date] for employee, date in batch.failed])
+
+
+class StandInExecutor:
+    """Desktop-free executor that only sleeps per item (dispatcher tests).
+
+    ``fail_after`` makes every job fail after that many items, and
+    ``stall`` makes it hang instead of working, to exercise re-queueing.
+    """
+
+    def __init__(self, seconds_per_item=1.0, fail_after=None, stall=False):
+        self.seconds_per_item = seconds_per_item
+        self.fail_after = fail_after
+        self.stall = stall
+
+    def __call__(self, job, queue):
+        employees = [e if isinstance(e, str) else e["name"] for e in job.employees or [""]]
+        items = [[employee, date] for date in job.dates for employee in employees]
+        for i, item in enumerate(items):
+            if job.cancel.wait(self.seconds_per_item):
+                return
+            if self.stall:
+                job.cancel.wait()
+                return
+            if self.fail_after is not None and i >= self.fail_after:
+                raise RuntimeError("stand-in failure")
+            queue.update(job, done=job.done + [item])
+            queue.log(job, f"{item[0] or '-'} {item[1]} 처리 완료")
+
+
+class AgentHandler(BaseHTTPRequestHandler):
+    """JSON request handler; ``server.queue`` holds the JobQueue."""
+
+    server_version = "TNLAgent/1.0"
+
+    def log_message(self, format, *args):
+        logging.debug("agent %s - " + format, self.address_string(), *args)
+
+    def _send(self, status, body):
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _authorized(self):
+        token = self.server.token
+        if token and self.headers.get("X-Agent-Token") != token:
+            self._send(401, {"error": "unauthorized"})
+            return False
+        return True
+
+    def _read_json(self):
+        """Request body as a dict; ValueError when it is not a JSON object."""
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        body = json.loads(self.rfile.read(length).decode("utf-8"))
+        if not isinstance(body, dict):
+            raise ValueError("body is not a JSON object")
+        return body
+
+    def do_GET(self):
+        if not self._authorized():
+            return
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        queue = self.server.queue
+        if url.path == "/health":
+            self._send(200, {"status": "ok", "jobs": len(queue.jobs)})
+        elif url.path == "/jobs":
+            self._send(200, {"jobs": queue.summaries()})
+        elif re.fullmatch(r"/jobs/\w+", url.path):
+            job_id = url.path.rsplit("/", 1)[1]
+            if job_id not in queue.jobs:
+                self._send(404, {"error": "job not found"})
+                return
+            try:
+                since = int(query.get("since", ["0"])[0])
+                wait = float(query.get("wait", ["0"])[0])
+            except ValueError:
+                self._send(400, {"error": "since and wait must be numbers"})
+                return
+            try:
+                self._send(200, queue.wait_status(job_id, since, wait))
+            except KeyError:
+                # 기다리는 동안 오래된 작업으로 정리됨
+                self._send(404, {"error": "job not found"})
+        else:
+            self._send(404, {"error": "not found"})
+
+    def do_POST(self):
+        if not self._authorized():
+            return
+        url = urlparse(self.path)
+        queue = self.server.queue
+        if url.path == "/jobs":
+            try:
+                body = self._read_json()
+            except ValueError:
+                self._send(400, {"error": "invalid json"})
+                return
+            try:
+                dates, ref_date, profile, employees = parse_job(body)
+            except ValueError as e:
+                self._send(400, {"error": str(e)})
+                return
+            job = queue.submit(dates, ref_date, profile, employees)
+            self._send(201, job.summary())
+        elif re.fullmatch(r"/jobs/\w+/cancel", url.path):
+            job_id = url.path.split("/")[2]
+            try:
+                self._send(200, queue.cancel(job_id).summary())
+            except KeyError:
+                self._send(404, {"error": "job not found"})
+        else:
+            self._send(404, {"error": "not found"})
+
+
+def is_loopback(host):
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def create_server(queue, host="127.0.0.1", port=DEFAULT_PORT, token=None):
+    """HTTP server for ``queue``; a non-loopback ``host`` requires a token."""
+    if not token and not is_loopback(host):
+        # 토큰 없이 외부에 열면 누구나 이 데스크톱의 마우스/키보드를 움직일 수 있다
+        raise ValueError(f"{host} 에 바인딩하려면 토큰(--token)이 필요합니다.")
+    server = ThreadingHTTPServer((host, port), AgentHandler)
+    server.daemon_threads = True
+    server.queue = queue
+    server.token = token
+    return server
+
+
+def bind_abort_hotkey(queue, config_path):
+    """Cancel the running job on the abort hotkey; returns the unbind function."""
+    config = {}
+    if os.path.exists(config_path):
+        with open(config_path, "r", encoding="utf-8") as f:
+            config = json.load(f)
+    hotkeys = config.get("hotkeys") or {}
+    key = hotkeys.get("abort", DEFAULT_HOTKEYS["abort"])
+
+    def abort():
+        job = queue.running()
+        # 복구가 보낸 escape 는 그 이벤트만 삼킨다
+        if job is None or job.control.consume_injected(key):
+            return
+        logging.warning(f"{key.upper()} 키가 감지되어 작업 {job.id} 을 취소합니다.")
+        queue.cancel(job.id)
+
+    try:
+        import keyboard
+
+        return bind_hotkeys(keyboard, {"abort": key}, abort=abort)
+    except Exception as e:
+        logging.warning(f"중단 단축키를 등록하지 못했습니다 (POST /jobs/<id>/cancel 을 쓰세요): {e}")
+        return lambda: None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="T&L 자동화 에이전트 (HTTP 작업 API)")
+    parser.add_argument("--host", default="127.0.0.1", help="바인딩 주소")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="포트")
+    parser.add_argument("--token", default=os.environ.get("TNL_AGENT_TOKEN"),
+                        help="X-Agent-Token 헤더로 요구할 토큰")
+    parser.add_argument("--config", default=CONFIG_PATH, help="설정 파일 (tnlcopy_config.json)")
+    parser.add_argument("--simulate", action="store_true", help="모의 ERP 화면에서 실행")
+    parser.add_argument("--stand-in", type=float, metavar="SECONDS",
+                        help="데스크톱 없이 항목마다 SECONDS 초 대기하는 대역 에이전트")
+    args = parser.parse_args(argv)
+    if not args.token and not is_loopback(args.host):
+        parser.error(f"--host {args.host} 는 외부에서 접속할 수 있으므로 --token "
+                     "(또는 TNL_AGENT_TOKEN) 이 필요합니다.")
+
+    pipeline = setup_logging(**load_options(args.config))
+
+    screen = None
+    if args.stand_in is not None:
+        executor = StandInExecutor(args.stand_in)
+    elif args.simulate:
+        import tempfile
+
+        from tnl_fake_erp import FakeERPDriver, FakeTNLScreen
+
+        screen = FakeTNLScreen().start()
+        driver = FakeERPDriver(screen)
+        workdir = tempfile.mkdtemp(prefix="tnl_agent_")
+        executor = JobExecutor(driver, config_path=os.path.join(workdir, "config.json"),
+                               coords=screen.targets())
+    else:
+        import pyautogui
+
+        from tnl_driver import PyAutoGUIDriver
+
+        executor = JobExecutor(PyAutoGUIDriver(pyautogui), config_path=args.config)
+
+    queue = JobQueue(executor).start()
+    unbind_hotkeys = None
+    if args.stand_in is None and not args.simulate:
+        # 원격 데스크톱에서 돌 때도 키보드로 멈출 수 있도록
+        unbind_hotkeys = bind_abort_hotkey(queue, args.config)
+    server = create_server(queue, args.host, args.port, args.token)
+    print(f"에이전트가 http://{args.host}:{server.server_port} 에서 대기합니다.")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if unbind_hotkeys is not None:
+            unbind_hotkeys()
+        queue.stop()
+        if screen is not None:
+            screen.stop()
+        pipeline.stop()
+
+
+if __name__ == "__main__":
+    main()
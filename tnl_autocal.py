@@ -0,0 +1,282 @@
+"""한 번의 화면 캡처로 여섯 대상을 찾는 자동 좌표 보정.
+
+좌표 설정(set_coords_gui)은 대상마다 마우스를 올리고 3초를 기다려야 한다.
+자동 보정은 모든 모니터를 한 번 캡처한 뒤 참조 이미지(일자 입력란.png 등,
+tnl_locator 와 같은 템플릿)를 여러 배율로 맞춰 본다.
+
+    - (대상, 배율) 조합마다 프로세스 풀에서 병렬로 매칭
+      (캡처 화면은 작업 프로세스마다 한 번만 전달)
+    - 축소 프레임에서 후보 몇 개를 고르고 원본 해상도에서 점수 확정
+    - 대상별 후보를 점수순으로 정렬해 판정
+        ok        : 최고 점수가 채택 기준(0.85) 이상이고 2등과 충분히 차이남
+        ambiguous : 최고 점수가 채택 기준 미만이거나 2등 후보의 점수가 최고
+                    점수에 가까움 → 사용자에게 선택 요청
+        missing   : 후보 기준(0.7) 이상인 후보 없음 → 기존 방식(마우스 위치)으로 지정
+
+비슷한 모양이 많은 화면(대화상자 제목과 버튼 등)에서는 0.7 대 점수가 엉뚱한
+곳에 나오므로 채택 기준 미만은 자동으로 받아들이지 않는다.
+
+복사 버튼은 이전실적복사 팝업 안에만 있으므로 메인 화면 캡처에서는 찾을 수
+없다 (POPUP_TARGETS). 매크로는 메인 화면 대상을 보정한 뒤 팝업을 열게 하고
+다시 캡처해서 찾는다. 명령줄에서는 팝업을 열어 둔 화면을 캡처해야 찾는다.
+
+DPI 배율이 달라 화면의 버튼 크기가 참조 이미지와 다를 수 있으므로 기본
+배율은 0.75~1.5 를 본다.
+
+    python tnl_autocal.py                       # 현재 화면
+    python tnl_autocal.py --image screen.png    # 저장한 캡처로 시험
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from tnl_locator import (COARSE_RATIO, TARGET_LABELS, load_template, match_template,
+                         reference_image_path)
+from tnl_probe import lazy_import
+
+np = lazy_import("numpy")
+
+SCALES = (0.75, 0.9, 1.0, 1.1, 1.25, 1.5)
+COARSE_SCALE = 0.5
+# 후보로 남기는 최저 점수와 사용자 확인 없이 받아들이는 점수
+MIN_SCORE = 0.7
+ACCEPT_SCORE = 0.85
+# 2등 후보가 이 점수 차 안에 있으면 모호한 것으로 본다
+AMBIGUITY_MARGIN = 0.08
+# 이전실적복사 팝업을 열어야 보이는 대상 (메인 화면 캡처로는 보정할 수 없음)
+POPUP_TARGETS = ("복사 버튼",)
+# (대상, 배율) 작업당 축소 프레임에서 고르는 후보 수
+PEAKS = 3
+# 원본 해상도 확인 때 배율 사이를 메우는 미세 배율
+FINE_STEPS = (0.92, 0.96, 1.0, 1.04, 1.08)
+
+# 작업 프로세스마다 한 번 받아 두는 캡처 화면 (grayscale uint8) 과 축소본
+_frame = None
+_small = None
+
+
+class Candidate:
+    """A possible target position with its match score."""
+
+    def __init__(self, xy, score, scale):
+        self.xy = xy
+        self.score = score
+        self.scale = scale
+
+    def __repr__(self):
+        return f"Candidate({self.xy}, {self.score:.3f}, x{self.scale})"
+
+
+class TargetResult:
+    """Ranked candidates for one target and the resulting status."""
+
+    def __init__(self, label, candidates, min_score=MIN_SCORE, margin=AMBIGUITY_MARGIN,
+                 accept=ACCEPT_SCORE):
+        self.label = label
+        self.candidates = candidates
+        self.min_score = min_score
+        self.margin = margin
+        self.accept = accept
+        self.status = self._judge()
+
+    def _judge(self):
+        candidates = self.candidates
+        best = candidates[0].score if candidates else 0.0
+        if best < self.min_score:
+            return "missing"
+        if best < self.accept:
+            return "ambiguous"
+        if len(candidates) > 1 and candidates[1].score >= best - self.margin:
+            return "ambiguous"
+        return "ok"
+
+    def drop(self, xy, radius):
+        """Remove candidates near ``xy`` (claimed by another target)."""
+        self.candidates = [c for c in self.candidates if not _near(c.xy, xy, radius)]
+        self.status = self._judge()
+
+    @property
+    def xy(self):
+        return self.candidates[0].xy if self.status == "ok" else None
+
+
+def load_templates(specs=None, labels=TARGET_LABELS):
+    """Templates of ``labels`` (same specs as the locator config)."""
+    specs = specs or {}
+    templates = {}
+    for label in labels:
+        spec = specs.get(label, {})
+        path = spec.get("image") or reference_image_path(f"{label}.png")
+        if not os.path.isabs(path):
+            path = reference_image_path(path)
+        if os.path.exists(path):
+            templates[label] = load_template(path, spec.get("box"), spec.get("hotspot"))
+    return templates
+
+
+def _init_worker(frame, coarse=COARSE_SCALE):
+    global _frame, _small
+    _frame = frame
+    _small = _resize(frame, coarse)
+
+
+def _resize(gray, scale):
+    from PIL import Image
+
+    h, w = gray.shape
+    size = (max(1, int(w * scale)), max(1, int(h * scale)))
+    return np.asarray(Image.fromarray(gray).resize(size), dtype=np.float32)
+
+
+def _peaks(scores, count, size, floor):
+    """Up to ``count`` best (y, x) peaks at least ``size`` apart."""
+    scores = scores.copy()
+    h, w = size
+    found = []
+    for _ in range(count):
+        y, x = np.unravel_index(int(np.argmax(scores)), scores.shape)
+        if scores[y, x] < floor:
+            break
+        found.append((int(y), int(x)))
+        scores[max(0, y - h):y + h + 1, max(0, x - w):x + w + 1] = -1.0
+    return found
+
+
+def match_scale(label, template, scale, coarse=COARSE_SCALE, min_score=MIN_SCORE):
+    """Candidates for one (target, scale) pair in the worker's frame.
+
+    Returns ``(label, [(x, y, score, scale), ...])`` in frame pixels.
+    """
+    frame = _frame
+    tmpl, mask = template.scaled(scale * coarse)
+    scores = match_template(_small, tmpl, mask)
+    if scores is None:
+        return label, []
+    fine_scales = [round(scale * step, 3) for step in FINE_STEPS]
+    fine_templates = [(s, template.scaled(s)) for s in fine_scales]
+    w, h = template.size
+    pad = int(2 / coarse) + 2 + int(max(w, h) * (FINE_STEPS[-1] - 1.0) * scale)
+    hx, hy = template.hotspot
+    found = []
+    for y, x in _peaks(scores, PEAKS, tmpl.shape, min_score * COARSE_RATIO):
+        # 축소 프레임의 후보 주변만 원본 해상도(와 인접 배율)로 다시 매칭
+        left = max(0, int(x / coarse) - pad)
+        top = max(0, int(y / coarse) - pad)
+        crop = frame[top:top + int(h * scale) + 2 * pad,
+                     left:left + int(w * scale) + 2 * pad].astype(np.float32)
+        best = None
+        for s, (fine_tmpl, fine_mask) in fine_templates:
+            fine = match_template(crop, fine_tmpl, fine_mask)
+            if fine is None:
+                continue
+            fy, fx = np.unravel_index(int(np.argmax(fine)), fine.shape)
+            if best is None or fine[fy, fx] > best[2]:
+                best = (left + int(fx) + int(round(hx * s)),
+                        top + int(fy) + int(round(hy * s)), float(fine[fy, fx]), s)
+        if best is not None:
+            found.append(best)
+    return label, found
+
+
+def _near(a, b, radius):
+    return abs(a[0] - b[0]) <= radius and abs(a[1] - b[1]) <= radius
+
+
+def rank(candidates, radius=8):
+    """Sort by score and drop candidates within ``radius`` px of a better one."""
+    kept = []
+    for c in sorted(candidates, key=lambda c: c.score, reverse=True):
+        if not any(_near(c.xy, k.xy, radius) for k in kept):
+            kept.append(c)
+    return kept
+
+
+def resolve_conflicts(results, radius=8):
+    """A spot can only be one target: the better-scoring target keeps it."""
+    claimed = []
+    pending = [r for r in results.values() if r.candidates]
+    while pending:
+        pending.sort(key=lambda r: r.candidates[0].score if r.candidates else -1.0)
+        result = pending.pop()
+        if not result.candidates:
+            continue
+        top = result.candidates[0].xy
+        clash = next((xy for xy in claimed if _near(top, xy, radius)), None)
+        if clash is not None:
+            result.drop(clash, radius)
+            pending.append(result)
+            continue
+        claimed.append(top)
+    return results
+
+
+def auto_calibrate(image, origin=(0, 0), templates=None, scales=SCALES,
+                   processes=None, min_score=MIN_SCORE, margin=AMBIGUITY_MARGIN,
+                   accept=ACCEPT_SCORE):
+    """Find every target in ``image`` (a PIL screenshot taken at ``origin``).
+
+    Returns ``{label: TargetResult}`` with screen coordinates. With
+    ``processes=0`` the matching runs in this process.
+    """
+    if np is None:
+        raise RuntimeError("자동 보정에는 numpy 가 필요합니다.")
+    templates = load_templates() if templates is None else templates
+    frame = np.asarray(image.convert("L"), dtype=np.uint8)
+    found = {label: [] for label in templates}
+    jobs = [(label, template, scale) for label, template in templates.items() for scale in scales]
+    if processes == 0:
+        # 작업이 몇 개 안 될 때 (창 기준점 찾기 등): 프로세스 풀 없이 바로 매칭
+        _init_worker(frame, COARSE_SCALE)
+        outputs = [match_scale(label, template, scale, min_score=min_score)
+                   for label, template, scale in jobs]
+    else:
+        workers = min(len(jobs), processes or os.cpu_count() or 1) or 1
+        with ProcessPoolExecutor(workers, initializer=_init_worker,
+                                 initargs=(frame, COARSE_SCALE)) as pool:
+            futures = [pool.submit(match_scale, label, template, scale, min_score=min_score)
+                       for label, template, scale in jobs]
+            outputs = [future.result() for future in futures]
+    for label, hits in outputs:
+        found[label] += [Candidate((origin[0] + x, origin[1] + y), score, scale)
+                         for x, y, score, scale in hits]
+    return resolve_conflicts({label: TargetResult(label, rank(hits), min_score, margin, accept)
+                              for label, hits in found.items()})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="참조 이미지로 대상 좌표 자동 보정")
+    parser.add_argument("--image", help="캡처 이미지 파일 (생략 시 현재 화면 전체)")
+    parser.add_argument("--origin", nargs=2, type=int, default=(0, 0), metavar=("X", "Y"),
+                        help="캡처 이미지 왼쪽 위의 화면 좌표")
+    parser.add_argument("--processes", type=int, help="작업 프로세스 수 (기본: CPU 수)")
+    args = parser.parse_args(argv)
+
+    from PIL import Image
+
+    if args.image:
+        image, origin = Image.open(args.image), tuple(args.origin)
+    else:
+        import pyautogui
+
+        from tnl_driver import grab_screen_region, virtual_screen_bounds
+
+        bounds = virtual_screen_bounds(pyautogui)
+        image, origin = grab_screen_region(bounds), bounds[:2]
+
+    start = time.perf_counter()
+    results = auto_calibrate(image, origin, processes=args.processes)
+    elapsed = time.perf_counter() - start
+    for label, result in results.items():
+        top = ", ".join(f"{c.xy} {c.score:.2f} x{c.scale}" for c in result.candidates[:3])
+        print(f"{label:<12} {result.status:<9} {top}")
+    print(f"{elapsed:.2f}초")
+    return 0 if all(r.status == "ok" for r in results.values()) else 1
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -0,0 +1,201 @@
+"""사원 × 날짜 일괄 처리와 처리 순서 계획.
+
+사원 목록과 날짜 목록을 받아 (사원, 날짜) 전체를 한 번에 처리한다. 사원은
+조회 결과 그리드의 행 번호(사원 선택란 기준 아래로 row 번째 행) 또는 검색어
+(설정 좌표 '사원 검색란' 에 입력 후 조회)로 지정한다:
+
+    "batch": {"row_height": 22,
+              "employees": [{"name": "홍길동", "row": 0},
+                            {"name": "김철수", "row": 1},
+                            {"name": "이영희", "search": "20231234"}]}
+
+계획기는 조회 한 번으로 처리할 수 있는 묶음(날짜 + 검색어)을 만들고,
+날짜 입력과 조회 횟수가 적은 순서를 고른다:
+
+    - 행으로 지정한 사원은 날짜마다 조회 한 번으로 모두 처리 (날짜 우선)
+    - 검색어 사원은 날짜 수와 사원 수를 비교해 날짜 우선 / 사원 우선 중
+      입력란을 덜 바꾸는 쪽을 택한다
+    - 값이 그대로인 입력란은 다시 입력하지 않는다
+"""
+
+import time
+
+from tnl_engine import StepFailed, _default_log
+
+# 조회 결과 그리드 한 행의 높이 (픽셀)
+ROW_HEIGHT = 22
+
+SEARCH_TARGET = "사원 검색란"
+SELECT_TARGET = "사원 선택란"
+
+
+class Employee:
+    """Batch employee: selected by grid ``row`` or found by ``search`` key."""
+
+    def __init__(self, name, row=0, search=None):
+        self.name = name
+        self.row = row
+        self.search = search
+
+    @classmethod
+    def from_dict(cls, data):
+        """Employee from a name or {"name", "row", "search"}; ValueError if malformed."""
+        if isinstance(data, str) and data:
+            return cls(data, search=data)
+        if not isinstance(data, dict) or not isinstance(data.get("name"), str) or not data["name"]:
+            raise ValueError(f"사원 항목에 이름이 없습니다: {data!r}")
+        row, search = data.get("row", 0), data.get("search")
+        if isinstance(row, bool) or not isinstance(row, int) or row < 0:
+            raise ValueError(f"사원 행 번호가 잘못되었습니다: {data!r}")
+        if search is not None and not isinstance(search, str):
+            raise ValueError(f"사원 검색어가 문자열이 아닙니다: {data!r}")
+        return cls(data["name"], row, search)
+
+
+class QueryGroup:
+    """Employees handled from one query result (one date, one search key)."""
+
+    def __init__(self, date, search, employees):
+        self.date = date
+        self.search = search
+        self.employees = employees
+
+
+def plan_batch(employees, dates, done=()):
+    """Order the employee × date matrix into QueryGroups.
+
+    ``done`` holds finished (employee name, date) pairs from the ledger;
+    those items are left out and empty groups are dropped.
+    """
+    done = set(done)
+    by_row = [e for e in employees if not e.search]
+    by_search = [e for e in employees if e.search]
+
+    def group(date, search, members):
+        members = [e for e in members if (e.name, date) not in done]
+        return [QueryGroup(date, search, members)] if members else []
+
+    groups = []
+    # 검색어 사원: 날짜를 덜 바꾸는 쪽 (날짜 수 < 사원 수 이면 날짜 우선)
+    date_major = len(dates) < len(by_search)
+    for date in dates:
+        groups += group(date, None, by_row)
+        if date_major:
+            for employee in by_search:
+                groups += group(date, employee.search, [employee])
+    if not date_major:
+        for employee in by_search:
+            for date in dates:
+                groups += group(date, employee.search, [employee])
+    return groups
+
+
+def plan_cost(groups):
+    """Queries and field entries needed to run ``groups`` in order."""
+    entries = 0
+    last_date = last_search = None
+    for g in groups:
+        entries += (g.date != last_date) + (g.search is not None and g.search != last_search)
+        last_date = g.date
+        last_search = g.search if g.search is not None else last_search
+    return {"queries": len(groups), "entries": entries,
+            "items": sum(len(g.employees) for g in groups)}
+
+
+def split_loop(ops):
+    """Split the per-date ops into (query part, per-employee part)."""
+    for i, op in enumerate(ops):
+        if op.get("wait") == "query":
+            return ops[:i + 1], ops[i + 1:]
+    raise ValueError("작업 순서에 조회(wait=query) 단계가 없습니다.")
+
+
+class BatchRunner:
+    """Runs a batch plan with a CopyRunner, one query per QueryGroup."""
+
+    def __init__(self, runner, ref_date, row_height=ROW_HEIGHT, ledger=None, log=None):
+        self.runner = runner
+        self.ref_date = ref_date
+        self.row_height = row_height
+        self.ledger = ledger
+        self.log = log or _default_log
+        self.query_ops, self.item_ops = split_loop(runner.plan.loop)
+        self._entered = {}
+        self.failed = []    # 단계 확인에 실패한 (Employee, date)
+
+    def _query_ops(self, group):
+        ops = list(self.query_ops)
+        # 행 지정 묶음 앞에서는 남아 있는 검색어를 지운다
+        if group.search is not None or self._entered.get(SEARCH_TARGET):
+            if SEARCH_TARGET not in self.runner.coords:
+                raise ValueError(f"검색어로 사원을 찾으려면 '{SEARCH_TARGET}' 좌표가 필요합니다.")
+            search = {"step": "employee_search", "op": "enter", "target": SEARCH_TARGET,
+                      "text": "{employee}", "after": 0.0}
+            ops.insert(len(ops) - 1, search)
+        values = {"employee": group.search or ""}
+        kept = []
+        for op in ops:
+            if op["op"] == "enter":
+                text = op["text"].format(ref_date=self.ref_date, date=group.date, **values)
+                # ERP 입력란은 값을 유지하므로 같은 값이면 다시 입력하지 않는다
+                if self._entered.get(op["target"]) == text:
+                    continue
+                self._entered[op["target"]] = text
+            kept.append(op)
+        return kept, values
+
+    def run(self, groups, checkpoint=None, progress=None):
+        """Process ``groups``; returns the number of finished items.
+
+        ``checkpoint()`` is called before each item and stops the batch
+        when it returns False. ``progress(done, total, eta, employee, date)``
+        is called after each item with the ETA in seconds.
+
+        With a verifying runner, an item whose step fails is recorded in
+        ``failed`` (a failed query fails the whole group) and the batch
+        goes on with the next one.
+        """
+        total = sum(len(g.employees) for g in groups)
+        finished = 0
+        if not total:
+            return finished
+        start = time.perf_counter()
+        self.runner.setup(self.ref_date)
+        for op in self.runner.plan.setup:
+            if op["op"] == "enter":
+                self._entered[op["target"]] = op["text"].format(ref_date=self.ref_date, date="")
+        for group in groups:
+            if checkpoint is not None and not checkpoint():
+                break
+            ops, values = self._query_ops(group)
+            try:
+                self.runner.run_ops(ops, group.date, **values)
+            except StepFailed:
+                self._failed(group.employees, group.date)
+                continue
+            for employee in group.employees:
+                if checkpoint is not None and not checkpoint():
+                    return finished
+                row = 0 if group.search is not None else employee.row
+                self.runner.offsets[SELECT_TARGET] = (0, row * self.row_height)
+                try:
+                    self.runner.run_ops(self.item_ops, group.date, **values)
+                except StepFailed:
+                    self._failed([employee], group.date)
+                    continue
+                if self.ledger is not None:
+                    self.ledger.mark_done(group.date, self.ref_date, employee.name)
+                finished += 1
+                elapsed = time.perf_counter() - start
+                eta = elapsed / finished * (total - finished)
+                self.log(f"{employee.name} {group.date} 처리 완료 ({finished}/{total})")
+                if progress is not None:
+                    progress(finished, total, eta, employee, group.date)
+        return finished
+
+    def _failed(self, employees, date):
+        self.failed += [(employee, date) for employee in employees]
+        names = ", ".join(employee.name for employee in employees)
+        self.log(f"{names} {date} 처리 실패, 다음 항목으로 넘어갑니다.", "WARNING")
+        # 화면 상태를 알 수 없으므로 다음 조회에서 입력란을 모두 다시 입력한다
+        self._entered.clear()
@@ -0,0 +1,220 @@
+"""복사 루프 처리량 벤치마크.
+
+모의 T&L 화면(tnl_fake_erp)을 상대로 날짜별 복사 순서 전체를 N개 날짜만큼
+실행하고, 분당 처리 날짜 수, 날짜별 p50/p95 지연, 단계별 평균 시간을 보고한다.
+결과는 JSON 이력 파일에 누적되며 같은 조건(설정 이름과 그 내용의 해시, 모의
+화면 지연, 날짜 수)의 직전 실행과 비교해 느려진 항목이 있으면 종료 코드 1 을
+반환한다. 설정 내용(대기, pause, 입력 방식)을 바꾸면 새 기준으로 본다.
+
+    xvfb-run -a python tnl_bench.py --dates 10 --settings default fast
+
+Linux 에서는 Xvfb 가 필요하다 (배포판 패키지 xvfb 의 xvfb-run). 파이썬에서
+가상 화면을 띄우려면 xvfbwrapper 를 pip 로 설치해 쓴다.
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+from tnl_engine import STEPS, CopyRunner
+from tnl_fake_erp import FakeERPDriver, FakeTNLScreen
+
+HISTORY_PATH = "tnl_bench_history.json"
+
+# 비교할 타이밍 설정
+#   waits: tnl_wait.DEFAULT_WAITS 덮어쓰기
+#   pause: 입력 동작마다의 대기 (pyautogui.PAUSE 에 해당)
+#   entry_modes: tnl_entry 입력란별 입력 방식
+FAST_WAITS = {
+    "focus": {"timeout": 0.3, "settle": 0.05},
+    "entry": {"timeout": 0.3, "settle": 0.05},
+    "select": {"timeout": 0.3, "settle": 0.05},
+    "query": {"timeout": 6.0, "settle": 0.15},
+    "popup_open": {"timeout": 3.0, "settle": 0.08},
+    "popup_close": {"timeout": 3.0, "settle": 0.08},
+}
+DATE_FIELDS = ("일자 입력란", "복사 기준일자 입력란")
+
+SETTINGS = {
+    "default": {"waits": {}, "pause": 0.5},
+    "typewrite": {"waits": {}, "pause": 0.5,
+                  "entry_modes": {f: {"strategy": "typewrite"} for f in DATE_FIELDS}},
+    "nopause": {"waits": {}, "pause": 0.0},
+    "fast": {"waits": FAST_WAITS, "pause": 0.05,
+             "entry_modes": {f: {"strategy": "typewrite"} for f in DATE_FIELDS}},
+    "paste": {"waits": FAST_WAITS, "pause": 0.05,
+              "entry_modes": {f: {"strategy": "paste", "verify": True} for f in DATE_FIELDS}},
+}
+
+
+def percentile(values, q):
+    """Nearest-rank percentile of ``values`` (q in 0~100)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100.0 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def config_hash(setting):
+    """Short hash of a setting's waits, pause and entry modes."""
+    text = json.dumps(setting, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:12]
+
+
+def history_key(result):
+    """What a previous run must share with ``result`` to be compared."""
+    return (result["settings"], config_hash(result.get("config", {})), result.get("latency"),
+            result.get("jitter", 0.0), result.get("dates"))
+
+
+def bench_dates(count, start="2025-08-01"):
+    first = datetime.strptime(start, "%Y-%m-%d")
+    return [(first + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(count)]
+
+
+def run_setting(name, setting, dates, ref_date, latency, jitter):
+    """Run every date once against a fresh fake screen and summarise."""
+    screen = FakeTNLScreen(latency=latency, jitter=jitter, seed=0).start()
+    try:
+        driver = FakeERPDriver(screen, pause=setting.get("pause", 0.0))
+        runner = CopyRunner(driver, screen.targets(), setting.get("waits"),
+                            entry_modes=setting.get("entry_modes"))
+        runner.setup(ref_date)
+
+        per_date = []
+        per_step = {step: [] for step in STEPS}
+        started = time.perf_counter()
+        for date in dates:
+            t0 = time.perf_counter()
+            steps = runner.process_date(date)
+            per_date.append(time.perf_counter() - t0)
+            for step in STEPS:
+                per_step[step].append(steps.get(step, 0.0))
+        total = time.perf_counter() - started
+        # 마지막 복사 처리가 반영될 시간을 준 뒤 결과 확인
+        time.sleep(screen.latency.get("commit", 0.0) + 0.1)
+        state = screen.snapshot()
+    finally:
+        screen.stop()
+
+    done = {(d, r) for _, d, r in state["records"]}
+    return {
+        "settings": name,
+        "config": setting,
+        "config_hash": config_hash(setting),
+        "latency": latency,
+        "jitter": jitter,
+        "dates": len(dates),
+        "completed": sum(1 for d in dates if (d, ref_date) in done),
+        "errors": len(state["errors"]),
+        "total_s": round(total, 3),
+        "dates_per_min": round(len(dates) / total * 60, 2) if total else 0.0,
+        "p50_s": round(percentile(per_date, 50), 3),
+        "p95_s": round(percentile(per_date, 95), 3),
+        "steps": {step: round(sum(v) / len(v), 3) if v else 0.0 for step, v in per_step.items()},
+    }
+
+
+def compare(prev, cur, tolerance):
+    """List of (metric, prev, cur, change, regressed) against ``prev``."""
+    rows = []
+
+    def add(metric, a, b, higher_is_better=False):
+        if not a:
+            return
+        change = (b - a) / a
+        worse = -change if higher_is_better else change
+        rows.append((metric, a, b, change, worse > tolerance))
+
+    add("dates_per_min", prev["dates_per_min"], cur["dates_per_min"], higher_is_better=True)
+    add("p50_s", prev["p50_s"], cur["p50_s"])
+    add("p95_s", prev["p95_s"], cur["p95_s"])
+    for step in STEPS:
+        add(f"steps.{step}", prev["steps"].get(step, 0.0), cur["steps"].get(step, 0.0))
+    return rows
+
+
+def load_history(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_history(path, history):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(history, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, path)
+
+
+def print_result(result):
+    print(f"[{result['settings']}] {result['dates']}개 날짜, 완료 {result['completed']}, "
+          f"오류 {result['errors']}")
+    print(f"  {result['dates_per_min']:.2f} 날짜/분, p50 {result['p50_s']:.2f}s, "
+          f"p95 {result['p95_s']:.2f}s, 총 {result['total_s']:.1f}s")
+    for step in STEPS:
+        print(f"  {step:<12} {result['steps'][step] * 1000:8.0f} ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="T&L 복사 루프 처리량 벤치마크")
+    parser.add_argument("--dates", type=int, default=5, help="처리할 날짜 수")
+    parser.add_argument("--ref-date", default="2025-07-01", help="복사 기준일자")
+    parser.add_argument("--settings", nargs="+", default=["default"],
+                        help=f"타이밍 설정 ({', '.join(SETTINGS)})")
+    parser.add_argument("--waits", help="추가 설정 'custom' 으로 쓸 waits JSON 파일")
+    parser.add_argument("--pause", type=float, default=0.5, help="'custom' 설정의 입력 동작 대기")
+    parser.add_argument("--query", type=float, default=0.8, help="모의 화면 조회 지연(초)")
+    parser.add_argument("--popup", type=float, default=0.2, help="모의 화면 팝업 지연(초)")
+    parser.add_argument("--commit", type=float, default=0.3, help="모의 화면 처리 지연(초)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="모의 화면 지연 변동 비율")
+    parser.add_argument("--history", default=HISTORY_PATH, help="결과 이력 JSON 파일")
+    parser.add_argument("--tolerance", type=float, default=0.10,
+                        help="회귀로 판단할 상대 변화 (0.10 = 10%%)")
+    args = parser.parse_args(argv)
+
+    settings = dict(SETTINGS)
+    if args.waits:
+        with open(args.waits, "r", encoding="utf-8") as f:
+            settings["custom"] = {"waits": json.load(f), "pause": args.pause}
+        if "custom" not in args.settings:
+            args.settings.append("custom")
+
+    latency = {"query": args.query, "popup": args.popup, "commit": args.commit}
+    dates = bench_dates(args.dates)
+    history = load_history(args.history)
+    regressed = False
+
+    for name in args.settings:
+        if name not in settings:
+            parser.error(f"알 수 없는 설정: {name}")
+        result = run_setting(name, settings[name], dates, args.ref_date, latency, args.jitter)
+        result["timestamp"] = datetime.now().isoformat(timespec="seconds")
+        print_result(result)
+
+        key = history_key(result)
+        prev = next((h for h in reversed(history) if history_key(h) == key), None)
+        if prev is not None:
+            print(f"  직전 실행 ({prev['timestamp']}) 대비:")
+            for metric, a, b, change, worse in compare(prev, result, args.tolerance):
+                mark = "  << 회귀" if worse else ""
+                print(f"    {metric:<18} {a:9.3f} -> {b:9.3f} ({change:+.1%}){mark}")
+                regressed = regressed or worse
+        if result["completed"] != result["dates"]:
+            print("  !! 일부 날짜가 완료되지 않았습니다.")
+            regressed = True
+        history.append(result)
+
+    save_history(args.history, history)
+    return 1 if regressed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,254 @@
+"""화면 배치별 좌표 보정 프로필과 ERP 창 기준 좌표.
+
+좌표는 모니터 배치/해상도, DPI 배율, ERP 창 크기가 바뀌면 달라진다. 배치마다
+보정한 좌표를 따로 저장해 두고, 시작할 때(와 작업 시작마다) 현재 배치에 맞는
+프로필을 자동으로 고른다. 노트북을 도킹/해제해도 한 번씩 보정해 둔 배치라면
+다시 보정할 필요가 없다.
+
+배치 키 예: ``1920x1080+0+0,2560x1440+1920+0@125%/1600x900``
+(모니터들 @ DPI 배율 / ERP 창 크기).
+
+ERP 창 기준점(anchor)을 찾을 수 있으면 좌표를 창 왼쪽 위 기준, DPI 100%
+환산 값(relative)으로도 저장한다. 실행마다 기준점을 한 번 찾아 여섯 대상의
+화면 좌표를 계산하므로 창을 옮기거나 다른 모니터/배율로 옮겨도 그대로 맞는다.
+기준점은 창 제목 일부로 찾거나, 창 제목줄 등을 잘라 둔 이미지로 찾는다
+(box 는 이미지 안의 [left, top, right, bottom], hotspot 을 생략하면 box 가운데,
+dpi 는 이미지를 잘라 둔 때의 DPI 배율). 이미지는 현재 배율 / dpi 로 확대/축소해
+맞춘다. dpi 를 적지 않으면 처음 프로필을 저장할 때의 배율을 기록한다:
+
+    "calibration": {"window_title": "근태관리",
+                    "anchor": {"image": "ERP 제목줄.png", "box": [0, 0, 240, 30],
+                               "dpi": 1.25},
+                    "profiles": {"<배치 키>": {"layout": {...}, "coords": {...},
+                                               "relative": {...}, "anchor": {...},
+                                               "saved": "2025-08-13 20:44:10"}}}
+
+DPI 배율은 창 제목으로 찾은 ERP 창의 배율(모니터마다 다를 수 있음)이고, 창을
+찾지 못하면 시스템 배율이다. 창 제목을 지정하지 않았거나 창을 찾지 못하면 창
+크기는 비교하지 않는다.
+
+이미지로 기준점을 찾으려면 전체 화면을 캡처해 매칭해야 하므로 GUI 스레드에서는
+search=False 로 건너뛰고 작업 스레드에서 찾는다.
+
+    python tnl_calibration.py            # 현재 배치, 기준점과 저장된 프로필 목록
+"""
+
+import argparse
+import json
+import os
+import sys
+from datetime import datetime
+
+CONFIG_PATH = os.path.join(os.path.expanduser("~"), "Desktop", "tnlcopy_config.json")
+
+
+def current_layout(driver, window_title=None):
+    """Normalised layout dict of the desktop ``driver`` runs on."""
+    raw = driver.screen_layout(window_title)
+    window = raw.get("window")
+    return {
+        "monitors": sorted([list(m) for m in raw["monitors"]]),
+        "dpi": round(float(raw.get("dpi") or 1.0), 2),
+        "window": list(window) if window else None,
+    }
+
+
+def layout_key(layout):
+    monitors = ",".join(f"{w}x{h}{l:+d}{t:+d}" for l, t, w, h in layout["monitors"])
+    key = f"{monitors}@{round(layout['dpi'] * 100)}%"
+    if layout.get("window"):
+        key += "/{}x{}".format(*layout["window"][2:])
+    return key
+
+
+def compatible(a, b):
+    """Same monitors and DPI; window size only compared when both known."""
+    if a["monitors"] != b["monitors"] or a["dpi"] != b["dpi"]:
+        return False
+    if a.get("window") and b.get("window"):
+        return a["window"][2:] == b["window"][2:]
+    return True
+
+
+class Anchor:
+    """ERP window origin (screen px) and DPI scale, resolved once per run."""
+
+    def __init__(self, origin, dpi, size=None, source="window"):
+        self.origin = tuple(origin)
+        self.dpi = dpi
+        self.size = tuple(size) if size else None
+        self.source = source
+
+    @property
+    def logical_size(self):
+        """Window size at 100% scaling (None when unknown)."""
+        if self.size is None:
+            return None
+        return (self.size[0] / self.dpi, self.size[1] / self.dpi)
+
+    def to_relative(self, coords):
+        ox, oy = self.origin
+        return {label: [round((x - ox) / self.dpi, 2), round((y - oy) / self.dpi, 2)]
+                for label, (x, y) in coords.items()}
+
+    def to_screen(self, relative):
+        ox, oy = self.origin
+        return {label: (int(round(ox + rx * self.dpi)), int(round(oy + ry * self.dpi)))
+                for label, (rx, ry) in relative.items()}
+
+    def as_dict(self):
+        return {"origin": list(self.origin), "dpi": self.dpi,
+                "size": list(self.size) if self.size else None, "source": self.source}
+
+
+def _same_size(a, b, tolerance=0.01):
+    return all(abs(x - y) <= tolerance * max(x, y) for x, y in zip(a, b))
+
+
+def find_anchor(driver, calibration, layout, search=True):
+    """Anchor from the window found by title, else from the header image.
+
+    The header image is scaled by the current DPI over the DPI it was cut
+    at. With ``search=False`` the (full-screen) image search is skipped.
+    """
+    if layout.get("window"):
+        left, top, width, height = layout["window"]
+        return Anchor((left, top), layout["dpi"], (width, height), "window")
+    spec = calibration.get("anchor")
+    if not spec or not search:
+        return None
+    from tnl_autocal import auto_calibrate
+    from tnl_locator import load_template, reference_image_path
+
+    path = spec["image"]
+    if not os.path.isabs(path):
+        path = reference_image_path(path)
+    template = load_template(path, spec.get("box"), spec.get("hotspot"))
+    bounds = driver.screen_bounds()
+    scale = layout["dpi"] / float(spec.get("dpi") or layout["dpi"])
+    result = auto_calibrate(driver.screenshot(bounds), bounds[:2], {"anchor": template},
+                            scales=(round(scale, 3),), processes=0)["anchor"]
+    if result.xy is None:
+        return None
+    return Anchor(result.xy, layout["dpi"], None, "header")
+
+
+class CalibrationStore:
+    """Calibration profiles in the config's 'calibration' section (in place)."""
+
+    def __init__(self, data):
+        self.data = data
+        data.setdefault("profiles", {})
+
+    @property
+    def window_title(self):
+        return self.data.get("window_title")
+
+    @property
+    def profiles(self):
+        return self.data["profiles"]
+
+    def match(self, layout, anchor=None):
+        """(key, profile) for ``layout``, or (None, None).
+
+        An exact key wins, then the newest compatible profile. With an
+        ``anchor``, a window-relative profile saved with the same logical
+        window size also matches (other monitors or DPI).
+        """
+        key = layout_key(layout)
+        if key in self.profiles:
+            return key, self.profiles[key]
+        candidates = [(p.get("saved", ""), k) for k, p in self.profiles.items()
+                      if compatible(layout, p["layout"])]
+        if not candidates and anchor is not None:
+            for k, p in self.profiles.items():
+                if not p.get("relative"):
+                    continue
+                saved = Anchor(**p["anchor"])
+                if (anchor.logical_size is None or saved.logical_size is None
+                        or _same_size(anchor.logical_size, saved.logical_size)):
+                    candidates.append((p.get("saved", ""), k))
+        if not candidates:
+            return None, None
+        key = max(candidates)[1]
+        return key, self.profiles[key]
+
+    def save(self, layout, coords, anchor=None):
+        key = layout_key(layout)
+        profile = {
+            "layout": layout,
+            "coords": {label: list(xy) for label, xy in coords.items()},
+            "saved": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        if anchor is not None:
+            profile["relative"] = anchor.to_relative(coords)
+            profile["anchor"] = anchor.as_dict()
+        self.profiles[key] = profile
+        return key
+
+
+def save_profile(calibration, driver, coords):
+    """Save ``coords`` as the profile of the current layout; (key, anchor)."""
+    store = CalibrationStore(calibration)
+    layout = current_layout(driver, store.window_title)
+    anchor = find_anchor(driver, store.data, layout)
+    if anchor is not None and anchor.source == "header" and "dpi" not in store.data["anchor"]:
+        # 기준 이미지를 잘라 둔 배율을 모르면 처음 저장한 배율로 기록
+        store.data["anchor"]["dpi"] = layout["dpi"]
+    return store.save(layout, coords, anchor), anchor
+
+
+def run_coords(calibration, driver, fallback=None, search=True):
+    """Screen coordinates for one run: (coords, profile key, anchor).
+
+    The ERP window anchor is found once and the profile's window-relative
+    targets are mapped through it; profiles without relative coordinates
+    give their absolute ones. Without a matching profile ``fallback`` is
+    returned with key None. ``search=False`` skips the header image search
+    (see find_anchor).
+    """
+    store = CalibrationStore(calibration)
+    layout = current_layout(driver, store.window_title)
+    anchor = find_anchor(driver, store.data, layout, search)
+    key, profile = store.match(layout, anchor)
+    if profile is None:
+        return dict(fallback or {}), None, anchor
+    if anchor is not None and profile.get("relative"):
+        return anchor.to_screen(profile["relative"]), key, anchor
+    return {label: tuple(xy) for label, xy in profile["coords"].items()}, key, anchor
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="화면 배치별 좌표 보정 프로필 확인")
+    parser.add_argument("--config", default=CONFIG_PATH, help="설정 파일 (tnlcopy_config.json)")
+    args = parser.parse_args(argv)
+
+    config = {}
+    if os.path.exists(args.config):
+        with open(args.config, "r", encoding="utf-8") as f:
+            config = json.load(f)
+    store = CalibrationStore(config.get("calibration") or {})
+
+    import pyautogui
+
+    from tnl_driver import PyAutoGUIDriver
+
+    driver = PyAutoGUIDriver(pyautogui)
+    layout = current_layout(driver, store.window_title)
+    anchor = find_anchor(driver, store.data, layout)
+    key, _ = store.match(layout, anchor)
+    print(f"현재 배치: {layout_key(layout)}")
+    if anchor is not None:
+        print(f"ERP 창 기준점: {anchor.origin} ({anchor.source}, DPI {anchor.dpi * 100:.0f}%)")
+    for name, profile in sorted(store.profiles.items()):
+        mark = "*" if name == key else " "
+        relative = ", 창 기준" if profile.get("relative") else ""
+        print(f" {mark} {name}  ({len(profile['coords'])}개 좌표{relative}, {profile.get('saved', '-')})")
+    if key is None:
+        print("현재 배치에 맞는 프로필이 없습니다. 매크로에서 좌표를 설정하세요.")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+"""영역 캡처 서비스와 짧은 수명의 프레임 캐시.
+
+다중 모니터(보조 모니터 좌표 x=4807 등)에서 전체 화면 캡처는 느리고
+메모리를 많이 쓰므로, 요청한 영역만 잡고(tnl_driver.grab_screen_region:
+mss, 없으면 Windows 는 그 영역만 BitBlt) 잠깐(ttl) 캐시한다.
+
+    - 같은 영역, 또는 캐시된 프레임에 포함되는 영역 요청은 다시 캡처하지 않고
+      잘라서 돌려준다 (한 폴링 간격 안의 여러 확인이 한 번의 캡처를 공유)
+    - 입력 동작 뒤에는 invalidate() 로 캐시를 비운다
+    - stats() 로 캡처 지연(ms)과 캐시 적중률을 확인한다
+
+Linux 에서는 Xvfb 화면에서도 동작한다 (mss, 없으면 Pillow 의 XCB 캡처 -
+이때는 전체 화면을 잡은 뒤 잘라낸다):
+
+    xvfb-run -a python tnl_capture.py --region 0 0 800 600 --count 50
+"""
+
+import argparse
+import collections
+import threading
+import time
+
+from tnl_driver import grab_screen_region
+from tnl_wait import POLL_INTERVAL
+
+# 캐시 수명: 폴링 한 간격 동안 감시 영역과 위치 탐색이 같은 프레임을 공유한다.
+# 같은 감시 영역의 다음 폴링은 간격보다 늦게 오므로 새 프레임을 본다 (시계는
+# 해상도가 높은 perf_counter; 입력 동작 뒤에는 invalidate() 로 비운다)
+DEFAULT_TTL = POLL_INTERVAL
+
+# 캐시에 보관하는 최대 프레임 수와 지연 통계 표본 수
+MAX_FRAMES = 8
+LATENCY_SAMPLES = 200
+
+
+def _contains(outer, inner):
+    ol, ot, ow, oh = outer
+    il, it, iw, ih = inner
+    return ol <= il and ot <= it and il + iw <= ol + ow and it + ih <= ot + oh
+
+
+class CaptureService:
+    """Region grabs with a short-lived shared frame cache.
+
+    ``grab(region)`` has the same signature as ``InputDriver.screenshot``
+    and can be handed to RegionProbe or TargetLocator in its place.
+    """
+
+    def __init__(self, grab=grab_screen_region, ttl=DEFAULT_TTL, clock=time.perf_counter):
+        self._grab = grab
+        self.ttl = ttl
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._frames = collections.OrderedDict()  # region -> (timestamp, image)
+        self._latency = collections.deque(maxlen=LATENCY_SAMPLES)
+        self.grabs = 0
+        self.hits = 0
+
+    def grab(self, region):
+        """PIL image of ``region``, served from the cache when still fresh."""
+        region = tuple(int(v) for v in region)
+        with self._lock:
+            image = self._cached(region)
+            if image is not None:
+                self.hits += 1
+                return image
+            return self._capture(region)
+
+    def invalidate(self):
+        """Drop cached frames (call after any input that changes the screen)."""
+        with self._lock:
+            self._frames.clear()
+
+    def stats(self):
+        with self._lock:
+            samples = sorted(self._latency)
+            last = self._latency[-1] if self._latency else 0.0
+            requests = self.grabs + self.hits
+        if not samples:
+            return {"grabs": 0, "hits": self.hits, "hit_rate": 0.0,
+                    "last_ms": 0.0, "mean_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0}
+        p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+        return {
+            "grabs": self.grabs,
+            "hits": self.hits,
+            "hit_rate": round(self.hits / requests, 3),
+            "last_ms": round(last * 1000, 2),
+            "mean_ms": round(sum(samples) / len(samples) * 1000, 2),
+            "p95_ms": round(p95 * 1000, 2),
+            "max_ms": round(samples[-1] * 1000, 2),
+        }
+
+    def _cached(self, region):
+        now = self.clock()
+        for key, (stamp, image) in list(self._frames.items()):
+            if now - stamp > self.ttl:
+                del self._frames[key]
+            elif key == region:
+                return image
+            elif _contains(key, region):
+                left, top = region[0] - key[0], region[1] - key[1]
+                return image.crop((left, top, left + region[2], top + region[3]))
+        return None
+
+    def _capture(self, region):
+        start = time.perf_counter()
+        image = self._grab(region)
+        self._latency.append(time.perf_counter() - start)
+        self.grabs += 1
+        self._frames[region] = (self.clock(), image)
+        while len(self._frames) > MAX_FRAMES:
+            self._frames.popitem(last=False)
+        return image
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="영역 캡처 지연 측정")
+    parser.add_argument("--region", type=int, nargs=4, default=[0, 0, 800, 600],
+                        metavar=("LEFT", "TOP", "WIDTH", "HEIGHT"))
+    parser.add_argument("--count", type=int, default=50, help="캡처 횟수")
+    args = parser.parse_args(argv)
+
+    capture = CaptureService()
+    for _ in range(args.count):
+        capture.invalidate()
+        capture.grab(args.region)
+    for key, value in capture.stats().items():
+        print(f"{key:<10}{value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""작업 중단/일시정지 제어 (이벤트 기반).
+
+폴링 루프 대신 threading.Event 로 상태를 알린다.
+
+    - 모든 대기(sleep, 조건 대기)는 Control.sleep 을 거쳐 중단 즉시 깨어난다
+    - 모든 입력 동작 직전에 check() 로 중단/일시정지를 확인하므로 중단은
+      다음 입력 전에 반영된다 (일시정지 중에는 CPU 를 쓰지 않고 멈춰 있다)
+    - 전역 단축키는 keyboard 모듈의 후킹(add_hotkey)으로 등록한다
+    - 후킹은 매크로가 보낸 키도 받는다. 매크로가 보낸 키는 injected() 로
+      세어 두고, 단축키 처리는 consume_injected() 로 그만큼의 이벤트만 삼킨다.
+      팝업 복구가 누르는 escape 는 ESC 중단으로 잡히지 않고, 사용자가 누른
+      ESC 는 그대로 중단한다 (INJECTED_TTL 초 안에 도착하지 않은 것은 버린다)
+
+설정 파일의 'hotkeys' 로 단축키를 바꿀 수 있다:
+
+    "hotkeys": {"abort": "esc", "pause": "f8", "resume": "f9"}
+"""
+
+import collections
+import threading
+import time
+
+from tnl_driver import InputDriver
+
+DEFAULT_HOTKEYS = {"abort": "esc", "pause": "f8", "resume": "f9"}
+# 매크로가 보낸 키의 후킹 이벤트를 기다리는 최대 시간 (초); 그 뒤에는 세지 않는다
+INJECTED_TTL = 1.0
+# keyboard 단축키 이름과 pyautogui 키 이름의 차이
+KEY_ALIASES = {"escape": "esc", "return": "enter", "control": "ctrl"}
+
+
+def key_name(keys):
+    """Normalised hotkey name of a key or key combination ("ctrl+c")."""
+    if isinstance(keys, str):
+        keys = keys.split("+")
+    return "+".join(KEY_ALIASES.get(k.strip().lower(), k.strip().lower()) for k in keys)
+
+
+class Aborted(Exception):
+    """The run was stopped (stop button, ESC or a remote cancel)."""
+
+
+class Control:
+    """Abort and pause state shared by the GUI, hotkeys and the worker."""
+
+    def __init__(self):
+        self._abort = threading.Event()
+        self._resume = threading.Event()
+        self._resume.set()
+        self._lock = threading.Lock()
+        self._injected = collections.deque()  # (key name, monotonic time)
+
+    @property
+    def aborted(self):
+        return self._abort.is_set()
+
+    @property
+    def paused(self):
+        return not self._resume.is_set()
+
+    def start(self):
+        self._abort.clear()
+        self._resume.set()
+
+    def abort(self):
+        self._abort.set()
+        # 일시정지 중인 작업 스레드도 깨워서 바로 끝나게 한다
+        self._resume.set()
+
+    def pause(self):
+        if not self.aborted:
+            self._resume.clear()
+
+    def resume(self):
+        self._resume.set()
+
+    def check(self):
+        """Raise Aborted if stopped; block (without polling) while paused."""
+        if self._abort.is_set():
+            raise Aborted()
+        if not self._resume.is_set():
+            self._resume.wait()
+            if self._abort.is_set():
+                raise Aborted()
+
+    def sleep(self, seconds):
+        """time.sleep that returns early (raising Aborted) on abort."""
+        if self._abort.wait(max(0.0, seconds)):
+            raise Aborted()
+
+    def injected(self, keys):
+        """Record a key (or combination) the macro itself is about to send."""
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            self._injected.append((key_name(keys), now))
+
+    def consume_injected(self, hotkey):
+        """True (and forget it) if a ``hotkey`` event is one the macro sent."""
+        name = key_name(hotkey)
+        with self._lock:
+            self._expire(time.monotonic())
+            for entry in self._injected:
+                if entry[0] == name:
+                    self._injected.remove(entry)
+                    return True
+        return False
+
+    def _expire(self, now):
+        while self._injected and now - self._injected[0][1] > INJECTED_TTL:
+            self._injected.popleft()
+
+
+class ControlledDriver(InputDriver):
+    """Wraps an InputDriver and checks ``control`` before every input."""
+
+    def __init__(self, driver, control):
+        self.driver = driver
+        self.control = control
+
+    @property
+    def pause(self):
+        return getattr(self.driver, "pause", 0.0)
+
+    def click(self, x, y):
+        self.control.check()
+        self.driver.click(x, y)
+
+    def hotkey(self, *keys):
+        self.control.check()
+        self.control.injected(keys)
+        self.driver.hotkey(*keys)
+
+    def press(self, key):
+        self.control.check()
+        self.control.injected(key)
+        self.driver.press(key)
+
+    def type(self, text, interval=0.0):
+        self.control.check()
+        self.driver.type(text, interval=interval)
+
+    def screenshot(self, region):
+        return self.driver.screenshot(region)
+
+    def screen_bounds(self):
+        return self.driver.screen_bounds()
+
+    def screen_layout(self, window_title=None):
+        return self.driver.screen_layout(window_title)
+
+    def get_clipboard(self):
+        return self.driver.get_clipboard()
+
+    def set_clipboard(self, text):
+        self.driver.set_clipboard(text)
+
+
+def bind_hotkeys(keyboard, hotkeys, abort, pause=None, resume=None):
+    """Register global hotkeys; returns a function that removes them."""
+    if keyboard is None:
+        return lambda: None
+    keys = dict(DEFAULT_HOTKEYS)
+    keys.update(hotkeys or {})
+    handles = []
+    for action, callback in (("abort", abort), ("pause", pause), ("resume", resume)):
+        if callback is not None and keys.get(action):
+            handles.append(keyboard.add_hotkey(keys[action], callback))
+
+    def unbind():
+        for handle in handles:
+            try:
+                keyboard.remove_hotkey(handle)
+            except (KeyError, ValueError):
+                pass
+
+    return unbind
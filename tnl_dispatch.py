@@ -0,0 +1,386 @@
+"""여러 자동화 에이전트로 작업을 나눠 보내는 분배기.
+
+큰 작업(사원 × 날짜)을 날짜 단위 조각(shard)으로 나눠 여러 데스크톱의
+tnl_agent 에 보낸다.
+
+    - 에이전트마다 항목당 처리 시간을 측정(첫 측정값에서 시작하는 지수 이동
+      평균)해, 한 조각이 약 shard_seconds 초 걸리도록 조각 크기를 정한다.
+      한가해진 에이전트가 다음 조각을 가져가므로 빠른 에이전트가 더 많이
+      처리한다.
+    - 에이전트가 실패하거나 응답이 없거나 진행이 멈추면(stall) 작업을 취소하고
+      남은 날짜를 큐 앞쪽에 다시 넣는다. 그 에이전트는 retry_after 초 쉰다.
+    - 에이전트가 보고한 완료 항목은 이 쪽 원장에 모아 기록하고 전체 진행률을
+      하나로 보여 준다.
+
+    python tnl_dispatch.py --agent http://vm1:8765 --agent http://vm2:8765 \\
+        --token SECRET --ledger tnlcopy_ledger.sqlite3 \\
+        --ref-date 2025-08-01 --dates 2025-08-04 2025-08-05 ...
+
+    # 데스크톱 없이 로컬 대역 에이전트 3개로 시험 (원장은 임시 파일)
+    python tnl_dispatch.py --local 3 --ref-date 2025-08-01 --dates 2025-08-04 2025-08-05
+"""
+
+import argparse
+import collections
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+
+from tnl_engine import _default_log
+from tnl_ledger import Ledger
+
+# 측정 전 첫 조각 크기를 정할 때만 쓰는 항목당 처리 시간 가정 (초):
+# 데스크톱 한 대가 분당 약 3개 날짜
+DEFAULT_LATENCY = 20.0
+LATENCY_WEIGHT = 0.3
+
+
+class AgentError(Exception):
+    """The agent could not be reached or rejected the request."""
+
+
+class AgentClient:
+    """Minimal JSON client for the tnl_agent HTTP API."""
+
+    def __init__(self, url, token=None, timeout=10.0):
+        self.url = url.rstrip("/")
+        self.token = token
+        self.timeout = timeout
+
+    def _request(self, method, path, body=None):
+        data = json.dumps(body).encode("utf-8") if body is not None else None
+        request = urllib.request.Request(self.url + path, data=data, method=method)
+        request.add_header("Content-Type", "application/json")
+        if self.token:
+            request.add_header("X-Agent-Token", self.token)
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return json.loads(response.read().decode("utf-8"))
+        except (urllib.error.URLError, OSError, ValueError) as e:
+            raise AgentError(f"{self.url}{path}: {e}") from e
+
+    def submit(self, dates, ref_date, employees=None, profile=None):
+        body = {"dates": dates, "ref_date": ref_date}
+        if employees:
+            body["employees"] = employees
+        if profile:
+            body["profile"] = profile
+        return self._request("POST", "/jobs", body)["id"]
+
+    def status(self, job_id):
+        return self._request("GET", f"/jobs/{job_id}")
+
+    def cancel(self, job_id):
+        return self._request("POST", f"/jobs/{job_id}/cancel")
+
+
+class Unit:
+    """One date with the employees still to copy for it."""
+
+    def __init__(self, date, employees=None):
+        self.date = date
+        self.employees = employees
+        self.attempts = 0
+
+    @property
+    def size(self):
+        return len(self.employees) if self.employees else 1
+
+
+class AgentSlot:
+    """Dispatcher-side state of one agent."""
+
+    def __init__(self, client, latency=None):
+        self.client = client
+        # 항목당 처리 시간 (초); 첫 항목을 보고받기 전에는 None
+        self.latency = latency
+        self.units = []
+        self.job_id = None
+        self.reported = 0
+        self.last_progress = 0.0
+        self.down_until = 0.0
+        self.items_done = 0
+        self.failures = 0
+
+    @property
+    def busy(self):
+        return self.job_id is not None
+
+    @property
+    def expected_latency(self):
+        return DEFAULT_LATENCY if self.latency is None else self.latency
+
+    def measure(self, sample):
+        # 가정값을 섞지 않고 첫 측정값에서 시작한다
+        if self.latency is None:
+            self.latency = sample
+        else:
+            self.latency = (1 - LATENCY_WEIGHT) * self.latency + LATENCY_WEIGHT * sample
+
+
+def _name(employee):
+    return employee if isinstance(employee, str) else employee["name"]
+
+
+class Dispatcher:
+    """Shards an employee × date job across several agents.
+
+    ``run(dates, employees)`` returns {"done", "total", "failed"} where
+    ``failed`` lists the dates that exceeded ``max_attempts``.
+    ``progress(done, total, eta)`` is called whenever items complete.
+    """
+
+    def __init__(self, agents, ref_date, ledger=None, profile=None, shard_seconds=120.0,
+                 stall_factor=4.0, min_stall=30.0, retry_after=30.0, max_attempts=3,
+                 poll_interval=1.0, log=None, progress=None, clock=time.monotonic,
+                 sleep=time.sleep):
+        self.slots = [AgentSlot(agent) for agent in agents]
+        self.ref_date = ref_date
+        self.ledger = ledger
+        self.profile = profile
+        self.shard_seconds = shard_seconds
+        self.stall_factor = stall_factor
+        self.min_stall = min_stall
+        self.retry_after = retry_after
+        self.max_attempts = max_attempts
+        self.poll_interval = poll_interval
+        self.log = log or _default_log
+        self.progress = progress
+        self.clock = clock
+        self.sleep = sleep
+        self.stop_event = threading.Event()
+        self.pending = collections.deque()
+        self.done = set()
+        self.failed = []
+        self.total = 0
+
+    def stop(self):
+        self.stop_event.set()
+
+    def run(self, dates, employees=None):
+        names = [_name(e) for e in employees] if employees else [""]
+        finished = self.ledger.done_items(self.ref_date) if self.ledger is not None else set()
+        self.total = len(dates) * len(names)
+        for date in dates:
+            if employees:
+                todo = [e for e in employees if (_name(e), date) not in finished]
+            else:
+                todo = None if ("", date) not in finished else []
+            if todo == []:
+                self.done.update((name, date) for name in names)
+                continue
+            self.pending.append(Unit(date, todo))
+        if self.done:
+            self.log(f"이미 완료된 항목 {len(self.done)}개를 건너뜁니다.")
+        self.started = self.clock()
+
+        while (self.pending or any(s.busy for s in self.slots)) and not self.stop_event.is_set():
+            now = self.clock()
+            for slot in self.slots:
+                if slot.busy:
+                    self._poll(slot, now)
+                elif self.pending and now >= slot.down_until:
+                    self._assign(slot, now)
+            if self.pending and not any(s.busy for s in self.slots):
+                # 모든 에이전트가 쉬는 중이면 가장 먼저 돌아오는 에이전트까지 대기
+                wake = min(s.down_until for s in self.slots)
+                self.sleep(max(self.poll_interval, wake - self.clock()))
+            else:
+                self.sleep(self.poll_interval)
+
+        for slot in self.slots:
+            if slot.busy:
+                self._abandon(slot, "분배 중지", requeue=False)
+        return {"done": len(self.done), "total": self.total, "failed": self.failed}
+
+    def _take(self, slot):
+        """Pop units worth about ``shard_seconds`` on this agent."""
+        units = [self.pending.popleft()]
+        budget = self.shard_seconds / max(slot.expected_latency, 0.01) - units[0].size
+        while self.pending and budget >= self.pending[0].size:
+            if self.pending[0].employees != units[0].employees:
+                break
+            unit = self.pending.popleft()
+            budget -= unit.size
+            units.append(unit)
+        return units
+
+    def _assign(self, slot, now):
+        units = self._take(slot)
+        dates = [u.date for u in units]
+        try:
+            slot.job_id = slot.client.submit(dates, self.ref_date, units[0].employees, self.profile)
+        except AgentError as e:
+            for unit in units:
+                unit.attempts += 1
+            self._requeue(units)
+            self._mark_down(slot, now, f"작업 전달 실패: {e}")
+            return
+        slot.units = units
+        slot.reported = 0
+        slot.last_progress = now
+        for unit in units:
+            unit.attempts += 1
+        self.log(f"{slot.client.url}: 날짜 {len(dates)}개 전달 ({dates[0]} ~ {dates[-1]})")
+
+    def _poll(self, slot, now):
+        try:
+            status = slot.client.status(slot.job_id)
+        except AgentError as e:
+            self._abandon(slot, f"상태 조회 실패: {e}")
+            return
+        items = status.get("items", [])
+        if len(items) > slot.reported:
+            new = items[slot.reported:]
+            sample = (now - slot.last_progress) / len(new)
+            slot.measure(sample)
+            slot.reported = len(items)
+            slot.last_progress = now
+            for employee, date in new:
+                self._record(slot, employee, date)
+        if status["state"] == "done":
+            self._release(slot)
+        elif status["state"] in ("failed", "cancelled"):
+            self._abandon(slot, f"작업 {status['state']}: {status.get('error')}")
+        elif now - slot.last_progress > max(self.min_stall,
+                                            self.stall_factor * slot.expected_latency):
+            self._abandon(slot, f"{now - slot.last_progress:.0f}초 동안 진행 없음")
+
+    def _record(self, slot, employee, date):
+        unit = next((u for u in slot.units if u.date == date), None)
+        key = (employee if unit is not None and unit.employees else "", date)
+        if key in self.done:
+            return
+        self.done.add(key)
+        slot.items_done += 1
+        if self.ledger is not None:
+            self.ledger.mark_done(date, self.ref_date, key[0])
+        if self.progress is not None:
+            elapsed = self.clock() - self.started
+            finished = len(self.done)
+            self.progress(finished, self.total, elapsed / finished * (self.total - finished))
+
+    def _remaining(self, units):
+        """Units (or their unfinished employees) not yet reported done."""
+        left = []
+        for unit in units:
+            if unit.employees:
+                todo = [e for e in unit.employees if (_name(e), unit.date) not in self.done]
+                if todo:
+                    rest = Unit(unit.date, todo)
+                    rest.attempts = unit.attempts
+                    left.append(rest)
+            elif ("", unit.date) not in self.done:
+                left.append(unit)
+        return left
+
+    def _release(self, slot):
+        left = self._remaining(slot.units)
+        slot.job_id, slot.units = None, []
+        if left:
+            self._requeue(left)
+
+    def _abandon(self, slot, reason, requeue=True):
+        try:
+            slot.client.cancel(slot.job_id)
+        except AgentError:
+            pass
+        left = self._remaining(slot.units)
+        slot.job_id, slot.units = None, []
+        if requeue:
+            self._requeue(left)
+            self._mark_down(slot, self.clock(), reason)
+
+    def _requeue(self, units):
+        keep = []
+        for unit in units:
+            if unit.attempts >= self.max_attempts:
+                self.failed.append(unit.date)
+                self.log(f"날짜 {unit.date} 는 {unit.attempts}회 실패해 제외합니다.", "ERROR")
+            else:
+                keep.append(unit)
+        self.pending.extendleft(reversed(keep))
+
+    def _mark_down(self, slot, now, reason):
+        slot.failures += 1
+        slot.down_until = now + self.retry_after
+        self.log(f"{slot.client.url}: {reason} - {self.retry_after:.0f}초 후 다시 시도합니다.",
+                 "WARNING")
+
+
+def start_local_agents(count, seconds_per_item=0.5):
+    """Start ``count`` in-process stand-in agents; returns (clients, servers)."""
+    from tnl_agent import JobQueue, StandInExecutor, create_server
+
+    clients, servers = [], []
+    for i in range(count):
+        # 에이전트마다 속도를 다르게 두어 부하 분산을 확인한다
+        queue = JobQueue(StandInExecutor(seconds_per_item * (i + 1))).start()
+        server = create_server(queue, port=0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        clients.append(AgentClient(f"http://127.0.0.1:{server.server_port}"))
+    return clients, servers
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="여러 에이전트로 T&L 복사 작업 분배")
+    parser.add_argument("--agent", action="append", default=[], help="에이전트 URL (여러 번)")
+    parser.add_argument("--token", help="에이전트 X-Agent-Token")
+    parser.add_argument("--local", type=int, default=0, help="로컬 대역 에이전트 수 (시험용)")
+    parser.add_argument("--dates", nargs="+", required=True, help="처리할 날짜")
+    parser.add_argument("--ref-date", required=True, help="복사 기준일자")
+    parser.add_argument("--employees", help="사원 목록 JSON 파일 (tnl_batch 형식)")
+    parser.add_argument("--profile", help="에이전트에서 쓸 타이밍 프로필")
+    parser.add_argument("--shard-seconds", type=float, default=120.0, help="조각당 목표 처리 시간")
+    parser.add_argument("--ledger", help="통합 완료 기록 원장 (--local 이면 기본값은 임시 파일)")
+    args = parser.parse_args(argv)
+    if not args.ledger:
+        if not args.local:
+            parser.error("--ledger 가 필요합니다 (매크로와 같은 원장이면 바탕화면의 "
+                         "tnlcopy_ledger.sqlite3).")
+        # 대역 에이전트의 가짜 완료 기록이 실제 원장에 남지 않도록 임시 원장 사용
+        args.ledger = os.path.join(tempfile.mkdtemp(prefix="tnl_dispatch_"), "ledger.sqlite3")
+
+    servers = []
+    agents = [AgentClient(url, args.token) for url in args.agent]
+    if args.local:
+        clients, servers = start_local_agents(args.local)
+        agents += clients
+    if not agents:
+        parser.error("--agent 또는 --local 이 필요합니다.")
+    employees = None
+    if args.employees:
+        with open(args.employees, "r", encoding="utf-8") as f:
+            employees = json.load(f)
+
+    def progress(done, total, eta):
+        print(f"\r진행 {done}/{total}  남은 시간 약 {eta:.0f}초   ", end="", flush=True)
+
+    ledger = Ledger(args.ledger)
+    shard_seconds = args.shard_seconds if not args.local else 3.0
+    dispatcher = Dispatcher(agents, args.ref_date, ledger, args.profile, shard_seconds,
+                            min_stall=5.0 if args.local else 30.0, progress=progress,
+                            log=lambda message, level="INFO": print(f"\n[{level}] {message}"))
+    try:
+        result = dispatcher.run(args.dates, employees)
+    finally:
+        ledger.close()
+        for server in servers:
+            server.shutdown()
+    print()
+    for slot in dispatcher.slots:
+        latency = f"{slot.latency:.2f}s" if slot.latency is not None else "-"
+        print(f"{slot.client.url:<28}완료 {slot.items_done:>4}  항목당 {latency}  "
+              f"실패 {slot.failures}")
+    print(f"전체 {result['done']}/{result['total']}  실패 날짜 {result['failed'] or '-'}")
+    return 1 if result["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
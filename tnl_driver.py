@@ -0,0 +1,276 @@
+"""입력 드라이버 계층.
+
+work_process 의 모든 마우스/키보드/화면 캡처 동작은 이 인터페이스를 거친다.
+실제 ERP 에는 PyAutoGUIDriver 를, 로컬 실행/측정에는 tnl_fake_erp 의
+FakeERPDriver 를 연결한다.
+"""
+
+import functools
+import sys
+import threading
+
+
+class InputDriver:
+    """Minimal set of desktop actions the macro needs."""
+
+    def click(self, x, y):
+        raise NotImplementedError
+
+    def hotkey(self, *keys):
+        raise NotImplementedError
+
+    def press(self, key):
+        raise NotImplementedError
+
+    def type(self, text, interval=0.0):
+        raise NotImplementedError
+
+    def screenshot(self, region):
+        """Return a PIL image of ``region`` (left, top, width, height)."""
+        raise NotImplementedError
+
+    def screen_bounds(self):
+        """(left, top, width, height) of the whole desktop (all monitors)."""
+        raise NotImplementedError
+
+    def screen_layout(self, window_title=None):
+        """Monitors, DPI scale and ERP window rect (see tnl_calibration)."""
+        return {"monitors": [self.screen_bounds()], "dpi": 1.0, "window": None}
+
+    def get_clipboard(self):
+        raise NotImplementedError
+
+    def set_clipboard(self, text):
+        raise NotImplementedError
+
+
+# mss 가 있으면 어느 OS 에서든 요청한 영역만 캡처한다 (스레드마다 인스턴스 하나)
+_mss = threading.local()
+
+
+def grab_screen_region(region):
+    """Capture only ``region`` (left, top, width, height) across all monitors.
+
+    Uses mss when installed, else a BitBlt of just the region on Windows.
+    Pillow's ImageGrab (which grabs the whole screen and crops) is the
+    last resort.
+    """
+    left, top, width, height = (int(v) for v in region)
+    if _have_mss():
+        return _grab_mss(left, top, width, height)
+    if sys.platform == "win32":
+        return _grab_bitblt(left, top, width, height)
+    from PIL import ImageGrab
+
+    return ImageGrab.grab(bbox=(left, top, left + width, top + height))
+
+
+@functools.lru_cache(maxsize=None)
+def _have_mss():
+    import importlib.util
+
+    return importlib.util.find_spec("mss") is not None
+
+
+def _grab_mss(left, top, width, height):
+    from PIL import Image
+
+    sct = getattr(_mss, "sct", None)
+    if sct is None:
+        import mss
+
+        sct = _mss.sct = mss.mss()
+    shot = sct.grab({"left": left, "top": top, "width": width, "height": height})
+    return Image.frombytes("RGB", shot.size, shot.bgra, "raw", "BGRX")
+
+
+def _grab_bitblt(left, top, width, height):
+    import ctypes
+    from ctypes import wintypes
+
+    from PIL import Image
+
+    class BITMAPINFOHEADER(ctypes.Structure):
+        _fields_ = [("biSize", wintypes.DWORD), ("biWidth", wintypes.LONG),
+                    ("biHeight", wintypes.LONG), ("biPlanes", wintypes.WORD),
+                    ("biBitCount", wintypes.WORD), ("biCompression", wintypes.DWORD),
+                    ("biSizeImage", wintypes.DWORD), ("biXPelsPerMeter", wintypes.LONG),
+                    ("biYPelsPerMeter", wintypes.LONG), ("biClrUsed", wintypes.DWORD),
+                    ("biClrImportant", wintypes.DWORD)]
+
+    user32, gdi32 = ctypes.windll.user32, ctypes.windll.gdi32
+    # 64비트에서 핸들이 잘리지 않도록 반환/인자 형식을 지정
+    user32.GetDC.restype = wintypes.HDC
+    user32.ReleaseDC.argtypes = (wintypes.HWND, wintypes.HDC)
+    gdi32.CreateCompatibleDC.restype = wintypes.HDC
+    gdi32.CreateCompatibleDC.argtypes = (wintypes.HDC,)
+    gdi32.CreateCompatibleBitmap.restype = wintypes.HBITMAP
+    gdi32.CreateCompatibleBitmap.argtypes = (wintypes.HDC, ctypes.c_int, ctypes.c_int)
+    gdi32.SelectObject.restype = wintypes.HGDIOBJ
+    gdi32.SelectObject.argtypes = (wintypes.HDC, wintypes.HGDIOBJ)
+    gdi32.BitBlt.argtypes = (wintypes.HDC, ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_int,
+                             wintypes.HDC, ctypes.c_int, ctypes.c_int, wintypes.DWORD)
+    gdi32.GetDIBits.argtypes = (wintypes.HDC, wintypes.HBITMAP, wintypes.UINT, wintypes.UINT,
+                                ctypes.c_void_p, ctypes.c_void_p, wintypes.UINT)
+    gdi32.DeleteObject.argtypes = (wintypes.HGDIOBJ,)
+    gdi32.DeleteDC.argtypes = (wintypes.HDC,)
+
+    # 화면 DC 는 가상 화면 좌표를 쓰므로 보조 모니터(x=4807 등) 영역도 그대로 복사된다
+    screen = user32.GetDC(None)
+    dc = gdi32.CreateCompatibleDC(screen)
+    bitmap = gdi32.CreateCompatibleBitmap(screen, width, height)
+    try:
+        previous = gdi32.SelectObject(dc, bitmap)
+        # SRCCOPY | CAPTUREBLT (겹친 창도 포함)
+        gdi32.BitBlt(dc, 0, 0, width, height, screen, left, top, 0x00CC0020 | 0x40000000)
+        gdi32.SelectObject(dc, previous)
+        # 높이를 음수로 주면 위에서 아래 순서의 32비트 BGRX 행
+        header = BITMAPINFOHEADER(ctypes.sizeof(BITMAPINFOHEADER), width, -height, 1, 32, 0,
+                                  0, 0, 0, 0, 0)
+        data = ctypes.create_string_buffer(width * height * 4)
+        if not gdi32.GetDIBits(dc, bitmap, 0, height, data, ctypes.byref(header), 0):
+            raise OSError("GetDIBits 실패")
+    finally:
+        gdi32.DeleteObject(bitmap)
+        gdi32.DeleteDC(dc)
+        user32.ReleaseDC(None, screen)
+    return Image.frombuffer("RGB", (width, height), data, "raw", "BGRX", 0, 1)
+
+
+def virtual_screen_bounds(pyautogui=None):
+    """Desktop bounds spanning every monitor (primary screen off Windows)."""
+    if sys.platform == "win32":
+        import ctypes
+
+        metrics = ctypes.windll.user32.GetSystemMetrics
+        # SM_XVIRTUALSCREEN, SM_YVIRTUALSCREEN, SM_CXVIRTUALSCREEN, SM_CYVIRTUALSCREEN
+        return (metrics(76), metrics(77), metrics(78), metrics(79))
+    width, height = pyautogui.size()
+    return (0, 0, width, height)
+
+
+def monitor_rects():
+    """(left, top, width, height) of each monitor; None off Windows."""
+    if sys.platform != "win32":
+        return None
+    import ctypes
+    from ctypes import wintypes
+
+    rects = []
+    proc = ctypes.WINFUNCTYPE(ctypes.c_int, wintypes.HMONITOR, wintypes.HDC,
+                              ctypes.POINTER(wintypes.RECT), wintypes.LPARAM)
+
+    def callback(monitor, dc, rect, data):
+        r = rect.contents
+        rects.append((r.left, r.top, r.right - r.left, r.bottom - r.top))
+        return 1
+
+    ctypes.windll.user32.EnumDisplayMonitors(None, None, proc(callback), 0)
+    return sorted(rects)
+
+
+def dpi_scale(hwnd=None):
+    """DPI scale (1.0 = 100%) of window ``hwnd``, else of the system; 1.0 off Windows."""
+    if sys.platform != "win32":
+        return 1.0
+    import ctypes
+
+    user32 = ctypes.windll.user32
+    # 모니터마다 배율이 다르면 창이 있는 모니터의 배율이 시스템 배율과 다르다
+    if hwnd:
+        try:
+            dpi = user32.GetDpiForWindow(hwnd)
+            if dpi:
+                return dpi / 96.0
+        except AttributeError:  # Windows 10 1607 이전
+            pass
+    try:
+        return user32.GetDpiForSystem() / 96.0
+    except AttributeError:  # Windows 8.1 이전
+        return 1.0
+
+
+def find_window(title):
+    """(hwnd, rect) of the first visible window whose title contains ``title``."""
+    if sys.platform != "win32" or not title:
+        return None
+    import ctypes
+    from ctypes import wintypes
+
+    user32 = ctypes.windll.user32
+    found = []
+    proc = ctypes.WINFUNCTYPE(wintypes.BOOL, wintypes.HWND, wintypes.LPARAM)
+
+    def callback(hwnd, data):
+        if not user32.IsWindowVisible(hwnd) or user32.IsIconic(hwnd):
+            return True
+        length = user32.GetWindowTextLengthW(hwnd)
+        if not length:
+            return True
+        buffer = ctypes.create_unicode_buffer(length + 1)
+        user32.GetWindowTextW(hwnd, buffer, length + 1)
+        if title not in buffer.value:
+            return True
+        rect = wintypes.RECT()
+        user32.GetWindowRect(hwnd, ctypes.byref(rect))
+        found.append((hwnd, (rect.left, rect.top, rect.right - rect.left, rect.bottom - rect.top)))
+        return False
+
+    user32.EnumWindows(proc(callback), 0)
+    return found[0] if found else None
+
+
+def window_rect(title):
+    """Rect of the first visible window whose title contains ``title``."""
+    found = find_window(title)
+    return found[1] if found else None
+
+
+class PyAutoGUIDriver(InputDriver):
+    """Drives the real desktop through pyautogui."""
+
+    def __init__(self, pyautogui):
+        self.pyautogui = pyautogui
+
+    @property
+    def pause(self):
+        # 동작마다 pyautogui 가 자동으로 넣는 대기 (pyautogui.PAUSE)
+        return self.pyautogui.PAUSE
+
+    @pause.setter
+    def pause(self, seconds):
+        self.pyautogui.PAUSE = seconds
+
+    def click(self, x, y):
+        self.pyautogui.click(x, y)
+
+    def hotkey(self, *keys):
+        self.pyautogui.hotkey(*keys)
+
+    def press(self, key):
+        self.pyautogui.press(key)
+
+    def type(self, text, interval=0.0):
+        self.pyautogui.typewrite(text, interval=interval)
+
+    def screenshot(self, region):
+        return grab_screen_region(region)
+
+    def screen_bounds(self):
+        return virtual_screen_bounds(self.pyautogui)
+
+    def screen_layout(self, window_title=None):
+        # pyautogui 는 import 시 프로세스를 DPI 인식 모드로 바꾸므로 먼저 불러 둔다
+        self.pyautogui.size()
+        hwnd, rect = find_window(window_title) or (None, None)
+        return {"monitors": monitor_rects() or [self.screen_bounds()],
+                "dpi": dpi_scale(hwnd), "window": rect}
+
+    def get_clipboard(self):
+        # pyperclip 은 pyautogui 의 의존 패키지
+        import pyperclip
+        return pyperclip.paste()
+
+    def set_clipboard(self, text):
+        import pyperclip
+        pyperclip.copy(text)
@@ -0,0 +1,318 @@
+"""T&L 복사 작업 실행 엔진.
+
+tnl_workflow 로 컴파일한 실행 계획을 InputDriver 로 실행한다.
+TNLMacro.work_process, tnlcopy4, 벤치마크가 모두 이 엔진을 쓴다.
+GUI 에 의존하지 않는다.
+
+verify=True 이면 각 단계의 대기 조건(감시 영역의 화면 변화)을 그 단계의
+성공 조건으로 본다. 조건이 충족되지 않으면 그 단계만(또는 retry_from 으로
+지정한 단계부터) 다시 실행하고, 재시도 횟수(retries)를 넘기면 StepFailed 로
+그 날짜를 실패 처리한다.
+
+recovery(tnl_recovery.Recovery)를 주면 키를 누르는 단계 직전, 단계 확인 실패 때,
+날짜를 마친 뒤 등록된 ERP 팝업을 찾아 처리하고, 날짜가 실패하면 화면을 기준
+상태로 되돌린 뒤 StepFailed 를 올린다.
+
+recorder(tnl_replay.Recorder)를 주면 모든 입력과 화면 캡처를 녹화해 ERP 없이
+재생할 수 있게 한다.
+"""
+
+import logging
+import time
+from contextlib import contextmanager, nullcontext
+
+from tnl_capture import CaptureService
+from tnl_control import ControlledDriver
+from tnl_entry import EntryError, enter_text, entry_settings
+from tnl_trace import NullTracer, TracingDriver
+from tnl_workflow import DEFAULT_WORKFLOW, compile_workflow
+from tnl_wait import (RegionProbe, bounding_region, clip_region, image_signature, region_around,
+                      wait_settings, wait_until)
+
+# 날짜별 단계 이름 (벤치마크 단계별 분석에 사용)
+STEPS = ["date_entry", "query", "select", "ref_copy", "copy", "confirm"]
+
+# 단계 확인 실패 시 기본 재시도 횟수 (작업 순서의 retries 로 단계별 지정).
+# 키 누르기(press)는 같은 키를 다시 보내면 포커스된 곳으로 가므로 기본 0
+DEFAULT_RETRIES = 1
+PRESS_RETRIES = 0
+
+
+class StepFailed(Exception):
+    """A step's postcondition still failed after its retries."""
+
+    def __init__(self, step, date):
+        super().__init__(f"{step} 단계 확인 실패")
+        self.step = step
+        self.date = date
+
+
+class CopyRunner:
+    """Executes a compiled workflow plan against one set of coordinates.
+
+    ``step_times`` holds the duration of each step of the last processed
+    date, keyed by step name (the two confirmations add up in "confirm").
+    With a ``tracer`` every step, input, sleep and wait is also written as
+    a span record. With ``verify`` a step whose wait times out is retried
+    and ``run_ops`` raises StepFailed once its retries are used up (an
+    entry that still reads back wrong fails its date the same way);
+    ``retried`` lists the steps retried for the last date. A ``recovery``
+    handles registered popups and restores the screen before a date fails.
+    A ``recorder`` records every input and grab for offline replay.
+    ``bounds`` is the (left, top, width, height) rect of the ERP window;
+    probe regions not given in ``wait_regions`` are clipped to it.
+    """
+
+    def __init__(self, driver, coords, waits=None, wait_regions=None, log=None, tracer=None,
+                 entry_modes=None, workflow=None, locator=None, capture=None, input_slot=None,
+                 control=None, verify=False, recovery=None, recorder=None, bounds=None):
+        self.tracer = tracer or NullTracer()
+        # 녹화는 실제 드라이버에 가장 가깝게 (중단 확인/트레이스 바깥 동작은 제외)
+        self.recorder = recorder
+        if recorder is not None:
+            driver = recorder.wrap(driver)
+        # 중단/일시정지: 입력 직전마다 확인하고, 모든 대기는 중단 즉시 깨어난다
+        self.control = control
+        self.sleep = control.sleep if control is not None else time.sleep
+        if control is not None:
+            driver = ControlledDriver(driver, control)
+        if tracer is not None:
+            driver = TracingDriver(driver, tracer, pause=getattr(driver, "pause", 0.0))
+        self.driver = driver
+        # 감시 영역과 위치 탐색이 같은 단계 안에서 캡처를 공유한다
+        self.capture = capture or CaptureService(driver.screenshot)
+        self.coords = dict(coords)
+        self.waits = waits or {}
+        self.wait_regions = wait_regions or {}
+        self.entry_modes = entry_modes or {}
+        self.bounds = tuple(bounds) if bounds else None
+        self.locator = locator
+        # 대상별 클릭 위치 보정 (일괄 처리의 사원 행 등)
+        self.offsets = {}
+        # 여러 창을 함께 돌릴 때 입력 구간만 직렬화 (tnl_scheduler)
+        self.input_slot = input_slot or _no_slot
+        self.log = log or _default_log
+        self.verify = verify
+        self.recovery = recovery
+        self.step_times = {}
+        self.retried = []
+        self._span = None
+
+        self.loading = self.load_loading(self.wait_regions.get("loading") or {})
+        self.build_probes()
+        self.plan = compile_workflow(workflow or DEFAULT_WORKFLOW)
+        self.values = {"ref_date": None, "date": None}
+        if recorder is not None:
+            recorder.describe(coords={k: list(v) for k, v in self.coords.items()},
+                              waits=self.waits, wait_regions=self.wait_regions,
+                              entry_modes=self.entry_modes, workflow=workflow,
+                              pause=getattr(self.driver, "pause", 0.0),
+                              bounds=list(self.driver.screen_bounds()))
+
+    def build_probes(self):
+        # 조회 결과 그리드: 사원 선택란 주변 영역
+        grid_region = self.wait_regions.get("grid") or region_around(
+            self.coords["사원 선택란"], 600, 240)
+        # 확인 팝업: 설정된 좌표 전체를 감싸는 ERP 화면 영역
+        popup_region = self.wait_regions.get("popup") or bounding_region(
+            list(self.coords.values()), pad=300)
+        # 기본 영역은 이 창 밖(옆 창)까지 덮지 않도록 창 영역으로 자른다
+        if self.bounds is not None:
+            if "grid" not in self.wait_regions:
+                grid_region = clip_region(grid_region, self.bounds)
+            if "popup" not in self.wait_regions:
+                popup_region = clip_region(popup_region, self.bounds)
+        self.probes = {
+            "grid": RegionProbe(self.capture.grab, grid_region, loading=self.loading.get("grid")),
+            "popup": RegionProbe(self.capture.grab, popup_region, loading=self.loading.get("popup")),
+        }
+
+    def load_loading(self, images):
+        """{probe: [signature]} of the loading placeholders in wait_regions.loading."""
+        loading = {}
+        for probe, paths in images.items():
+            for path in paths:
+                try:
+                    loading.setdefault(probe, []).append(image_signature(path))
+                except OSError as e:
+                    self.log(f"로딩 화면 이미지를 불러오지 못했습니다: {path} ({e})", "WARNING")
+        return loading
+
+    def target_xy(self, target):
+        """Click position of ``target``: located on screen if possible."""
+        xy = tuple(self.coords[target])
+        if self.locator is not None:
+            found = self.locator.locate(target, hint=xy)
+            if found is not None and (abs(found[0] - xy[0]) > 3 or abs(found[1] - xy[1]) > 3):
+                # ERP 창이 움직였으면 감시 영역도 새 위치 기준으로 다시 잡는다
+                self.log(f"{target} 위치 변경: {xy} -> {found}")
+                self.coords[target] = found
+                self.build_probes()
+            xy = found or xy
+        dx, dy = self.offsets.get(target, (0, 0))
+        return (xy[0] + dx, xy[1] + dy)
+
+    @contextmanager
+    def timed(self, step, target=None):
+        fields = {}
+        if target is not None:
+            fields["target"] = [target, list(self.coords[target])]
+        outer = self.tracer.context.get("step")
+        self.tracer.context["step"] = step
+        start = time.perf_counter()
+        try:
+            with self.tracer.span("step", step, **fields) as span:
+                self._span = span
+                yield span
+        finally:
+            elapsed = time.perf_counter() - start
+            self.step_times[step] = self.step_times.get(step, 0.0) + elapsed
+            self.tracer.context["step"] = outer
+            self._span = None
+
+    def wait_step(self, step, condition=None, timeout=None, settle=None):
+        default_timeout, default_settle = wait_settings(self.waits, step)
+        timeout = default_timeout if timeout is None else timeout
+        settle = default_settle if settle is None else settle
+        with self.tracer.span("wait", step, timeout=timeout, settle=settle) as span:
+            ok = wait_until(condition, timeout=timeout, settle=settle, sleep=self.sleep)
+            if not ok:
+                span["outcome"] = "timeout"
+        if not ok:
+            if self._span is not None:
+                self._span["outcome"] = "timeout"
+            if not self.verify:
+                self.log(f"{step} 대기 시간 초과 ({timeout}초), 다음 단계로 진행합니다.", "WARNING")
+        return ok
+
+    def pause_for(self, seconds):
+        self.tracer.sleep(seconds, sleep=self.sleep)
+
+    def enter_field(self, target, text):
+        self.driver.click(*self.target_xy(target))
+        self.wait_step("focus")
+        cfg = entry_settings(self.entry_modes, target)
+        used = enter_text(self.driver, text, cfg["strategy"], cfg["verify"], cfg["interval"],
+                          sleep=self.pause_for)
+        if used != cfg["strategy"]:
+            self.log(f"{target} 입력 확인 실패로 {used} 방식으로 다시 입력했습니다.", "WARNING")
+        self.wait_step("entry")
+
+    def run_op(self, op, values):
+        """Run one op; False when its wait condition timed out."""
+        kind = op["op"]
+        target = op.get("target")
+        probe = self.probes.get(op.get("probe"))
+        with self.timed(op["step"], target):
+            if kind == "sleep":
+                self.pause_for(op["seconds"])
+            else:
+                # press 는 포커스된 창으로 가므로 입력 전에 이 창을 활성화해야 한다
+                with self.input_slot(kind == "press"):
+                    if probe is not None:
+                        probe.rebase()
+                    if kind == "enter":
+                        self.enter_field(target, op["text"].format(**values))
+                    elif kind in ("click", "focus"):
+                        self.driver.click(*self.target_xy(target))
+                    elif kind == "press":
+                        self.driver.press(op["key"])
+            self.capture.invalidate()
+            ok = True
+            if op.get("wait"):
+                ok = self.wait_step(op["wait"], probe.settled_after_change if probe else None,
+                                    op.get("timeout"), op.get("settle"))
+            if op["after"]:
+                self.pause_for(op["after"])
+        return ok
+
+    def setup(self, ref_date):
+        # 루프 밖으로 올려진 단계 (복사 기준일자 입력 등) 를 한 번만 실행
+        self.values = {"ref_date": ref_date, "date": None}
+        self.tracer.context["date"] = None
+        if self.recorder is not None:
+            self.recorder.mark("setup", ref_date=ref_date)
+        for op in self.plan.setup:
+            self.run_op(op, self.values)
+
+    def process_date(self, date):
+        if self.recorder is not None:
+            self.recorder.mark("date", date=date)
+        return self.run_ops(self.plan.loop, date)
+
+    def run_ops(self, ops, date, **values):
+        """Run ``ops`` for ``date``; extra ``values`` fill {placeholders}."""
+        self.step_times = {}
+        self.retried = []
+        self.values.update(values, date=date)
+        self.tracer.context["date"] = date
+        attempts = {}
+        i = 0
+        try:
+            while i < len(ops):
+                op = ops[i]
+                if op["op"] == "press":
+                    # 엉뚱한 팝업을 확인하지 않도록 누르기 전에 등록된 팝업부터 처리
+                    self.check_popups(date)
+                try:
+                    ok = self.run_op(op, self.values)
+                except EntryError as e:
+                    # 다시 입력해도 값이 다르면 그 날짜만 실패 처리하고 다음 날짜로
+                    self.log(f"{date} {op['step']} 단계 {e}", "ERROR")
+                    self.fail(op, date)
+                if ok or not self.verify or self.passed_late(op):
+                    i += 1
+                    continue
+                # 예상하지 못한 팝업이 단계를 가로막았으면 닫고 재시도
+                self.check_popups(date)
+                retries = op.get("retries", PRESS_RETRIES if op["op"] == "press"
+                                 else DEFAULT_RETRIES)
+                if attempts.get(i, 0) >= retries:
+                    self.log(f"{date} {op['step']} 단계 확인 실패 (재시도 {retries}회)", "ERROR")
+                    self.fail(op, date)
+                attempts[i] = attempts.get(i, 0) + 1
+                start = self.retry_start(ops, i)
+                self.log(f"{op['step']} 단계 확인 실패, {ops[start]['step']} 단계부터 다시 실행합니다 "
+                         f"({attempts[i]}/{retries})", "WARNING")
+                self.retried.append(op["step"])
+                i = start
+            # 마지막 확인 뒤에 뜬 오류 팝업 (중복 데이터 등)
+            self.check_popups(date)
+        finally:
+            self.tracer.flush()
+        return self.step_times
+
+    def fail(self, op, date):
+        """Restore the screen (with a recovery) and raise StepFailed."""
+        if self.recovery is not None:
+            self.recovery.restore()
+        raise StepFailed(op["step"], date)
+
+    def check_popups(self, date):
+        """Handle a registered popup in the popup region (see tnl_recovery)."""
+        if self.recovery is None:
+            return None
+        return self.recovery.handle(date, self.probes["popup"].region)
+
+    def passed_late(self, op):
+        # 대기 시간이 지난 뒤에야 화면이 바뀐 경우(느린 조회 등)는 다시 누르지 않는다
+        probe = self.probes.get(op.get("probe"))
+        return probe is not None and probe.changed()
+
+    @staticmethod
+    def retry_start(ops, i):
+        """Index to restart from when ``ops[i]`` fails (its retry_from step)."""
+        name = ops[i].get("retry_from")
+        if name:
+            for j in range(i, -1, -1):
+                if ops[j]["step"] == name:
+                    return j
+        return i
+
+
+def _no_slot(needs_focus=False):
+    return nullcontext()
+
+
+def _default_log(message, level="INFO"):
+    logging.log(getattr(logging, level, logging.INFO), message)
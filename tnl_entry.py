@@ -0,0 +1,92 @@
+"""입력란 텍스트 입력 전략.
+
+    keys      : 글자마다 press + 0.1초 대기 (기존 방식, 기본값, 가장 느림)
+    typewrite : typewrite 한 번으로 전체 입력
+    paste     : 클립보드에 넣고 ctrl+v
+
+verify 를 켜면 입력 후 ctrl+a, ctrl+c 로 입력란 내용을 읽어 확인하고,
+다르면 keys 방식으로 한 번 더 입력한다. 그래도 다르면 EntryError 이고,
+실행 엔진은 그 날짜를 실패 처리한다. 빠른 방식은 입력란별로 설정 파일의
+'entry_modes' 에서 켠다:
+
+    "entry_modes": {"일자 입력란": {"strategy": "paste", "verify": true}}
+"""
+
+import re
+import time
+
+STRATEGIES = ("keys", "typewrite", "paste")
+
+DEFAULT_ENTRY = {"strategy": "keys", "verify": False, "interval": 0.0}
+
+# keys 방식의 글자 사이 대기 (초)
+KEY_INTERVAL = 0.1
+
+
+class EntryError(Exception):
+    """The field content still differs from the text after the fallback."""
+
+
+def entry_settings(entry_modes, field):
+    cfg = dict(DEFAULT_ENTRY)
+    cfg.update((entry_modes or {}).get(field, {}))
+    if cfg["strategy"] not in STRATEGIES:
+        raise ValueError(f"알 수 없는 입력 방식: {cfg['strategy']}")
+    return cfg
+
+
+def _normalize(text):
+    # ERP 날짜 입력란은 구분자 표시가 다를 수 있으므로 영숫자만 비교
+    return re.sub(r"[^0-9A-Za-z]", "", text or "")
+
+
+def write_text(driver, text, strategy, interval=0.0, sleep=time.sleep):
+    """Replace the focused field's content with ``text``."""
+    driver.hotkey('ctrl', 'a')
+    driver.press('delete')
+    if strategy == "keys":
+        for char in text:
+            driver.press(char)
+            sleep(interval or KEY_INTERVAL)
+    elif strategy == "typewrite":
+        driver.type(text, interval=interval)
+    elif strategy == "paste":
+        driver.set_clipboard(text)
+        driver.hotkey('ctrl', 'v')
+    else:
+        raise ValueError(f"알 수 없는 입력 방식: {strategy}")
+
+
+def read_back(driver):
+    """Copy the focused field's content through the clipboard."""
+    driver.set_clipboard("")
+    driver.hotkey('ctrl', 'a')
+    driver.hotkey('ctrl', 'c')
+    return driver.get_clipboard()
+
+
+def enter_text(driver, text, strategy="keys", verify=False, interval=0.0,
+               sleep=time.sleep):
+    """Type ``text`` into the focused field, optionally verifying it.
+
+    Returns the strategy that produced the verified value. Raises
+    EntryError when verification fails even with the ``keys`` fallback.
+    """
+    uses_clipboard = verify or strategy == "paste"
+    saved = driver.get_clipboard() if uses_clipboard else None
+    try:
+        write_text(driver, text, strategy, interval, sleep)
+        if not verify:
+            return strategy
+        got = read_back(driver)
+        if _normalize(got) == _normalize(text):
+            return strategy
+        if strategy != "keys":
+            write_text(driver, text, "keys", sleep=sleep)
+            got = read_back(driver)
+            if _normalize(got) == _normalize(text):
+                return "keys"
+        raise EntryError(f"입력 확인 실패: {text!r} 입력, 읽은 값 {got!r}")
+    finally:
+        if uses_clipboard and saved is not None:
+            driver.set_clipboard(saved)
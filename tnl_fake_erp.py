@@ -0,0 +1,556 @@
+"""T&L ERP 모의 화면 (Tk).
+
+실제 ERP 없이 work_process 를 실행하고 측정하기 위한 가짜 T&L 화면이다.
+일자 입력란, 조회 버튼, 사원 그리드, 복사 기준일자 입력란, 이전실적복사
+버튼과 확인 팝업을 갖고, 각 반응 지연은 설정할 수 있다.
+
+실제 ERP 처럼 복사 버튼은 메인 화면에 없고 이전실적복사 팝업 안에만 있다.
+이전실적복사를 확인하면 팝업이 열리고, 복사를 확인하거나 escape 를 누르면
+닫힌다. 팝업이 닫혀 있을 때 복사 버튼 좌표를 클릭하면 아무 일도 없다.
+Linux 에서는 Xvfb 위에서 실행한다:
+
+    xvfb-run -a python tnl_fake_erp.py --query 0.8 --popup 0.2
+"""
+
+import argparse
+import os
+import queue
+import random
+import threading
+import time
+import tkinter as tk
+from datetime import datetime
+from tkinter import ttk
+
+from tnl_driver import InputDriver, grab_screen_region
+
+# 동작별 기본 반응 지연 (초)
+DEFAULT_LATENCY = {
+    "query": 0.8,   # 조회 클릭 → 그리드 표시
+    "popup": 0.2,   # 버튼 클릭 → 확인 팝업 표시
+    "commit": 0.3,  # 팝업 확인 → 처리 완료
+}
+
+DEFAULT_EMPLOYEES = ["홍길동", "김철수", "이영희", "박민수"]
+
+TARGET_LABELS = [
+    "일자 입력란",
+    "조회 버튼",
+    "복사 기준일자 입력란",
+    "사원 선택란",
+    "이전실적복사 버튼",
+    "복사 버튼",
+]
+
+
+class FakeTNLScreen:
+    """In-process stand-in for the T&L copy screen.
+
+    All widget access happens on the Tk thread; other threads go through
+    ``call``. Completed copies are collected in ``records`` as
+    (employee, date, ref_date) and rejected inputs in ``errors``.
+    """
+
+    def __init__(self, latency=None, jitter=0.0, employees=None, geometry="+0+0", seed=None):
+        self.latency = dict(DEFAULT_LATENCY)
+        self.latency.update(latency or {})
+        self.jitter = jitter
+        self.employees = list(employees or DEFAULT_EMPLOYEES)
+        self.geometry = geometry
+        self.random = random.Random(seed)
+
+        self.records = []
+        self.errors = []
+        self.queried_date = None
+        self.selected = None
+        self.armed = False
+        self.focus_entry = None
+        self.popup = None
+        self.popup_action = None
+        self.copy_dialog = None
+
+        self.root = None
+        self._closed = False
+        self._calls = queue.Queue()
+        self._ready = threading.Event()
+        self._tk_thread = None
+
+    # ---------------------------------------------------------------- 실행
+    def start(self):
+        """Run the screen on a background Tk thread and wait until it is shown."""
+        thread = threading.Thread(target=self._run, daemon=True)
+        thread.start()
+        if not self._ready.wait(10):
+            raise RuntimeError("모의 T&L 화면을 시작하지 못했습니다.")
+        return self
+
+    def _run(self):
+        self.build()
+        self._ready.set()
+        self.root.mainloop()
+        self.root.destroy()
+
+    def run(self):
+        """Run the screen on the calling thread (blocking)."""
+        self.build()
+        self._ready.set()
+        self.root.mainloop()
+
+    def stop(self):
+        if self.root is not None and not self._closed:
+            self.call(self._close)
+
+    def _close(self):
+        self._closed = True
+        self.root.quit()
+
+    def call(self, fn, *args):
+        """Execute ``fn`` on the Tk thread and return its result."""
+        if threading.current_thread() is self._tk_thread:
+            return fn(*args)
+        done = threading.Event()
+        box = {}
+        self._calls.put((fn, args, done, box))
+        done.wait()
+        if "error" in box:
+            raise box["error"]
+        return box.get("result")
+
+    def _pump(self):
+        while True:
+            try:
+                fn, args, done, box = self._calls.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                box["result"] = fn(*args)
+            except Exception as e:
+                box["error"] = e
+            done.set()
+        if not self._closed:
+            self.root.after(5, self._pump)
+
+    # ---------------------------------------------------------------- 화면 구성
+    def build(self):
+        self._tk_thread = threading.current_thread()
+        self.root = tk.Tk()
+        self.root.title("T&L (모의)")
+        self.root.geometry(self.geometry)
+        self.root.configure(background="white")
+
+        top = ttk.Frame(self.root, padding="10")
+        top.grid(row=0, column=0, sticky=(tk.W, tk.E))
+
+        ttk.Label(top, text="일자").grid(row=0, column=0, padx=(0, 5))
+        self.date_entry = ttk.Entry(top, width=12)
+        self.date_entry.grid(row=0, column=1, padx=(0, 10))
+        self.query_button = ttk.Button(top, text="조회", command=self.on_query)
+        self.query_button.grid(row=0, column=2, padx=(0, 30))
+
+        ttk.Label(top, text="복사 기준일자").grid(row=0, column=3, padx=(0, 5))
+        self.ref_entry = ttk.Entry(top, width=12)
+        self.ref_entry.grid(row=0, column=4, padx=(0, 10))
+        self.ref_copy_button = ttk.Button(top, text="이전실적복사", command=self.on_ref_copy)
+        self.ref_copy_button.grid(row=0, column=5)
+
+        self.grid = tk.Listbox(self.root, height=10, width=60, font=("맑은 고딕", 11),
+                               exportselection=False, activestyle="none")
+        self.grid.grid(row=1, column=0, padx=10, pady=(0, 10), sticky=(tk.W, tk.E))
+
+        self.status = ttk.Label(self.root, text="일자를 입력하고 조회하세요.")
+        self.status.grid(row=2, column=0, sticky=tk.W, padx=10, pady=(0, 10))
+
+        # 이전실적복사 팝업 (복사 버튼은 이 안에만 있다), 평소에는 숨겨 둔다
+        dialog = self.copy_dialog = tk.Toplevel(self.root)
+        dialog.title("이전실적복사")
+        dialog.transient(self.root)
+        frame = ttk.Frame(dialog, padding="15")
+        frame.pack(fill=tk.BOTH, expand=True)
+        self.copy_label = ttk.Label(frame, text="")
+        self.copy_label.pack(pady=(0, 10))
+        self.copy_button = ttk.Button(frame, text="복사", command=self.on_copy)
+        self.copy_button.pack()
+
+        self.root.update()
+        dialog.geometry(f"+{self.root.winfo_rootx() + 20}"
+                        f"+{self.root.winfo_rooty() + self.root.winfo_height() + 40}")
+        dialog.withdraw()
+        self.root.after(5, self._pump)
+
+    def targets(self):
+        """Screen centre of each calibration target, keyed like TNLMacro.coords."""
+        return self.call(self._targets)
+
+    def _targets(self):
+        self.root.update_idletasks()
+
+        def centre(w):
+            return (w.winfo_rootx() + w.winfo_width() // 2,
+                    w.winfo_rooty() + w.winfo_height() // 2)
+
+        g = self.grid
+        row_h = max(1, g.winfo_height() // int(g.cget("height")))
+        select_xy = (g.winfo_rootx() + g.winfo_width() // 3, g.winfo_rooty() + row_h // 2 + 2)
+        # 복사 버튼 위치는 팝업을 잠깐 열어서 잰다 (좌표 보정 때 팝업을 여는 것과 같다)
+        shown = self.copy_dialog.winfo_viewable()
+        if not shown:
+            self.show_copy_dialog()
+        copy_xy = centre(self.copy_button)
+        if not shown:
+            self.hide_copy_dialog()
+        return dict(zip(TARGET_LABELS, [
+            centre(self.date_entry),
+            centre(self.query_button),
+            centre(self.ref_entry),
+            select_xy,
+            centre(self.ref_copy_button),
+            copy_xy,
+        ]))
+
+    def window_region(self):
+        """(left, top, width, height) of the main window."""
+        return self.call(lambda: (self.root.winfo_rootx(), self.root.winfo_rooty(),
+                                  self.root.winfo_width(), self.root.winfo_height()))
+
+    def snapshot(self):
+        """Plain-data view of the current state for verification."""
+        return self.call(lambda: {
+            "date": self.date_entry.get(),
+            "ref_date": self.ref_entry.get(),
+            "queried_date": self.queried_date,
+            "selected": self.selected,
+            "armed": self.armed,
+            "popup": self.popup is not None,
+            "copy_dialog": bool(self.copy_dialog.winfo_viewable()),
+            "records": list(self.records),
+            "errors": list(self.errors),
+        })
+
+    def reset(self):
+        """Return to the initial empty screen (between benchmark/tuner runs)."""
+        self.call(self._reset)
+
+    def _reset(self):
+        self.close_popup(False)
+        self.hide_copy_dialog()
+        self.records.clear()
+        self.errors.clear()
+        self.queried_date = None
+        self.selected = None
+        self.armed = False
+        self.focus_entry = None
+        self.grid.delete(0, tk.END)
+        self.date_entry.delete(0, tk.END)
+        self.ref_entry.delete(0, tk.END)
+        self.status.config(text="일자를 입력하고 조회하세요.")
+
+    # ---------------------------------------------------------------- ERP 동작
+    def _later(self, kind, fn):
+        delay = self.latency.get(kind, 0.0)
+        if self.jitter:
+            delay *= 1 + self.random.uniform(-self.jitter, self.jitter)
+        self.root.after(max(0, int(delay * 1000)), fn)
+
+    def _error(self, message):
+        self.errors.append(message)
+        self.status.config(text=message)
+        self.open_popup(message, None)
+
+    def on_query(self):
+        date = self.date_entry.get().strip()
+        self.queried_date = None
+        self.selected = None
+        self.armed = False
+        self.grid.delete(0, tk.END)
+        self.grid.insert(tk.END, "조회 중...")
+        self.status.config(text="조회 중...")
+
+        def finish():
+            self.grid.delete(0, tk.END)
+            try:
+                datetime.strptime(date, "%Y-%m-%d")
+            except ValueError:
+                self.errors.append(f"잘못된 일자: {date!r}")
+                self.status.config(text="조회 결과가 없습니다.")
+                return
+            self.queried_date = date
+            for emp in self.employees:
+                self.grid.insert(tk.END, f"{emp}    {date}    미입력")
+            self.status.config(text=f"{date} 조회 완료 ({len(self.employees)}명)")
+
+        self._later("query", finish)
+
+    def on_ref_copy(self):
+        if self.queried_date is None or self.selected is None:
+            self._error("사원을 먼저 조회/선택하세요.")
+            return
+        ref = self.ref_entry.get().strip()
+        if not ref:
+            self._error("복사 기준일자를 입력하세요.")
+            return
+
+        def confirmed():
+            def arm():
+                self.armed = True
+                self._set_row(self.selected, f"{ref} 실적 불러옴")
+                self.copy_label.config(text=f"{self.employees[self.selected]} {ref} 실적")
+                self.show_copy_dialog()
+            self._later("commit", arm)
+
+        self._later("popup", lambda: self.open_popup(f"{ref} 실적을 복사하시겠습니까?", confirmed))
+
+    def on_copy(self):
+        if not self.armed:
+            self._error("이전실적복사를 먼저 실행하세요.")
+            return
+        emp, date, ref = self.employees[self.selected], self.queried_date, self.ref_entry.get().strip()
+
+        def confirmed():
+            def commit():
+                self.armed = False
+                self.hide_copy_dialog()
+                self.records.append((emp, date, ref))
+                self._set_row(self.selected, "복사 완료")
+                self.status.config(text=f"{emp} {date} 복사 완료")
+            self._later("commit", commit)
+
+        self._later("popup", lambda: self.open_popup("복사하시겠습니까?", confirmed))
+
+    def _set_row(self, idx, state):
+        if idx is None or idx >= self.grid.size():
+            return
+        self.grid.delete(idx)
+        self.grid.insert(idx, f"{self.employees[idx]}    {self.queried_date}    {state}")
+        self.grid.selection_set(idx)
+
+    def show_copy_dialog(self):
+        self.copy_dialog.deiconify()
+        self.copy_dialog.lift()
+        self.copy_dialog.update()
+
+    def hide_copy_dialog(self):
+        if self.copy_dialog.winfo_viewable():
+            self.copy_dialog.withdraw()
+            self.root.update()
+
+    def open_popup(self, message, on_confirm):
+        if self.popup is not None:
+            self.close_popup(False)
+        popup = tk.Toplevel(self.root)
+        popup.title("확인")
+        popup.transient(self.root)
+        frame = ttk.Frame(popup, padding="20")
+        frame.pack(fill=tk.BOTH, expand=True)
+        ttk.Label(frame, text=message).pack(pady=(0, 15))
+        buttons = ttk.Frame(frame)
+        buttons.pack()
+        ttk.Button(buttons, text="확인", command=lambda: self.close_popup(True)).pack(side=tk.LEFT, padx=5)
+        if on_confirm is not None:
+            ttk.Button(buttons, text="취소", command=lambda: self.close_popup(False)).pack(side=tk.LEFT, padx=5)
+        popup.update_idletasks()
+        x = self.root.winfo_rootx() + (self.root.winfo_width() - popup.winfo_reqwidth()) // 2
+        y = self.root.winfo_rooty() + (self.root.winfo_height() - popup.winfo_reqheight()) // 2
+        popup.geometry(f"+{x}+{y}")
+        popup.update()
+        self.popup = popup
+        self.popup_action = on_confirm
+
+    def close_popup(self, confirmed):
+        popup, action = self.popup, self.popup_action
+        self.popup = None
+        self.popup_action = None
+        if popup is not None:
+            popup.destroy()
+        if confirmed and action is not None:
+            action()
+
+    # ---------------------------------------------------------------- 입력 처리
+    def handle_click(self, x, y):
+        self.root.update_idletasks()
+        widget = self.root.winfo_containing(x, y)
+        if self.popup is not None and (widget is None or widget.winfo_toplevel() is not self.popup):
+            # 모달 팝업이 떠 있는 동안 다른 곳 클릭은 무시된다
+            self.errors.append(f"팝업이 열린 상태에서 클릭: ({x}, {y})")
+            return
+        if widget is None:
+            return
+        if isinstance(widget, (ttk.Button, tk.Button)):
+            widget.invoke()
+        elif isinstance(widget, (ttk.Entry, tk.Entry)):
+            self.focus_entry = widget
+            widget.focus_force()
+            widget.icursor(widget.index(f"@{x - widget.winfo_rootx()}"))
+            widget.selection_clear()
+        elif widget is self.grid:
+            if self.queried_date is None:
+                return
+            idx = self.grid.nearest(y - self.grid.winfo_rooty())
+            self.grid.selection_clear(0, tk.END)
+            self.grid.selection_set(idx)
+            self.selected = idx
+
+    def handle_key(self, key):
+        key = key.lower()
+        if self.popup is not None:
+            if key == "enter":
+                self.close_popup(True)
+            elif key in ("esc", "escape"):
+                self.close_popup(False)
+            return
+        if key in ("esc", "escape") and self.copy_dialog.winfo_viewable():
+            # 이전실적복사 팝업 닫기 (불러온 실적은 버린다)
+            self.armed = False
+            self.hide_copy_dialog()
+            return
+        entry = self.focus_entry
+        if entry is None:
+            return
+        if key in ("delete", "backspace"):
+            if entry.selection_present():
+                entry.delete(tk.SEL_FIRST, tk.SEL_LAST)
+            elif key == "delete":
+                entry.delete(tk.INSERT)
+            else:
+                pos = entry.index(tk.INSERT)
+                if pos > 0:
+                    entry.delete(pos - 1)
+        elif key == "enter":
+            if entry is self.date_entry:
+                self.on_query()
+        elif len(key) == 1:
+            if entry.selection_present():
+                entry.delete(tk.SEL_FIRST, tk.SEL_LAST)
+            entry.insert(tk.INSERT, key)
+
+    def handle_hotkey(self, *keys):
+        keys = tuple(k.lower() for k in keys)
+        entry = self.focus_entry
+        if keys[:1] != ("ctrl",) or len(keys) != 2:
+            return self.handle_key(keys[-1])
+        if self.popup is not None or entry is None:
+            return
+        key = keys[1]
+        if key == "a":
+            entry.selection_range(0, tk.END)
+            entry.icursor(tk.END)
+        elif key == "c":
+            text = entry.get()
+            if entry.selection_present():
+                text = text[entry.index(tk.SEL_FIRST):entry.index(tk.SEL_LAST)]
+            self.set_clipboard(text)
+        elif key == "v":
+            text = self.get_clipboard()
+            if entry.selection_present():
+                entry.delete(tk.SEL_FIRST, tk.SEL_LAST)
+            entry.insert(tk.INSERT, text)
+
+
+    def get_clipboard(self):
+        try:
+            return self.root.clipboard_get()
+        except tk.TclError:
+            return ""
+
+    def set_clipboard(self, text):
+        self.root.clipboard_clear()
+        self.root.clipboard_append(text)
+
+
+class FakeERPDriver(InputDriver):
+    """InputDriver that feeds actions straight into a FakeTNLScreen.
+
+    ``pause`` mimics ``pyautogui.PAUSE``: a sleep after every action.
+    """
+
+    def __init__(self, screen, pause=0.0):
+        self.screen = screen
+        self.pause = pause
+
+    def _after(self):
+        if self.pause:
+            time.sleep(self.pause)
+
+    def click(self, x, y):
+        self.screen.call(self.screen.handle_click, x, y)
+        self._after()
+
+    def hotkey(self, *keys):
+        self.screen.call(self.screen.handle_hotkey, *keys)
+        self._after()
+
+    def press(self, key):
+        self.screen.call(self.screen.handle_key, key)
+        self._after()
+
+    def type(self, text, interval=0.0):
+        for char in text:
+            self.screen.call(self.screen.handle_key, char)
+            if interval:
+                time.sleep(interval)
+        self._after()
+
+    def screenshot(self, region):
+        return grab_screen_region(region)
+
+    def screen_bounds(self):
+        return self.screen.call(lambda: (0, 0, self.screen.root.winfo_screenwidth(),
+                                         self.screen.root.winfo_screenheight()))
+
+    def screen_layout(self, window_title=None):
+        # 모의 화면의 창을 ERP 창으로 본다 (창 제목은 따지지 않음)
+        return {"monitors": [self.screen_bounds()], "dpi": 1.0,
+                "window": self.screen.window_region()}
+
+    def get_clipboard(self):
+        return self.screen.call(self.screen.get_clipboard)
+
+    def set_clipboard(self, text):
+        self.screen.call(self.screen.set_clipboard, text)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="T&L 모의 화면")
+    parser.add_argument("--query", type=float, default=DEFAULT_LATENCY["query"], help="조회 지연(초)")
+    parser.add_argument("--popup", type=float, default=DEFAULT_LATENCY["popup"], help="팝업 표시 지연(초)")
+    parser.add_argument("--commit", type=float, default=DEFAULT_LATENCY["commit"], help="처리 완료 지연(초)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="지연 변동 비율 (0.2 = ±20%%)")
+    parser.add_argument("--macro", action="store_true", help="모의 화면에 연결된 매크로 GUI 도 함께 실행")
+    args = parser.parse_args(argv)
+
+    screen = FakeTNLScreen(
+        latency={"query": args.query, "popup": args.popup, "commit": args.commit},
+        jitter=args.jitter,
+    )
+    if args.macro:
+        run_macro(screen)
+        return
+    screen.build()
+    for label, xy in screen._targets().items():
+        print(f"{label}: {xy}")
+    screen.root.mainloop()
+
+
+def run_macro(screen):
+    """Start the screen in the background and open TNLMacro wired to it."""
+    import tempfile
+
+    from streamlit_app import TNLMacro
+
+    screen.start()
+    try:
+        # 실제 바탕화면의 설정 파일과 완료 기록을 읽거나 덮어쓰지 않도록 임시 경로 사용
+        # (생성자가 설정을 읽으므로 생성 전에 넘긴다)
+        workdir = tempfile.gettempdir()
+        app = TNLMacro(driver=FakeERPDriver(screen),
+                       config_path=os.path.join(workdir, "tnlcopy_fake_config.json"),
+                       ledger_path=os.path.join(workdir, "tnlcopy_fake_ledger.sqlite3"))
+        app.coords = screen.targets()
+        left, top, width, _ = screen.window_region()
+        app.root.geometry(f"+{left + width + 20}+{top}")
+        app.run()
+    finally:
+        screen.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""모듈 import 시간(콜드 스타트) 벤치마크.
+
+모듈마다 새 파이썬 프로세스에서 ``-X importtime`` 으로 import 를 여러 번
+측정해 누적 import 시간의 중앙값을 보고하고, 예산(ms)을 넘으면 종료
+코드 1 을 반환한다. 느린 하위 import 상위 몇 개도 함께 보여 준다.
+
+    python tnl_import_bench.py
+    python tnl_import_bench.py --budget streamlit_app=30 --runs 7
+
+GUI/자동화 라이브러리(tkinter, PIL, pyautogui, numpy)는 첫 사용 때
+import 하므로(tnl_probe.lazy_import) 기본 예산 안에 들어와야 한다.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+# 모듈별 누적 import 시간 예산 (ms)
+DEFAULT_BUDGETS = {
+    "tnl_probe": 15.0,
+    "tnl_engine": 30.0,
+    "streamlit_app": 45.0,
+    "tnl_agent": 60.0,
+}
+
+
+def import_times(module, python=sys.executable):
+    """{imported name: (self us, cumulative us)} from one fresh process."""
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    result = subprocess.run([python, "-X", "importtime", "-c", f"import {module}"],
+                            capture_output=True, text=True, env=env,
+                            cwd=os.path.dirname(os.path.abspath(__file__)))
+    if result.returncode != 0:
+        raise RuntimeError(f"{module} import 실패:\n{result.stderr.strip()[-2000:]}")
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def measure(module, runs):
+    """(median cumulative ms, slowest imports of the median run)."""
+    samples = []
+    for _ in range(runs):
+        times = import_times(module)
+        samples.append((times[module][1] / 1000.0, times))
+    samples.sort(key=lambda sample: sample[0])
+    median_ms = statistics.median(ms for ms, _ in samples)
+    times = samples[len(samples) // 2][1]
+    slowest = sorted(((us / 1000.0, name) for name, (us, _) in times.items()),
+                     reverse=True)[:5]
+    return median_ms, slowest
+
+
+def parse_budgets(items):
+    budgets = dict(DEFAULT_BUDGETS)
+    for item in items:
+        module, _, ms = item.partition("=")
+        budgets[module] = float(ms)
+    return budgets
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="모듈 import 시간 벤치마크")
+    parser.add_argument("--budget", action="append", default=[], metavar="MODULE=MS",
+                        help="모듈별 예산 (여러 번, 기본값 덮어쓰기)")
+    parser.add_argument("--only", nargs="+", help="측정할 모듈만 지정")
+    parser.add_argument("--runs", type=int, default=5, help="모듈당 측정 횟수 (중앙값 사용)")
+    args = parser.parse_args(argv)
+
+    budgets = parse_budgets(args.budget)
+    modules = args.only or list(budgets)
+    failed = []
+    for module in modules:
+        median_ms, slowest = measure(module, args.runs)
+        budget = budgets.get(module)
+        over = budget is not None and median_ms > budget
+        status = "초과" if over else "ok"
+        limit = f"{budget:.0f}ms" if budget is not None else "-"
+        print(f"{module:<16} {median_ms:7.1f}ms  (예산 {limit}) {status}")
+        for ms, name in slowest:
+            print(f"    {ms:6.1f}ms  {name}")
+        if over:
+            failed.append(module)
+    if failed:
+        print(f"예산 초과: {', '.join(failed)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
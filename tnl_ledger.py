@@ -0,0 +1,123 @@
+"""완료 기록 원장 (SQLite).
+
+날짜 하나의 마지막 확인(enter)까지 끝나면 (사원, 날짜, 기준일자) 를 한
+트랜잭션으로 기록한다. 다음 실행은 이미 완료된 날짜를 건너뛰고 첫 번째
+미완료 날짜부터 이어서 진행하므로, ESC 중단이나 오류 뒤에 같은 달을 다시
+실행해도 끝난 날짜를 반복하지 않는다.
+
+    python tnl_ledger.py list [--ref-date 2025-08-01]
+    python tnl_ledger.py clear --ref-date 2025-08-01 [--employee 홍길동]
+"""
+
+import argparse
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+LEDGER_PATH = os.path.join(os.path.expanduser("~"), "Desktop", "tnlcopy_ledger.sqlite3")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS done (
+    employee    TEXT NOT NULL,
+    date        TEXT NOT NULL,
+    ref_date    TEXT NOT NULL,
+    finished_at TEXT NOT NULL,
+    PRIMARY KEY (employee, date, ref_date)
+)
+"""
+
+
+class Ledger:
+    """Completed (employee, date, ref_date) entries.
+
+    ``employee`` is "" when the run copies whichever employee is selected
+    on screen. Each ``mark_done`` is committed on its own, so a crash never
+    leaves a half-written entry.
+    """
+
+    def __init__(self, path=LEDGER_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        # 작업 스레드와 GUI 스레드가 함께 쓰므로 스레드 검사는 끄고 잠금으로 보호
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=FULL")
+        self._conn.execute(SCHEMA)
+        self._conn.commit()
+
+    def mark_done(self, date, ref_date, employee=""):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO done VALUES (?, ?, ?, ?)",
+                (employee, date, ref_date, datetime.now().isoformat(timespec="seconds")))
+
+    def done_dates(self, ref_date, employee=""):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT date FROM done WHERE ref_date = ? AND employee = ?",
+                (ref_date, employee)).fetchall()
+        return {row[0] for row in rows}
+
+    def done_items(self, ref_date):
+        """Finished (employee, date) pairs for ``ref_date``."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT employee, date FROM done WHERE ref_date = ?", (ref_date,)).fetchall()
+        return {(row[0], row[1]) for row in rows}
+
+    def pending(self, dates, ref_date, employee=""):
+        """``dates`` without the finished ones, in the original order."""
+        done = self.done_dates(ref_date, employee)
+        return [date for date in dates if date not in done]
+
+    def entries(self, ref_date=None):
+        query = "SELECT employee, date, ref_date, finished_at FROM done"
+        params = ()
+        if ref_date:
+            query += " WHERE ref_date = ?"
+            params = (ref_date,)
+        with self._lock:
+            return self._conn.execute(query + " ORDER BY ref_date, employee, date",
+                                      params).fetchall()
+
+    def clear(self, ref_date=None, employee=None):
+        """Forget finished entries (all, or only those matching the filters)."""
+        clauses, params = [], []
+        if ref_date is not None:
+            clauses.append("ref_date = ?")
+            params.append(ref_date)
+        if employee is not None:
+            clauses.append("employee = ?")
+            params.append(employee)
+        where = " WHERE " + " AND ".join(clauses) if clauses else ""
+        with self._lock, self._conn:
+            return self._conn.execute("DELETE FROM done" + where, params).rowcount
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="T&L 복사 완료 기록 관리")
+    parser.add_argument("command", choices=["list", "clear"])
+    parser.add_argument("--ledger", default=LEDGER_PATH, help="원장 파일")
+    parser.add_argument("--ref-date", help="복사 기준일자")
+    parser.add_argument("--employee", help="사원 (clear 대상 제한)")
+    args = parser.parse_args(argv)
+
+    ledger = Ledger(args.ledger)
+    try:
+        if args.command == "list":
+            for employee, date, ref_date, finished_at in ledger.entries(args.ref_date):
+                print(f"{ref_date:<12}{employee or '-':<12}{date:<12}{finished_at}")
+        else:
+            removed = ledger.clear(args.ref_date, args.employee)
+            print(f"완료 기록 {removed}건을 삭제했습니다.")
+    finally:
+        ledger.close()
+
+
+if __name__ == "__main__":
+    main()
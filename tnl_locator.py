@@ -0,0 +1,266 @@
+"""참조 이미지 기반 화면 대상 위치 탐색기.
+
+저장소에 포함된 참조 이미지(조회 버튼.png 등)는 ERP 화면 캡처 위에 노란
+화살표로 대상을 가리킨 그림이다. 화살촉 주변을 잘라 템플릿으로 쓰고
+(화살표 픽셀은 마스크로 제외), 실행 중 화면에서 대상을 찾는다.
+
+    - 직전에 찾은 위치(없으면 보정 좌표) 주변의 작은 관심 영역(ROI)만 먼저 검색
+    - ROI 에서 찾지 못했을 때만 전체 화면 검색
+    - 찾은 위치는 세션 동안 캐시
+    - 축소한 그레이스케일 프레임에서 NumPy(FFT) 마스크 NCC 로 후보를 찾고,
+      후보 주변만 원본 해상도로 다시 매칭
+
+화살표 추출이 맞지 않는 경우 설정 파일에서 직접 잘라낼 영역을 지정할 수 있다:
+
+    "locator": {"enabled": true,
+                "templates": {"조회 버튼": {"image": "조회.png", "box": [60, 220, 140, 248],
+                                          "hotspot": [100, 234]}}}
+"""
+
+import os
+import sys
+import time
+
+from tnl_probe import lazy_import
+from tnl_wait import region_around
+
+# NumPy 가 없으면 위치 탐색 없이 보정 좌표만 사용
+# (첫 사용 때 import 해서 시작 시간을 줄인다)
+np = lazy_import("numpy")
+
+TARGET_LABELS = [
+    "일자 입력란",
+    "조회 버튼",
+    "복사 기준일자 입력란",
+    "사원 선택란",
+    "이전실적복사 버튼",
+    "복사 버튼",
+]
+
+# 화살촉 기준 템플릿 크기 (원본 픽셀) 와 화살촉 위쪽 비중
+TEMPLATE_SIZE = (120, 40)
+TEMPLATE_ABOVE = 28
+
+# 축소 프레임 후보를 받아들이는 점수 비율 (최종 판정은 원본 해상도 점수)
+COARSE_RATIO = 0.6
+
+
+def reference_image_path(filename):
+    """Path of a bundled reference image (also inside a PyInstaller bundle)."""
+    if hasattr(sys, '_MEIPASS'):
+        return os.path.join(sys._MEIPASS, filename)
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), filename)
+
+
+def _to_gray(image, scale=1.0):
+    """PIL image -> float32 grayscale array, optionally downscaled."""
+    gray = image.convert("L")
+    if scale != 1.0:
+        w, h = gray.size
+        gray = gray.resize((max(1, int(w * scale)), max(1, int(h * scale))))
+    return np.asarray(gray, dtype=np.float32)
+
+
+def _dilate(mask, radius):
+    out = mask.copy()
+    for dy in range(-radius, radius + 1):
+        for dx in range(-radius, radius + 1):
+            out |= np.roll(np.roll(mask, dy, axis=0), dx, axis=1)
+    return out
+
+
+def arrow_mask(rgb):
+    """Pixels of the yellow/red pointer arrow drawn on reference images."""
+    r, g, b = (rgb[..., i].astype(np.int16) for i in range(3))
+    yellow = (r > 200) & (g > 170) & (b < 110)
+    red = (r > 180) & (g < 120) & (b < 100)
+    return yellow, yellow | red
+
+
+class Template:
+    """Grayscale template, validity mask and click hotspot (native pixels)."""
+
+    def __init__(self, gray, mask, hotspot):
+        self.gray = gray
+        self.mask = mask
+        self.hotspot = hotspot
+
+    @property
+    def size(self):
+        h, w = self.gray.shape
+        return w, h
+
+    def scaled(self, scale):
+        from PIL import Image
+
+        if scale == 1.0:
+            return self.gray, self.mask
+        w, h = self.size
+        size = (max(1, int(w * scale)), max(1, int(h * scale)))
+        gray = np.asarray(Image.fromarray(self.gray.astype(np.uint8)).resize(size), dtype=np.float32)
+        mask = np.asarray(Image.fromarray(self.mask.astype(np.uint8) * 255).resize(size)) > 127
+        return gray, mask
+
+
+def load_template(path, box=None, hotspot=None):
+    """Cut a template from a reference image.
+
+    Without ``box`` the crop is centred on the tip of the pointer arrow,
+    which becomes the hotspot, and the arrow pixels are masked out.
+    """
+    from PIL import Image
+
+    rgb = np.asarray(Image.open(path).convert("RGB"))
+    gray = np.asarray(Image.open(path).convert("L"), dtype=np.float32)
+    if box is None:
+        yellow, arrow = arrow_mask(rgb)
+        ys, xs = np.nonzero(yellow)
+        if len(ys) == 0:
+            raise ValueError(f"참조 이미지에서 화살표를 찾지 못했습니다: {path}")
+        # 화살표는 아래에서 위로 대상을 가리킨다
+        tip_y = int(ys.min())
+        tip_x = int(xs[ys <= tip_y + 2].mean())
+        hotspot = hotspot or (tip_x, tip_y - 2)
+        w, h = TEMPLATE_SIZE
+        left = max(0, tip_x - w // 2)
+        top = max(0, tip_y - TEMPLATE_ABOVE)
+        box = (left, top, min(rgb.shape[1], left + w), min(rgb.shape[0], top + h))
+        valid = ~_dilate(arrow, 2)
+    else:
+        valid = np.ones(gray.shape, dtype=bool)
+        if hotspot is None:
+            hotspot = ((box[0] + box[2]) // 2, (box[1] + box[3]) // 2)
+    left, top, right, bottom = box
+    return Template(gray[top:bottom, left:right], valid[top:bottom, left:right],
+                    (hotspot[0] - left, hotspot[1] - top))
+
+
+def _correlate(image, kernel):
+    """Valid-region cross-correlation computed with real FFTs."""
+    H, W = image.shape
+    h, w = kernel.shape
+    F = np.fft.rfft2(image, (H, W))
+    K = np.fft.rfft2(kernel, (H, W))
+    return np.fft.irfft2(F * np.conj(K), (H, W))[:H - h + 1, :W - w + 1]
+
+
+def match_template(image, tmpl, mask):
+    """Masked normalized cross-correlation score map (-1~1)."""
+    m = mask.astype(np.float32)
+    n = m.sum()
+    if n < 4 or image.shape[0] < tmpl.shape[0] or image.shape[1] < tmpl.shape[1]:
+        return None
+    tz = (tmpl - (tmpl * m).sum() / n) * m
+    t_norm = float(np.sqrt((tz * tz).sum()))
+    if t_norm == 0:
+        return None
+    s1 = _correlate(image, m)
+    s2 = _correlate(image * image, m)
+    cross = _correlate(image, tz)
+    # 평탄한 영역에서 점수가 튀지 않도록 분산 하한 (표준편차 2 계조)
+    var = np.maximum(s2 - s1 * s1 / n, n * 4.0)
+    return cross / (np.sqrt(var) * t_norm)
+
+
+def _clip_region(region, bounds):
+    left, top, width, height = region
+    b_left, b_top, b_width, b_height = bounds
+    l = max(left, b_left)
+    t = max(top, b_top)
+    r = min(left + width, b_left + b_width)
+    b = min(top + height, b_top + b_height)
+    if r <= l or b <= t:
+        return None
+    return (l, t, r - l, b - t)
+
+
+class TargetLocator:
+    """Finds calibration targets on screen from reference templates.
+
+    ``grab(region)`` returns a PIL image and ``bounds()`` the full
+    (left, top, width, height) desktop; both usually come from the driver.
+    ``stats`` keeps the last lookup time (ms) and where the hit came from.
+    """
+
+    def __init__(self, grab, bounds, templates=None, scale=0.5, threshold=0.8, roi_margin=60):
+        if np is None:
+            raise RuntimeError("대상 위치 탐색에는 numpy 가 필요합니다.")
+        self.grab = grab
+        self.bounds = bounds
+        self.scale = scale
+        self.threshold = threshold
+        self.roi_margin = roi_margin
+        self.templates = {}
+        self.hits = {}
+        self.stats = {}
+        specs = templates or {}
+        for label in TARGET_LABELS:
+            spec = specs.get(label, {})
+            path = spec.get("image") or reference_image_path(f"{label}.png")
+            if not os.path.isabs(path):
+                path = reference_image_path(path)
+            if not os.path.exists(path):
+                continue
+            self.templates[label] = load_template(path, spec.get("box"), spec.get("hotspot"))
+        self._scaled = {label: t.scaled(scale) for label, t in self.templates.items()}
+
+    def locate(self, label, hint=None):
+        """Screen (x, y) of ``label`` or None when it cannot be found."""
+        if label not in self.templates:
+            return None
+        start = time.perf_counter()
+        source = "roi"
+        found = None
+        last = self.hits.get(label) or hint
+        if last is not None:
+            w, h = self.templates[label].size
+            roi = region_around(last, w + 2 * self.roi_margin, h + 2 * self.roi_margin)
+            roi = _clip_region(roi, self.bounds())
+            if roi is not None:
+                found = self._search(label, roi)
+        if found is None:
+            source = "full"
+            found = self._search(label, self.bounds())
+        if found is not None:
+            self.hits[label] = found
+        self.stats[label] = {"ms": round((time.perf_counter() - start) * 1000, 2),
+                             "source": source if found else "miss"}
+        return found
+
+    def _search(self, label, region):
+        found = find_template(self.grab(region), self.templates[label], self._scaled[label],
+                              self.scale, self.threshold)
+        if found is None:
+            return None
+        return (region[0] + found[0], region[1] + found[1])
+
+
+def find_template(image, template, scaled, scale=0.5, threshold=0.8):
+    """Hotspot (x, y) of ``template`` inside PIL ``image``, or None.
+
+    ``scaled`` is ``template.scaled(scale)``; the best coarse hit is
+    confirmed at native resolution against ``threshold``.
+    """
+    tmpl, mask = scaled
+    coarse = match_template(_to_gray(image, scale), tmpl, mask)
+    if coarse is None:
+        return None
+    y, x = np.unravel_index(int(np.argmax(coarse)), coarse.shape)
+    if coarse[y, x] < threshold * COARSE_RATIO:
+        return None
+
+    # 축소 프레임의 후보 주변만 원본 해상도로 다시 매칭해 위치/점수 확정
+    w, h = template.size
+    pad = int(2 / scale) + 2
+    left = max(0, int(x / scale) - pad)
+    top = max(0, int(y / scale) - pad)
+    crop = image.crop((left, top, min(image.size[0], left + w + 2 * pad),
+                       min(image.size[1], top + h + 2 * pad)))
+    fine = match_template(_to_gray(crop), template.gray, template.mask)
+    if fine is None:
+        return None
+    fy, fx = np.unravel_index(int(np.argmax(fine)), fine.shape)
+    if fine[fy, fx] < threshold:
+        return None
+    hx, hy = template.hotspot
+    return (left + int(fx) + hx, top + int(fy) + hy)
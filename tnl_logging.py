@@ -0,0 +1,189 @@
+"""큐 기반 로그 파이프라인 (회전 파일 + 콘솔).
+
+작업 스레드의 logging 호출은 QueueHandler 로 레코드를 큐에 넣기만 하고,
+파일/콘솔 쓰기와 회전·압축은 QueueListener 스레드가 맡는다. 따라서 로그가
+입력 타이밍에 지연을 더하지 않는다.
+
+    - 파일 크기(max_bytes)를 넘거나 날짜가 바뀌면 회전
+      (tnlcopy.log.1.gz, tnlcopy.log.2.gz ... 최근 backup_count 개 유지)
+    - 형식: plain (기존과 같은 한 줄 텍스트) 또는 json (한 줄 JSON 레코드)
+    - 모듈 import 시에는 아무것도 설정하지 않는다. 앱 시작 시 setup_logging()
+
+설정 파일의 'logging' 으로 바꿀 수 있다 (모두 생략 가능):
+
+    "logging": {"dir": "D:/logs", "level": "INFO", "format": "json",
+                "max_bytes": 5242880, "backup_count": 14, "compress": true}
+
+로그 폴더는 환경 변수 TNLCOPY_LOG_DIR 로도 지정할 수 있다 (기본: 현재 폴더).
+"""
+
+import copy
+import gzip
+import json
+import logging
+import os
+import queue
+import shutil
+import time
+from datetime import datetime, timedelta
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+LOG_FILE = "tnlcopy.log"
+LOG_DIR_ENV = "TNLCOPY_LOG_DIR"
+MAX_BYTES = 5 * 1024 * 1024
+BACKUP_COUNT = 14
+PLAIN_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+_pipeline = None
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, thread, message[, exc]."""
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class RotatingLogHandler(RotatingFileHandler):
+    """RotatingFileHandler that also rolls over at local midnight.
+
+    With ``compress`` the rotated files are gzipped (``.1.gz``, ``.2.gz``).
+    """
+
+    def __init__(self, path, max_bytes=MAX_BYTES, backup_count=BACKUP_COUNT, compress=True):
+        super().__init__(path, maxBytes=max_bytes, backupCount=backup_count,
+                         encoding="utf-8", delay=True)
+        if compress:
+            self.namer = lambda name: name + ".gz"
+            self.rotator = _gzip_rotate
+        self.rollover_at = _next_midnight(time.time())
+
+    def shouldRollover(self, record):
+        if record.created >= self.rollover_at:
+            # 빈 파일은 회전하지 않고 다음 자정만 다시 잡는다
+            if os.path.exists(self.baseFilename) and os.path.getsize(self.baseFilename) > 0:
+                return True
+            self.rollover_at = _next_midnight(record.created)
+        return super().shouldRollover(record)
+
+    def doRollover(self):
+        super().doRollover()
+        self.rollover_at = _next_midnight(time.time())
+
+
+class _PreparedQueueHandler(QueueHandler):
+    """QueueHandler that keeps the traceback apart from the message.
+
+    The default prepare() folds the traceback into ``msg``; keeping it in
+    ``exc_text`` lets JsonFormatter put it in its own field.
+    """
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.message = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class LogPipeline:
+    """The running listener; ``stop()`` flushes the queue and closes files."""
+
+    def __init__(self, listener, handler, path):
+        self.listener = listener
+        self.handler = handler
+        self.path = path
+
+    def stop(self):
+        global _pipeline
+        if self.listener is None:
+            return
+        logging.getLogger().removeHandler(self.handler)
+        self.listener.stop()
+        for handler in self.listener.handlers:
+            handler.close()
+        self.listener = None
+        if _pipeline is self:
+            _pipeline = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def _next_midnight(now):
+    day = datetime.fromtimestamp(now).date() + timedelta(days=1)
+    return datetime(day.year, day.month, day.day).timestamp()
+
+
+def _gzip_rotate(source, dest):
+    with open(source, "rb") as src, gzip.open(dest, "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    os.remove(source)
+
+
+def load_options(config_path):
+    """setup_logging() keyword arguments from the config's 'logging' section."""
+    try:
+        with open(config_path, "r", encoding="utf-8") as f:
+            options = json.load(f).get("logging") or {}
+    except (OSError, ValueError):
+        return {}
+    names = {"dir": "log_dir", "format": "fmt"}
+    return {names.get(key, key): value for key, value in options.items()}
+
+
+def log_dir():
+    """Folder the running pipeline writes to, else TNLCOPY_LOG_DIR or the current folder."""
+    if _pipeline is not None:
+        return os.path.dirname(_pipeline.path) or "."
+    return os.environ.get(LOG_DIR_ENV) or "."
+
+
+def setup_logging(log_dir=None, level="INFO", fmt="plain", max_bytes=MAX_BYTES,
+                  backup_count=BACKUP_COUNT, compress=True, console=True):
+    """Route the root logger through a queue to rotating file (and console).
+
+    Calling it again replaces the previous pipeline. Returns the
+    LogPipeline; use it as a context manager or call ``stop()`` on exit.
+    """
+    global _pipeline
+    if _pipeline is not None:
+        _pipeline.stop()
+
+    log_dir = log_dir or os.environ.get(LOG_DIR_ENV) or "."
+    os.makedirs(log_dir, exist_ok=True)
+    path = os.path.join(log_dir, LOG_FILE)
+
+    formatter = JsonFormatter() if fmt == "json" else logging.Formatter(PLAIN_FORMAT)
+    handlers = [RotatingLogHandler(path, max_bytes, backup_count, compress)]
+    if console:
+        handlers.append(logging.StreamHandler())
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    records = queue.SimpleQueue()
+    queue_handler = _PreparedQueueHandler(records)
+    root = logging.getLogger()
+    root.setLevel(level.upper() if isinstance(level, str) else level)
+    root.addHandler(queue_handler)
+
+    listener = QueueListener(records, *handlers, respect_handler_level=True)
+    listener.start()
+    _pipeline = LogPipeline(listener, queue_handler, path)
+    return _pipeline
@@ -0,0 +1,351 @@
+"""tnlcopy.log 이력 분석 (한 번 읽기, 일정한 메모리).
+
+지금까지 쌓인 tnlcopy.log 와 회전된 파일(tnlcopy.log.3.gz ... .1.gz)을
+오래된 것부터 한 줄씩 읽어 실행(작업을 시작합니다 ~ 완료/중단/오류)과
+날짜별 처리 시간(날짜 ... 처리 시작 ~ 처리 완료)을 다시 구성한다. 로그 형식은
+plain, json 모두 읽는다.
+
+    - 기간별(일/주/월) 실행 수, 중단율, 처리 날짜 수, 분당 처리량, p50/p95
+    - 시간대별 날짜 처리 시간 (몇 시에 느린지)
+    - --split 시각 전/후 비교 (타이밍 설정을 바꾼 효과 확인)
+
+처리 시간은 구간별 로그 눈금 히스토그램(약 1% 오차)에 모으므로 로그가
+아무리 길어도 메모리는 기간 수에만 비례한다. 일시정지한 시간도 처리 시간에
+포함되고, 일괄 처리(사원 × 날짜) 항목은 날짜 처리 시간에 넣지 않는다.
+일괄 처리나 여러 창 동시 실행("[창 이름] ..." 로그)이 섞인 실행은 날짜 수를
+세지 않으므로 실행 시간도 분당 처리량에서 뺀다 (실행 수와 중단율에는 포함).
+
+    python tnl_logstats.py
+    python tnl_logstats.py D:/logs/tnlcopy.log --by month
+    python tnl_logstats.py --split 2025-09-01 --json
+"""
+
+import argparse
+import gzip
+import json
+import math
+import os
+import re
+import sys
+from datetime import datetime
+
+from tnl_logging import LOG_DIR_ENV, LOG_FILE
+
+PLAIN_LINE = re.compile(r"^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}),(\d{3}) - (\w+) - (.*)$")
+DATE_START = re.compile(r"^날짜 (\S+) 처리 시작")
+DATE_DONE = re.compile(r"^날짜 (\S+) 처리 완료$")
+# 날짜 처리 시간을 세지 않는 실행: 일괄 처리 항목 완료, 여러 창 동시 실행
+BATCH_DONE = re.compile(r"^.+ 처리 완료 \(\d+/\d+\)$")
+WINDOW_LINE = re.compile(r"^\[[^\]]+\] ")
+
+RUN_START = "작업을 시작합니다."
+# 실행을 끝내는 메시지 (앞부분 일치) -> 결과
+RUN_END = (
+    ("모든 작업이 완료되었습니다.", "completed"),
+    ("확인에 실패한 항목", "completed"),
+    ("작업이 중단되어", "aborted"),
+    ("작업 중 오류 발생", "error"),
+    ("작업이 중지되었습니다.", "aborted"),
+)
+OUTCOMES = ("completed", "aborted", "error", "incomplete")
+
+PERIODS = {"day": "%Y-%m-%d", "week": "%G-W%V", "month": "%Y-%m"}
+
+# 히스토그램 눈금 비율 (상대 오차 약 1%)
+BUCKET_RATIO = 1.02
+
+
+def log_files(path):
+    """``path`` and its rotated segments, oldest first."""
+    directory = os.path.dirname(path) or "."
+    base = os.path.basename(path)
+    pattern = re.compile(re.escape(base) + r"\.(\d+)(\.gz)?$")
+    rotated = []
+    if os.path.isdir(directory):
+        for name in os.listdir(directory):
+            match = pattern.match(name)
+            if match:
+                rotated.append((int(match.group(1)), os.path.join(directory, name)))
+    files = [p for _, p in sorted(rotated, reverse=True)]
+    if os.path.exists(path):
+        files.append(path)
+    return files
+
+
+def open_log(path):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", errors="replace")
+    return open(path, "r", encoding="utf-8", errors="replace")
+
+
+def parse_line(line):
+    """(datetime, level, message) of a plain or JSON log line, else None."""
+    if line.startswith("{"):
+        try:
+            entry = json.loads(line)
+            return datetime.fromisoformat(entry["ts"]), entry["level"], entry["message"]
+        except (ValueError, KeyError, TypeError):
+            return None
+    match = PLAIN_LINE.match(line)
+    if match is None:
+        # 예외 추적(traceback) 등 여러 줄 메시지의 뒷줄
+        return None
+    stamp, millis, level, message = match.groups()
+    return datetime.fromisoformat(f"{stamp}.{millis}"), level, message.rstrip("\n")
+
+
+def iter_records(paths):
+    for path in paths:
+        with open_log(path) as f:
+            for line in f:
+                record = parse_line(line)
+                if record is not None:
+                    yield record
+
+
+class Histogram:
+    """Log-bucketed histogram for streaming percentiles."""
+
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def add(self, value):
+        index = int(math.floor(math.log(max(value, 1e-3)) / math.log(BUCKET_RATIO)))
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def percentile(self, q):
+        """Nearest-rank percentile (q in 0~100); None when empty."""
+        if not self.count:
+            return None
+        rank = max(1, math.ceil(q / 100.0 * self.count))
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                # 눈금 구간의 기하 중앙값
+                value = BUCKET_RATIO ** (index + 0.5)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+
+class Group:
+    """Run and per-date totals for one period / hour / split side."""
+
+    def __init__(self):
+        self.outcomes = dict.fromkeys(OUTCOMES, 0)
+        self.failed_dates = 0
+        self.run_seconds = 0.0
+        # 일괄 처리/여러 창 실행 수 (실행 시간을 분당 처리량에 넣지 않음)
+        self.untimed_runs = 0
+        self.dates = Histogram()
+
+    @property
+    def runs(self):
+        return sum(self.outcomes.values())
+
+    def summary(self):
+        runs = self.runs
+        ended = runs - self.outcomes["incomplete"]
+        throughput = (self.dates.count / self.run_seconds * 60) if self.run_seconds else None
+        return {
+            "runs": runs,
+            **self.outcomes,
+            "abort_rate": round(self.outcomes["aborted"] / ended, 3) if ended else None,
+            "dates": self.dates.count,
+            "failed_dates": self.failed_dates,
+            "untimed_runs": self.untimed_runs,
+            "p50_s": _round(self.dates.percentile(50)),
+            "p95_s": _round(self.dates.percentile(95)),
+            "mean_s": _round(self.dates.mean),
+            "dates_per_min": _round(throughput, 2),
+        }
+
+
+def _round(value, digits=2):
+    return None if value is None else round(value, digits)
+
+
+class Analyzer:
+    """State machine over log records; ``feed`` one record at a time.
+
+    Runs are grouped by the period of their start time, dates by the
+    period and hour they started in. With ``split`` everything is also
+    counted as "before" or "after" that moment.
+    """
+
+    def __init__(self, by="week", split=None):
+        self.period_format = PERIODS[by]
+        self.split = split
+        self.total = Group()
+        self.periods = {}
+        self.hours = {}
+        self.sides = {"before": Group(), "after": Group()} if split else {}
+        self.run = None
+        self.untimed = False
+        self.date = None
+        self.first = None
+        self.last = None
+
+    def _groups(self, ts, by_hour=False):
+        groups = [self.total, self.periods.setdefault(ts.strftime(self.period_format), Group())]
+        if by_hour:
+            groups.append(self.hours.setdefault(ts.hour, Group()))
+        if self.split is not None:
+            groups.append(self.sides["before" if ts < self.split else "after"])
+        return groups
+
+    def feed(self, ts, level, message):
+        if self.first is None:
+            self.first = ts
+        self.last = ts
+        if message == RUN_START:
+            if self.run is not None:
+                # 완료/중단 기록 없이 다시 시작됨 (강제 종료 등)
+                self._end_run(ts, "incomplete")
+            self.run = ts
+            self.untimed = False
+            return
+        if self.run is None:
+            return
+        if BATCH_DONE.match(message) or WINDOW_LINE.match(message):
+            self.untimed = True
+            return
+        match = DATE_START.match(message)
+        if match:
+            self._drop_date()
+            self.date = (match.group(1), ts)
+            return
+        match = DATE_DONE.match(message)
+        if match:
+            if self.date is not None and self.date[0] == match.group(1):
+                start = self.date[1]
+                seconds = (ts - start).total_seconds()
+                for group in self._groups(start, by_hour=True):
+                    group.dates.add(seconds)
+            self.date = None
+            return
+        for prefix, outcome in RUN_END:
+            if message.startswith(prefix):
+                self._end_run(ts, outcome)
+                return
+
+    def _drop_date(self):
+        # 처리 완료 없이 끝난 날짜 (확인 실패, 중단)
+        if self.date is not None:
+            for group in self._groups(self.date[1]):
+                group.failed_dates += 1
+            self.date = None
+
+    def _end_run(self, ts, outcome):
+        self._drop_date()
+        for group in self._groups(self.run):
+            group.outcomes[outcome] += 1
+            if self.untimed:
+                group.untimed_runs += 1
+            else:
+                group.run_seconds += (ts - self.run).total_seconds()
+        self.run = None
+
+    def finish(self):
+        if self.run is not None:
+            self._end_run(self.last, "incomplete")
+        return self
+
+    def report(self):
+        report = {
+            "first": self.first.isoformat(timespec="seconds") if self.first else None,
+            "last": self.last.isoformat(timespec="seconds") if self.last else None,
+            "total": self.total.summary(),
+            "periods": {key: g.summary() for key, g in sorted(self.periods.items())},
+            "hours": {hour: g.summary() for hour, g in sorted(self.hours.items())},
+        }
+        if self.sides:
+            report["split"] = {"at": self.split.isoformat(timespec="seconds"),
+                               **{side: g.summary() for side, g in self.sides.items()}}
+        return report
+
+
+def analyze(paths, by="week", split=None):
+    analyzer = Analyzer(by, split)
+    for ts, level, message in iter_records(paths):
+        analyzer.feed(ts, level, message)
+    return analyzer.finish().report()
+
+
+def _fmt(value, spec=".1f", none="-"):
+    return none if value is None else format(value, spec)
+
+
+def print_report(report, by):
+    total = report["total"]
+    print(f"기간: {report['first']} ~ {report['last']}")
+    print(f"실행 {total['runs']}회 (완료 {total['completed']}, 중단 {total['aborted']}, "
+          f"오류 {total['error']}, 미종료 {total['incomplete']}), "
+          f"중단율 {_fmt(total['abort_rate'] and total['abort_rate'] * 100, '.0f')}%")
+    print(f"날짜 {total['dates']}개 (미완료 {total['failed_dates']}), p50 {_fmt(total['p50_s'])}s, "
+          f"p95 {_fmt(total['p95_s'])}s, 분당 {_fmt(total['dates_per_min'], '.2f')}개")
+    if total["untimed_runs"]:
+        print(f"일괄 처리/여러 창 실행 {total['untimed_runs']}회는 분당 처리량에서 뺐습니다.")
+
+    print(f"\n{by:<10}{'실행':>6}{'중단율':>8}{'날짜':>7}{'p50':>8}{'p95':>8}{'개/분':>8}")
+    for key, row in report["periods"].items():
+        rate = row["abort_rate"]
+        print(f"{key:<10}{row['runs']:>6}{_fmt(rate and rate * 100, '.0f') + '%':>8}"
+              f"{row['dates']:>7}{_fmt(row['p50_s']):>8}{_fmt(row['p95_s']):>8}"
+              f"{_fmt(row['dates_per_min'], '.2f'):>8}")
+
+    print(f"\n{'시각':<6}{'날짜':>7}{'p50':>8}{'p95':>8}{'평균':>8}")
+    for hour, row in report["hours"].items():
+        print(f"{hour:02d}시  {row['dates']:>7}{_fmt(row['p50_s']):>8}{_fmt(row['p95_s']):>8}"
+              f"{_fmt(row['mean_s']):>8}")
+
+    split = report.get("split")
+    if split:
+        print(f"\n{split['at']} 전/후{'':<4}{'날짜':>7}{'p50':>8}{'p95':>8}{'개/분':>8}{'중단율':>8}")
+        for side in ("before", "after"):
+            row = split[side]
+            rate = row["abort_rate"]
+            print(f"{'전' if side == 'before' else '후':<18}{row['dates']:>7}{_fmt(row['p50_s']):>8}"
+                  f"{_fmt(row['p95_s']):>8}{_fmt(row['dates_per_min'], '.2f'):>8}"
+                  f"{_fmt(rate and rate * 100, '.0f') + '%':>8}")
+        before, after = split["before"]["p50_s"], split["after"]["p50_s"]
+        if before and after:
+            print(f"p50 변화: {(after - before) / before * 100:+.1f}%")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="tnlcopy.log 이력 분석")
+    default = os.path.join(os.environ.get(LOG_DIR_ENV) or ".", LOG_FILE)
+    parser.add_argument("log", nargs="?", default=default, help="로그 파일 (회전된 파일도 함께 읽음)")
+    parser.add_argument("--by", choices=sorted(PERIODS), default="week", help="기간 단위")
+    parser.add_argument("--split", type=datetime.fromisoformat, metavar="YYYY-MM-DD[THH:MM]",
+                        help="이 시각 전/후 비교 (타이밍 변경 시점)")
+    parser.add_argument("--json", action="store_true", help="JSON 으로 출력")
+    args = parser.parse_args(argv)
+
+    paths = log_files(args.log)
+    if not paths:
+        print(f"로그 파일이 없습니다: {args.log}")
+        return 1
+    report = analyze(paths, args.by, args.split)
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    else:
+        print_report(report, args.by)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
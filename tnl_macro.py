@@ -0,0 +1,506 @@
+"""매크로 GUI 공통 동작 (tnlcopy6, streamlit_app).
+
+두 실행 파일의 TNLMacro 는 화면 구성만 다르고 작업 실행은 같다. 설정
+읽기/저장, 화면 배치별 보정, 작업 스레드(work_process)와 날짜별/일괄
+처리, 자동 보정, 전역 단축키 처리는 MacroCore 에 두고 TNLMacro 가
+상속한다.
+
+시작 시간을 줄이도록 자동 보정, 화면 배치 보정, 일괄 처리, 팝업 복구,
+녹화 모듈과 keyboard 는 처음 쓸 때 import 한다 (전역 단축키는 처음 작업을
+시작할 때 등록).
+
+MacroCore 는 TNLMacro 가 만드는 위젯(progress_var, progress_text,
+current_work_label, status_label, root)과 log_message, get_coordinate,
+stop_work 를 쓴다. tkinter 는 대화상자를 띄울 때 import 하므로 GUI 없는
+환경에서도 이 모듈을 import 할 수 있다.
+"""
+
+import logging
+import threading
+import time
+
+from tnl_capture import CaptureService
+from tnl_control import DEFAULT_HOTKEYS, Aborted, ControlledDriver, bind_hotkeys
+from tnl_engine import CopyRunner, StepFailed
+from tnl_ledger import Ledger
+from tnl_trace import Tracer
+from tnl_wait import resolve_timing
+
+# (속성, 설정 파일 키, 기본값)
+CONFIG_KEYS = [
+    ("coords", "coords", dict),
+    ("ref_date", "last_ref_date", str),
+    ("dates", "last_dates", list),
+    ("waits", "waits", dict),
+    ("wait_regions", "wait_regions", dict),
+    ("entry_modes", "entry_modes", dict),
+    ("workflow", "workflow", lambda: None),
+    ("timing_profiles", "timing_profiles", dict),
+    ("timing_profile", "timing_profile", str),
+    ("locator", "locator", dict),
+    ("employee", "employee", str),
+    ("batch", "batch", dict),
+    ("hotkeys", "hotkeys", dict),
+    ("log_options", "logging", dict),
+    ("calibration", "calibration", dict),
+    ("recovery_options", "recovery", dict),
+    ("recording", "recording", dict),
+]
+
+
+class MacroCore:
+    """Run orchestration shared by both TNLMacro front-ends."""
+
+    def config_dict(self):
+        """Settings to save in the config file."""
+        self.read_employee()
+        return {key: getattr(self, attr) for attr, key, _ in CONFIG_KEYS}
+
+    def apply_config(self, config):
+        for attr, key, default in CONFIG_KEYS:
+            value = config.get(key)
+            setattr(self, attr, default() if value is None else value)
+        if getattr(self, "employee_var", None) is not None:
+            self.employee_var.set(self.employee)
+
+    def create_employee_row(self, parent, row):
+        """사원 입력란 (완료 기록을 사원별로 남긴다)"""
+        import tkinter as tk
+        from tkinter import ttk
+
+        ttk.Label(parent, text="사원:").grid(row=row, column=0, sticky=tk.W, pady=(5, 0))
+        self.employee_var = tk.StringVar(value=self.employee)
+        ttk.Entry(parent, textvariable=self.employee_var, width=20).grid(
+            row=row, column=1, sticky=tk.W, padx=(10, 0), pady=(5, 0))
+        ttk.Label(parent, text="(화면에서 선택한 사원)").grid(row=row, column=2, padx=(10, 0),
+                                                          pady=(5, 0))
+
+    def read_employee(self):
+        if getattr(self, "employee_var", None) is not None:
+            self.employee = self.employee_var.get().strip()
+        return self.employee
+
+    def confirm_skip_done(self):
+        """완료 기록된 날짜를 건너뛸지 정한다 (작업 시작 전, 메인 스레드).
+
+        사원을 지정하지 않았으면 완료 기록이 어느 사원 것인지 알 수 없으므로
+        건너뛰기 전에 묻는다. 작업을 시작하지 않으면 False.
+        """
+        from tkinter import messagebox
+
+        self.skip_done = True
+        if self.read_employee() or self.batch.get("employees"):
+            return True
+        ledger = Ledger(self.ledger_path)
+        try:
+            done = ledger.done_dates(self.ref_date, self.employee)
+        finally:
+            ledger.close()
+        count = sum(1 for date in self.dates if date in done)
+        if not count:
+            return True
+        answer = messagebox.askyesnocancel(
+            "완료 기록", f"사원이 지정되지 않았습니다. 기준일자 {self.ref_date} 로 이미 완료된 "
+                       f"날짜가 {count}개 있습니다.\n\n"
+                       "같은 사원이면 '예'(완료된 날짜 건너뛰기),\n"
+                       "다른 사원이면 '아니오'(모든 날짜 처리)를 누르세요.")
+        if answer is None:
+            return False
+        self.skip_done = answer
+        return True
+
+    def apply_calibration(self, search=False):
+        """현재 화면 배치에 맞는 보정 프로필로 이번 실행의 좌표를 정한다.
+
+        ERP 창 기준점을 찾으면 창 기준 좌표를 화면 좌표로 바꿔 쓰므로 창을 옮기거나
+        DPI 배율이 바뀌어도 다시 보정할 필요가 없다. 맞는 프로필이 있으면 True.
+        제목줄 이미지로 기준점을 찾는 전체 화면 매칭은 search=True 일 때만
+        (작업 스레드에서) 한다.
+        """
+        if self.driver is None:
+            return False
+        from tnl_calibration import run_coords
+
+        if not self.calibration.get("profiles") and self.coords:
+            # 프로필이 없던 설정의 좌표는 지금 화면 배치의 프로필로 옮긴다
+            self.save_calibration()
+        try:
+            coords, key, anchor = run_coords(self.calibration, self.driver, search=search)
+        except Exception as e:
+            self.log_message(f"화면 배치 확인 실패: {e}", "WARNING")
+            return False
+        if key is None:
+            self.log_message("현재 화면 배치에 맞는 보정 좌표가 없습니다.", "WARNING")
+            self.calibration_key = None
+            return False
+        if key != self.calibration_key:
+            self.log_message(f"화면 배치 {key} 의 보정 좌표를 사용합니다.")
+        if anchor is not None:
+            self.log_message(f"ERP 창 기준점 {anchor.origin} (DPI {anchor.dpi * 100:.0f}%) 으로 좌표를 계산했습니다.")
+        self.coords = coords
+        self.calibration_key = key
+        return True
+
+    def save_calibration(self):
+        """지금 좌표를 현재 화면 배치의 보정 프로필로 저장 (ERP 창을 찾으면 창 기준 좌표도)"""
+        if self.driver is None:
+            return
+        from tnl_calibration import save_profile
+
+        try:
+            self.calibration_key, anchor = save_profile(self.calibration, self.driver, self.coords)
+            where = " (ERP 창 기준)" if anchor is not None else ""
+            self.log_message(f"화면 배치 {self.calibration_key} 의 보정 좌표를 저장했습니다{where}.")
+        except Exception as e:
+            self.log_message(f"보정 프로필 저장 실패: {e}", "WARNING")
+
+    def auto_calibrate_gui(self, popup=False, found=None):
+        """한 번의 화면 캡처로 대상 좌표를 자동 보정 (모호하거나 못 찾은 대상만 직접 지정).
+
+        메인 화면 대상을 먼저 보정하고, 팝업 안의 대상(복사 버튼)은 사용자가
+        이전실적복사 팝업을 연 뒤 다시 캡처해서 찾는다 (popup=True).
+        """
+        if getattr(self, "root", None) is None or self.driver is None:
+            logging.warning("auto_calibrate_gui called but GUI/automation is not available")
+            return
+        found = dict(found or {})
+        if popup:
+            self.log_message("자동 보정: 이전실적복사 팝업 화면을 캡처합니다...")
+        else:
+            self.log_message("자동 보정: 화면을 캡처합니다...")
+        # 매크로 창이 ERP 화면을 가리지 않도록 캡처하는 동안 숨긴다
+        self.root.withdraw()
+        self.root.update()
+        time.sleep(0.3)
+        try:
+            bounds = self.driver.screen_bounds()
+            image = self.driver.screenshot(bounds)
+        except Exception as e:
+            self.log_message(f"화면 캡처 실패: {e}", "ERROR")
+            return
+        finally:
+            self.root.deiconify()
+        specs = self.locator.get("templates")
+
+        def work():
+            from tnl_autocal import POPUP_TARGETS, auto_calibrate, load_templates
+            from tnl_locator import TARGET_LABELS
+
+            if popup:
+                labels = list(POPUP_TARGETS)
+            else:
+                labels = [label for label in TARGET_LABELS if label not in POPUP_TARGETS]
+            try:
+                start = time.perf_counter()
+                results = auto_calibrate(image, bounds[:2], load_templates(specs, labels))
+                self.ui.post(self.finish_auto_calibration, results, image, bounds[:2],
+                             time.perf_counter() - start, popup, found)
+            except Exception as e:
+                self.log_message(f"자동 보정 실패: {e}", "ERROR")
+
+        # 매칭은 프로세스 풀에서 돌리고, 결과 확인은 메인 스레드에서
+        threading.Thread(target=work, daemon=True).start()
+
+    def finish_auto_calibration(self, results, image, origin, elapsed, popup=False, found=None):
+        from tkinter import messagebox
+
+        from tnl_autocal import POPUP_TARGETS
+        from tnl_locator import TARGET_LABELS
+
+        self.log_message(f"자동 보정: 매칭 {elapsed:.1f}초")
+        found = dict(found or {})
+        for label, result in results.items():
+            xy = None
+            if result.status == "ok":
+                xy = result.xy
+            elif result.status == "ambiguous":
+                xy = self.choose_candidate(label, result.candidates[:4], image, origin)
+            if xy is not None:
+                found[label] = xy
+                self.coords[label] = xy
+                self.log_message(f"{label} 좌표 자동 설정: ({xy[0]}, {xy[1]})")
+
+        if not popup and messagebox.askokcancel(
+                "자동 보정", f"{', '.join(POPUP_TARGETS)}은 이전실적복사 팝업 안에 있습니다.\n"
+                "ERP 에서 이전실적복사 팝업을 연 뒤 확인을 누르면 다시 캡처합니다.\n"
+                "(취소하면 직접 지정합니다)"):
+            self.auto_calibrate_gui(popup=True, found=found)
+            return
+
+        # 찾지 못한 대상은 기존 방식(마우스 위치)으로 지정
+        for label in TARGET_LABELS:
+            if label not in found and not self.get_coordinate(label):
+                self.log_message("좌표 설정이 완료되지 않았습니다. 모든 좌표를 설정해주세요.")
+                return
+        self.save_calibration()
+        messagebox.showinfo("완료", "모든 좌표가 설정되었습니다.")
+        self.save_config()
+
+    def choose_candidate(self, label, candidates, image, origin):
+        """모호한 대상의 후보들을 보여 주고 사용자가 고른 좌표를 돌려준다 (직접 지정이면 None)"""
+        import tkinter as tk
+        from tkinter import ttk
+
+        from PIL import ImageTk
+
+        popup = tk.Toplevel(self.root)
+        popup.title(f"자동 보정 - {label}")
+        popup.grab_set()
+
+        frame = ttk.Frame(popup, padding="20")
+        frame.pack(fill=tk.BOTH, expand=True)
+
+        ttk.Label(frame, text=f"{label} 후보가 여러 개입니다. 맞는 위치를 고르세요.",
+                  font=("맑은 고딕", 12, "bold")).pack(pady=(0, 10))
+
+        choice = [None]
+
+        def pick(xy):
+            choice[0] = xy
+            popup.destroy()
+
+        for candidate in candidates:
+            x, y = candidate.xy[0] - origin[0], candidate.xy[1] - origin[1]
+            crop = image.crop((x - 120, y - 40, x + 120, y + 40)).convert("RGB")
+            # 후보 위치에 빨간 십자 표시
+            crop.paste((255, 0, 0), (119, 30, 121, 50))
+            crop.paste((255, 0, 0), (110, 39, 130, 41))
+            tk_img = ImageTk.PhotoImage(crop)
+            button = ttk.Button(frame, image=tk_img, compound=tk.TOP,
+                                text=f"({candidate.xy[0]}, {candidate.xy[1]})  일치도 {candidate.score:.2f}",
+                                command=lambda xy=candidate.xy: pick(xy))
+            button.image = tk_img
+            button.pack(pady=4)
+
+        ttk.Button(frame, text="직접 지정", command=popup.destroy).pack(pady=(10, 0))
+
+        popup.wait_window()
+        return choice[0]
+
+    def create_locator(self, capture):
+        """참조 이미지로 대상 위치를 찾는 탐색기 (설정에서 켠 경우에만)"""
+        if not self.locator.get("enabled"):
+            return None
+        try:
+            from tnl_locator import TargetLocator
+            return TargetLocator(capture.grab, self.driver.screen_bounds,
+                                 templates=self.locator.get("templates"),
+                                 scale=self.locator.get("scale", 0.5),
+                                 threshold=self.locator.get("threshold", 0.8))
+        except Exception as e:
+            self.log_message(f"대상 위치 탐색을 사용할 수 없어 보정 좌표를 사용합니다: {e}", "WARNING")
+            return None
+
+    def create_recovery(self, capture, locator, recorder=None):
+        """등록된 ERP 팝업 처리와 실패 후 화면 복구 (설정의 'recovery')"""
+        from tnl_recovery import create_recovery
+
+        # 복구 입력도 녹화에 남기고 (작업 입력과 같은 순서로 감싼다),
+        # 복구가 누르는 escape 가 ESC 중단 단축키로 잡히지 않도록 중단 제어를 거친다
+        driver = recorder.wrap(self.driver) if recorder is not None else self.driver
+        driver = ControlledDriver(driver, self.control)
+        try:
+            return create_recovery(driver, self.recovery_options, capture.grab,
+                                   log=self.log_message, locator=locator)
+        except Exception as e:
+            self.log_message(f"팝업 이미지를 불러오지 못해 등록된 팝업 없이 복구합니다: {e}", "WARNING")
+            return create_recovery(driver, {**self.recovery_options, "popups": []},
+                                   capture.grab, log=self.log_message, locator=locator)
+
+    def create_recorder(self):
+        """ERP 없이 재생할 수 있도록 작업 녹화 (설정에서 켠 경우에만)"""
+        if not self.recording.get("enabled"):
+            return None
+        from tnl_replay import Recorder, recording_path
+
+        path = recording_path(self.recording.get("dir", "recordings"))
+        self.log_message(f"작업을 녹화합니다: {path}")
+        return Recorder(path, snapshots=self.recording.get("snapshots", True))
+
+    def checkpoint(self):
+        """일시정지 중이면 기다렸다가, 작업을 계속할지 돌려준다"""
+        try:
+            self.control.check()
+        except Aborted:
+            return False
+        return True
+
+    def run_dates(self, runner, ledger):
+        """날짜별 처리; 단계 확인에 실패한 날짜 목록을 돌려준다"""
+        done = ledger.done_dates(self.ref_date, self.employee) if self.skip_done else set()
+        failed = []
+        skipped = sum(1 for date in self.dates if date in done)
+        if skipped:
+            self.log_message(f"이미 완료된 날짜 {skipped}개를 건너뜁니다.")
+
+        # 복사 기준일자 입력 (한 번만)
+        if skipped < len(self.dates):
+            self.log_message("복사 기준일자를 입력합니다...")
+            self.ui.post(self.current_work_label.config, text="복사 기준일자 입력 중...",
+                         key="current_work")
+            runner.setup(self.ref_date)
+
+        # 날짜별 반복 작업
+        for i, date in enumerate(self.dates):
+            if date in done:
+                continue
+
+            if not self.checkpoint():
+                break
+
+            self.current_date_index = i
+            progress = ((i + 1) / len(self.dates)) * 100
+            self.ui.post(self.progress_var.set, progress, key="progress")
+            self.ui.post(self.progress_text.config,
+                         text=f"{i + 1} / {len(self.dates)} ({progress:.1f}%)", key="progress_text")
+            self.ui.post(self.current_work_label.config, text=f"처리 중: {date}", key="current_work")
+
+            self.log_message(f"날짜 {date} 처리 시작 ({i + 1}/{len(self.dates)})")
+
+            try:
+                runner.process_date(date)
+            except StepFailed:
+                # 완료 기록을 남기지 않으므로 다시 시작하면 이 날짜부터 처리한다
+                failed.append(date)
+                continue
+            ledger.mark_done(date, self.ref_date, self.employee)
+
+            self.log_message(f"날짜 {date} 처리 완료")
+        return failed
+
+    def run_batch(self, runner, ledger):
+        """사원 × 날짜 일괄 처리 (설정의 'batch'); 실패한 항목 목록을 돌려준다"""
+        from tnl_batch import ROW_HEIGHT, BatchRunner, Employee, plan_batch, plan_cost
+
+        employees = [Employee.from_dict(e) for e in self.batch["employees"]]
+        groups = plan_batch(employees, self.dates, ledger.done_items(self.ref_date))
+        cost = plan_cost(groups)
+        self.log_message(f"일괄 처리: 사원 {len(employees)}명 × 날짜 {len(self.dates)}개, "
+                         f"남은 항목 {cost['items']}개 (조회 {cost['queries']}회)")
+
+        def progress(done, total, eta, employee, date):
+            self.ui.post(self.progress_var.set, done / total * 100, key="progress")
+            self.ui.post(self.progress_text.config,
+                         text=f"{done} / {total} (남은 시간 약 {eta / 60:.0f}분)", key="progress_text")
+            self.ui.post(self.current_work_label.config, text=f"처리 중: {employee.name} {date}",
+                         key="current_work")
+
+        self.ui.post(self.current_work_label.config, text="복사 기준일자 입력 중...",
+                     key="current_work")
+        batch = BatchRunner(runner, self.ref_date, self.batch.get("row_height", ROW_HEIGHT),
+                            ledger=ledger, log=self.log_message)
+        batch.run(groups, checkpoint=self.checkpoint, progress=progress)
+        return [f"{employee.name} {date}" for employee, date in batch.failed]
+
+    def work_process(self):
+        from tkinter import messagebox
+
+        # 단계별 타이밍 스팬 (현재 폴더의 tnlcopy_trace.jsonl)
+        tracer = Tracer()
+        ledger = None
+        recorder = None
+        completed = False
+        failed = []
+        try:
+            # 완료 기록: 이미 끝난 항목은 건너뛰고 첫 미완료 항목부터 이어서 진행
+            ledger = Ledger(self.ledger_path)
+
+            # 제목줄 이미지로 ERP 창 기준점 찾기 (전체 화면 매칭이라 GUI 스레드에서는 건너뜀)
+            if self.calibration.get("anchor"):
+                self.apply_calibration(search=True)
+
+            # 타이밍 프로필 (tnl_tuner 로 측정한 단계별 대기) 적용
+            waits, pause = resolve_timing(self.waits, self.timing_profiles, self.timing_profile)
+            if self.timing_profile in self.timing_profiles:
+                self.log_message(f"타이밍 프로필 '{self.timing_profile}' 을 적용합니다.")
+                if pause is not None:
+                    self.driver.pause = pause
+
+            # 영역 캡처 캐시 (감시 영역과 위치 탐색이 공유, 녹화 중이면 캡처도 녹화)
+            recorder = self.create_recorder()
+            grab_driver = recorder.wrap(self.driver) if recorder is not None else self.driver
+            capture = CaptureService(grab_driver.screenshot)
+            locator = self.create_locator(capture)
+            runner = CopyRunner(self.driver, self.coords, waits, self.wait_regions,
+                                log=self.log_message, tracer=tracer,
+                                entry_modes=self.entry_modes, workflow=self.workflow,
+                                locator=locator, capture=capture, control=self.control,
+                                verify=True, recovery=self.create_recovery(capture, locator, recorder),
+                                recorder=recorder)
+
+            if self.batch.get("employees"):
+                failed = self.run_batch(runner, ledger)
+            else:
+                failed = self.run_dates(runner, ledger)
+
+            if self.is_running:
+                self.ui.post(self.progress_var.set, 100, key="progress")
+                self.ui.post(self.progress_text.config, text=f"완료! ({len(self.dates)}개 처리)",
+                             key="progress_text")
+                self.ui.post(self.current_work_label.config, text="작업 완료", key="current_work")
+                completed = True
+
+                if failed:
+                    self.log_message(f"확인에 실패한 항목 {len(failed)}개: {', '.join(failed)}",
+                                     "WARNING")
+                    self.ui.post(messagebox.showwarning, "일부 실패",
+                                 f"{len(failed)}개 항목의 처리를 확인하지 못했습니다:\n"
+                                 f"{', '.join(failed[:10])}\n\n"
+                                 "다시 시작하면 실패한 항목만 처리합니다.")
+                else:
+                    self.log_message("모든 작업이 완료되었습니다.")
+                    self.ui.post(messagebox.showinfo, "완료", "모든 작업이 완료되었습니다.")
+
+        except Aborted:
+            self.log_message("작업이 중단되어 진행 중이던 단계를 멈췄습니다.", "WARNING")
+        except Exception as e:
+            self.log_message(f"작업 중 오류 발생: {e}", "ERROR")
+            self.ui.post(messagebox.showerror, "오류", f"작업 중 오류가 발생했습니다:\n{e}")
+        finally:
+            tracer.close()
+            if ledger is not None:
+                ledger.close()
+            if recorder is not None:
+                recorder.close()
+            self.stop_work()
+            if completed and failed:
+                self.ui.post(self.status_label.config, text="일부 실패", foreground="orange",
+                             key="status")
+            elif completed:
+                self.ui.post(self.status_label.config, text="완료", foreground="green", key="status")
+
+    def ensure_hotkeys(self, keyboard):
+        """전역 단축키 (ESC 중단, 일시정지/재개) 를 처음 작업을 시작할 때 등록.
+
+        폴링 없이 키보드 후킹으로 감지한다. keyboard 는 이때 import 된다.
+        """
+        if self.unbind_hotkeys is not None:
+            return
+        try:
+            self.unbind_hotkeys = bind_hotkeys(keyboard, self.hotkeys, abort=self.on_abort_hotkey,
+                                               pause=self.on_pause_hotkey,
+                                               resume=self.on_resume_hotkey)
+        except Exception as e:
+            self.log_message(f"전역 단축키를 등록하지 못했습니다 (중지 버튼을 쓰세요): {e}", "WARNING")
+            self.unbind_hotkeys = lambda: None
+
+    def on_abort_hotkey(self):
+        # 매크로가 직접 누른 키(팝업 복구의 escape 등)는 그 이벤트만 삼킨다
+        key = self.hotkeys.get("abort", DEFAULT_HOTKEYS["abort"])
+        if self.control.consume_injected(key):
+            return
+        if self.is_running:
+            self.log_message(f"{key.upper()} 키가 감지되어 작업을 중단합니다.")
+            self.stop_work()
+
+    def on_pause_hotkey(self):
+        if self.control.consume_injected(self.hotkeys.get("pause", DEFAULT_HOTKEYS["pause"])):
+            return
+        if self.is_running and not self.is_paused:
+            self.pause_work()
+
+    def on_resume_hotkey(self):
+        if self.control.consume_injected(self.hotkeys.get("resume", DEFAULT_HOTKEYS["resume"])):
+            return
+        if self.is_running and self.is_paused:
+            self.pause_work()
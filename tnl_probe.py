@@ -0,0 +1,135 @@
+"""실행 환경 기능 점검과 무거운 라이브러리의 지연 import.
+
+probe() 는 모듈을 실제로 import 하지 않고(importlib.util.find_spec) 설치
+여부와 디스플레이 유무만 확인하므로 가볍다. 결과는 프로세스 안에서 한 번만
+계산해 캐시한다.
+
+    - display    : Windows/macOS 이거나 DISPLAY/WAYLAND_DISPLAY 가 있음
+    - gui        : display 이고 tkinter 가 있음
+    - automation : display 이고 pyautogui, keyboard 가 모두 설치됨
+
+lazy_import() 는 첫 속성 접근 때 import 하는 모듈 대리 객체를 돌려준다
+(설치되지 않았으면 None). tkcalendar, PIL, pyautogui, numpy 처럼 시작 시
+쓰지 않는 라이브러리는 이것으로 묶어 두어 시작 시간을 줄인다.
+
+    python tnl_probe.py
+"""
+
+import argparse
+import functools
+import importlib
+import importlib.util
+import json
+import os
+import sys
+import threading
+
+MODULES = ("tkinter", "tkcalendar", "PIL", "pyautogui", "keyboard", "numpy")
+
+
+class Capabilities:
+    """What this host can do; computed once by probe()."""
+
+    def __init__(self, display, modules):
+        self.display = display
+        self.modules = modules
+
+    @property
+    def gui(self):
+        return self.display and self.modules.get("tkinter", False)
+
+    @property
+    def automation(self):
+        return (self.display and self.modules.get("pyautogui", False)
+                and self.modules.get("keyboard", False))
+
+    def as_dict(self):
+        return {"display": self.display, "gui": self.gui,
+                "automation": self.automation, "modules": dict(self.modules)}
+
+
+class LazyModule:
+    """Module proxy that imports ``name`` on first attribute access.
+
+    ``on_load(module)`` runs once, right after the import (e.g. to set
+    pyautogui.FAILSAFE before the first call).
+    """
+
+    def __init__(self, name, on_load=None):
+        object.__setattr__(self, "_name", name)
+        object.__setattr__(self, "_on_load", on_load)
+        object.__setattr__(self, "_module", None)
+        object.__setattr__(self, "_lock", threading.Lock())
+
+    @property
+    def loaded(self):
+        return self._module is not None
+
+    def _load(self):
+        module = self._module
+        if module is None:
+            with self._lock:
+                module = self._module
+                if module is None:
+                    module = importlib.import_module(self._name)
+                    if self._on_load is not None:
+                        self._on_load(module)
+                    object.__setattr__(self, "_module", module)
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._load(), attr, value)
+
+    def __repr__(self):
+        state = "loaded" if self.loaded else "not loaded"
+        return f"<lazy module {self._name!r} ({state})>"
+
+
+def installed(name):
+    """True if the top-level package of ``name`` can be found (no import)."""
+    top = name.split(".")[0]
+    if top in sys.modules:
+        return True
+    try:
+        return importlib.util.find_spec(top) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def has_display():
+    if os.name == "nt" or sys.platform == "darwin":
+        return True
+    return bool(os.environ.get("DISPLAY") or os.environ.get("WAYLAND_DISPLAY"))
+
+
+@functools.lru_cache(maxsize=None)
+def probe():
+    """Capabilities of this process (cached after the first call)."""
+    return Capabilities(has_display(), {name: installed(name) for name in MODULES})
+
+
+def lazy_import(name, on_load=None):
+    """LazyModule for ``name``, or None when it is not installed."""
+    if not installed(name):
+        return None
+    module = sys.modules.get(name)
+    if module is not None:
+        if on_load is not None:
+            on_load(module)
+        return module
+    return LazyModule(name, on_load)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="자동화 실행 환경 점검")
+    parser.parse_args(argv)
+    caps = probe()
+    print(json.dumps(caps.as_dict(), ensure_ascii=False, indent=2))
+    return 0 if caps.automation else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
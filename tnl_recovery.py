@@ -0,0 +1,253 @@
+"""알려진 ERP 팝업 감지와 화면 복구.
+
+확인 팝업은 고정된 키(enter)로 닫으므로, ERP 가 예상하지 못한 팝업(중복
+데이터, 세션 경고, 입력 오류 등)을 띄우면 엉뚱한 것을 확인하거나 다음 클릭이
+팝업 위에 떨어진다. 알려진 팝업을 참조 이미지로 등록해 두면 실행 엔진이
+
+    - 키를 누르는 단계(press) 직전
+    - 단계 확인이 실패했을 때
+    - 날짜 하나를 마친 뒤
+
+팝업 영역에서 등록된 팝업을 찾아 지정한 동작으로 처리한다.
+
+    dismiss    : 확인 키(기본 enter, hotspot 이 있으면 그 위치 클릭)로 닫고 계속
+    cancel     : 취소 키(기본 escape)로 닫고 계속
+    abort_date : 닫은 뒤 화면을 기준 상태로 되돌리고 그 날짜를 실패 처리
+
+날짜가 실패하면(단계 확인 실패 포함) 다음 날짜로 넘어가기 전에 화면을 기준
+상태로 되돌린다: 복구 키(기본 escape)를 누르고, 등록된 팝업이 남아 있으면
+닫고, 기준 대상(baseline, 예: 일자 입력란)이 보이는지 확인한다. 기준 대상은
+대상 위치 탐색(locator)을 켠 경우에만 확인한다. 정해진 횟수 안에 돌아오지
+못하면 RecoveryFailed 로 작업을 멈춘다.
+
+복구 키 escape 는 ESC 중단 단축키와 같으므로 매크로는 중단 제어
+(tnl_control.ControlledDriver)를 거친 드라이버를 넘긴다. 복구가 보낸 escape
+이벤트만 단축키 처리에서 삼키고, 사용자가 누른 ESC 는 그대로 중단한다.
+
+    "recovery": {"popups": [{"name": "중복 데이터", "image": "중복 팝업.png",
+                             "action": "abort_date"},
+                            {"name": "세션 경고", "image": "세션 경고.png", "action": "dismiss",
+                             "box": [0, 0, 320, 140], "hotspot": [250, 120]}],
+                 "keys": ["escape"], "attempts": 3, "baseline": "일자 입력란"}
+
+이미지는 팝업 캡처(box 를 생략하면 이미지 전체)이고, hotspot 은 이미지 안의
+닫기 버튼 위치다.
+
+    python tnl_recovery.py               # 현재 화면에서 등록된 팝업 찾기
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+from tnl_engine import StepFailed, _default_log, _no_slot
+from tnl_wait import wait_until
+
+CONFIG_PATH = os.path.join(os.path.expanduser("~"), "Desktop", "tnlcopy_config.json")
+
+# 동작별 기본 키
+ACTIONS = {"dismiss": "enter", "cancel": "escape", "abort_date": "escape"}
+
+THRESHOLD = 0.85
+ATTEMPTS = 3
+BASELINE_KEYS = ("escape",)
+# 팝업을 닫은 뒤 사라질 때까지 기다리는 시간 (초)
+CLOSE_TIMEOUT = 2.0
+
+
+class PopupAborted(StepFailed):
+    """A registered popup whose action is abort_date was handled."""
+
+    def __init__(self, popup, date):
+        super().__init__(f"popup:{popup}", date)
+        self.popup = popup
+
+
+class RecoveryFailed(Exception):
+    """The screen could not be returned to its baseline state."""
+
+
+class Popup:
+    """A known ERP dialog, its reference template and how to close it."""
+
+    def __init__(self, name, template, action="dismiss", key=None, click=False):
+        if action not in ACTIONS:
+            raise ValueError(f"알 수 없는 팝업 동작: {action!r}")
+        self.name = name
+        self.template = template
+        self.action = action
+        self.key = key or ACTIONS[action]
+        self.click = click
+        self.scaled = None
+
+
+def load_popups(specs):
+    """Popups from the 'recovery' config's popup specs (missing images skipped)."""
+    from PIL import Image
+
+    from tnl_locator import load_template, reference_image_path
+
+    popups = []
+    for spec in specs or []:
+        path = spec["image"]
+        if not os.path.isabs(path):
+            path = reference_image_path(path)
+        if not os.path.exists(path):
+            continue
+        box = spec.get("box")
+        if box is None:
+            with Image.open(path) as image:
+                box = (0, 0) + image.size
+        template = load_template(path, box, spec.get("hotspot"))
+        popups.append(Popup(spec.get("name") or os.path.splitext(os.path.basename(path))[0],
+                            template, spec.get("action", "dismiss"), spec.get("key"),
+                            click="hotspot" in spec))
+    return popups
+
+
+class Recovery:
+    """Detects registered popups and returns the screen to its baseline.
+
+    ``grab(region)`` returns a PIL image (usually ``CaptureService.grab``).
+    ``baseline()`` returns True when the screen is back at its starting
+    state; without it, "no registered popup" counts as the baseline.
+    ``input_slot`` is the runner's input slot (see tnl_scheduler).
+    """
+
+    def __init__(self, driver, popups, grab=None, log=None, baseline=None, keys=BASELINE_KEYS,
+                 attempts=ATTEMPTS, scale=0.5, threshold=THRESHOLD, input_slot=None,
+                 sleep=time.sleep):
+        self.driver = driver
+        self.popups = popups
+        self.grab = grab or driver.screenshot
+        self.log = log or _default_log
+        self.baseline = baseline
+        self.keys = list(keys)
+        self.attempts = attempts
+        self.scale = scale
+        self.threshold = threshold
+        self.input_slot = input_slot or _no_slot
+        self.sleep = sleep
+        self.region = None
+        self.handled = []
+        for popup in popups:
+            popup.scaled = popup.template.scaled(scale)
+
+    def detect(self, region=None):
+        """(popup, screen xy) of the first registered popup shown, or None."""
+        region = region or self.region
+        if not self.popups or region is None:
+            return None
+        from tnl_locator import find_template
+
+        image = self.grab(region)
+        for popup in self.popups:
+            found = find_template(image, popup.template, popup.scaled, self.scale, self.threshold)
+            if found is not None:
+                return popup, (region[0] + found[0], region[1] + found[1])
+        return None
+
+    def handle(self, date, region=None):
+        """Close a registered popup if one is shown; returns it (or None).
+
+        Raises PopupAborted after restoring the baseline when the popup's
+        action is abort_date.
+        """
+        if region is not None:
+            self.region = region
+        found = self.detect()
+        if found is None:
+            return None
+        popup, xy = found
+        self.log(f"{date} '{popup.name}' 팝업 감지: {popup.action}", "WARNING")
+        self.handled.append((date, popup.name))
+        self.close(popup, xy)
+        if popup.action == "abort_date":
+            self.restore()
+            raise PopupAborted(popup.name, date)
+        return popup
+
+    def close(self, popup, xy):
+        with self.input_slot(not popup.click):
+            if popup.click:
+                self.driver.click(*xy)
+            else:
+                self.driver.press(popup.key)
+        if not wait_until(lambda: self.detect() is None, timeout=CLOSE_TIMEOUT, sleep=self.sleep):
+            self.log(f"'{popup.name}' 팝업이 닫히지 않았습니다.", "WARNING")
+
+    def at_baseline(self):
+        return self.detect() is None and (self.baseline is None or self.baseline())
+
+    def restore(self):
+        """Return the screen to its baseline or raise RecoveryFailed."""
+        for _ in range(self.attempts):
+            # 실패한 단계가 남긴 팝업(등록되지 않은 확인 팝업 등)을 닫는다
+            with self.input_slot(True):
+                for key in self.keys:
+                    self.driver.press(key)
+            for _ in self.popups:
+                found = self.detect()
+                if found is None:
+                    break
+                self.log(f"복구 중 '{found[0].name}' 팝업을 닫습니다.", "WARNING")
+                self.close(*found)
+            if self.at_baseline():
+                self.log("화면을 기준 상태로 되돌렸습니다.")
+                return
+        raise RecoveryFailed(f"{self.attempts}회 시도했지만 화면을 기준 상태로 되돌리지 못했습니다.")
+
+
+def create_recovery(driver, options, grab=None, log=None, locator=None, input_slot=None):
+    """Recovery from the config's 'recovery' section.
+
+    The baseline target is only checked when a locator is available.
+    """
+    options = options or {}
+    popups = load_popups(options.get("popups")) if options.get("popups") else []
+    target = options.get("baseline")
+    if target and locator is not None:
+        def at_target():
+            return locator.locate(target) is not None
+    else:
+        at_target = None
+    return Recovery(driver, popups, grab, log, at_target,
+                    keys=options.get("keys", BASELINE_KEYS),
+                    attempts=options.get("attempts", ATTEMPTS),
+                    threshold=options.get("threshold", THRESHOLD),
+                    input_slot=input_slot)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="등록된 ERP 팝업 찾기")
+    parser.add_argument("--config", default=CONFIG_PATH, help="설정 파일 (tnlcopy_config.json)")
+    args = parser.parse_args(argv)
+
+    config = {}
+    if os.path.exists(args.config):
+        with open(args.config, "r", encoding="utf-8") as f:
+            config = json.load(f)
+    popups = load_popups((config.get("recovery") or {}).get("popups"))
+    if not popups:
+        print("등록된 팝업이 없습니다. 설정의 recovery.popups 에 팝업 이미지를 추가하세요.")
+        return 1
+
+    import pyautogui
+
+    from tnl_driver import PyAutoGUIDriver
+
+    driver = PyAutoGUIDriver(pyautogui)
+    recovery = Recovery(driver, popups)
+    found = recovery.detect(driver.screen_bounds())
+    if found is None:
+        print(f"등록된 팝업 {len(popups)}개 중 화면에 보이는 것이 없습니다.")
+        return 0
+    popup, xy = found
+    print(f"{popup.name} ({popup.action}) {xy}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
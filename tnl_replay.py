@@ -0,0 +1,512 @@
+"""작업 녹화와 오프라인 재생.
+
+실제 ERP 에서 작업하는 동안 입력 드라이버를 거치는 모든 동작(클릭, 키,
+입력, 클립보드)과 화면 캡처를 시각과 함께 녹화한다. 입력마다 대상 주변의
+작은 영역(ROI)도 입력 전/후로 캡처해 둔다. 녹화 파일은 zip 한 개다:
+
+    events.jsonl      : 한 줄에 이벤트 하나 ({"t": 초, "ev": "click", "xy": [x, y]} ...)
+                        meta(녹화 시작), config(좌표, 감시 영역, 대기, 작업 순서,
+                        PAUSE), mark(기준일자 입력/날짜 시작), 입력, grab(캡처)
+    frames/<해시>.png : 캡처 화면. 같은 화면은 해시로 한 번만 저장
+
+PNG 압축과 파일 쓰기는 별도 스레드가 맡으므로 녹화가 입력 타이밍에 주는
+영향은 해시 계산과 ROI 캡처 정도다.
+
+이벤트는 녹화 중에 옆 파일(<녹화 파일>.jsonl)에 한 줄씩 바로 기록하고, 녹화를
+마칠 때 zip 에 넣은 뒤 지운다. 작업 도중 프로그램이 죽어 zip 이 닫히지 못해도
+이벤트는 옆 파일에 남으므로 --info 로 어디까지 진행했는지 볼 수 있다(화면이
+없으므로 재생은 할 수 없다).
+
+재생(ReplayDriver)은 녹화한 화면을 입력 순서에 맞춰 돌려준다. k 번째 입력
+뒤 t 초에 요청한 영역은 녹화 때 k 번째 입력 뒤 t 초까지 캡처한 마지막
+화면이다(같은 영역이 없으면 그 영역을 포함하는 캡처를 잘라 쓴다). 따라서
+ERP 없이 Linux 에서도 대기 조건, 단계 확인, 팝업 감지, 타이밍 프로필을
+녹화된 실제 화면 반응으로 회귀 시험하고 측정할 수 있다. 일괄 처리(batch)
+실행은 날짜 단위 표시가 없어 재생하지 않는다.
+
+설정 파일의 'recording' 으로 켠다:
+
+    "recording": {"enabled": true, "dir": "recordings", "snapshots": true}
+
+    python tnl_replay.py recordings/tnlcopy-20250813-204410.tnlrec --info
+    python tnl_replay.py recordings/tnlcopy-20250813-204410.tnlrec --profile fast
+    python tnl_replay.py rec.tnlrec --waits fast_waits.json --pause 0.05
+"""
+
+import argparse
+import bisect
+import functools
+import hashlib
+import io
+import json
+import os
+import queue
+import sys
+import threading
+import time
+import zipfile
+from datetime import datetime
+
+from tnl_driver import InputDriver
+from tnl_wait import region_around
+
+CONFIG_PATH = os.path.join(os.path.expanduser("~"), "Desktop", "tnlcopy_config.json")
+
+FORMAT_VERSION = 1
+EXTENSION = ".tnlrec"
+# 입력 전/후 ROI 캡처 크기
+ROI_SIZE = (240, 100)
+# 재생 입력이 녹화와 다를 때 앞에서 찾아보는 녹화 입력 수
+LOOKAHEAD = 8
+INPUTS = ("click", "press", "hotkey", "type")
+
+
+def events_path(path):
+    """Sidecar file the events are streamed to while recording."""
+    return path + ".jsonl"
+
+
+def frame_hash(image):
+    digest = hashlib.blake2b(digest_size=12)
+    digest.update(f"{image.mode}{image.size}".encode())
+    digest.update(image.tobytes())
+    return digest.hexdigest()
+
+
+class Recorder:
+    """Writes one recording file; frames are PNG-encoded on a writer thread.
+
+    CopyRunner(recorder=...) wraps its driver with ``wrap(driver)``,
+    records its settings with ``describe()`` and notes setup/date
+    boundaries with ``mark(kind, **fields)``.
+    """
+
+    def __init__(self, path, meta=None, snapshots=True, clock=time.monotonic):
+        self.path = path
+        self.snapshots = snapshots
+        self.clock = clock
+        self.start = clock()
+        self.frames = set()
+        self.events = 0
+        self._lock = threading.Lock()
+        self._zip = zipfile.ZipFile(path, "w")
+        # 비정상 종료에도 남도록 이벤트는 줄 단위로 바로 파일에 쓴다
+        self._events = open(events_path(path), "w", encoding="utf-8", buffering=1)
+        self._queue = queue.SimpleQueue()
+        self._writer = threading.Thread(target=self._write_frames, name="tnl-recorder", daemon=True)
+        self._writer.start()
+        self.event("meta", version=FORMAT_VERSION,
+                   started=datetime.now().isoformat(timespec="seconds"), **(meta or {}))
+
+    def event(self, ev, **fields):
+        record = {"t": round(self.clock() - self.start, 4), "ev": ev}
+        record.update(fields)
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+        with self._lock:
+            self._events.write(line + "\n")
+            self.events += 1
+
+    def frame(self, image):
+        """Hash of ``image``; new frames are queued for the writer thread."""
+        key = frame_hash(image)
+        with self._lock:
+            if key in self.frames:
+                return key
+            self.frames.add(key)
+        self._queue.put((key, image.copy()))
+        return key
+
+    def mark(self, kind, **fields):
+        self.event("mark", kind=kind, **fields)
+
+    def describe(self, **settings):
+        """Runner settings needed to replay (coords, waits, workflow ...)."""
+        self.event("config", **settings)
+
+    def wrap(self, driver):
+        """RecordingDriver for ``driver`` (a CaptureService built on it records too)."""
+        return RecordingDriver(driver, self)
+
+    def _write_frames(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            key, image = item
+            buffer = io.BytesIO()
+            image.save(buffer, "PNG")
+            # PNG 는 이미 압축되어 있으므로 그대로 저장
+            self._zip.writestr(f"frames/{key}.png", buffer.getvalue(), zipfile.ZIP_STORED)
+
+    def close(self):
+        if self._zip is None:
+            return
+        self._queue.put(None)
+        self._writer.join()
+        with self._lock:
+            self._events.close()
+        self._zip.write(events_path(self.path), "events.jsonl", zipfile.ZIP_DEFLATED)
+        self._zip.close()
+        self._zip = None
+        os.remove(events_path(self.path))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class RecordingDriver(InputDriver):
+    """Wraps an InputDriver and records every action and screen grab."""
+
+    def __init__(self, driver, recorder):
+        self.driver = driver
+        self.recorder = recorder
+        self._xy = None
+
+    @property
+    def pause(self):
+        return getattr(self.driver, "pause", 0.0)
+
+    def _snapshot(self, xy):
+        # 입력 대상 주변 ROI (키 입력은 마지막으로 클릭한 곳)
+        if self.recorder.snapshots and xy is not None:
+            self.screenshot(region_around(xy, *ROI_SIZE), roi=True)
+
+    def _input(self, ev, action, target=None, **fields):
+        self._snapshot(target or self._xy)
+        self.recorder.event(ev, **fields)
+        action()
+        if target is not None:
+            self._xy = target
+        self._snapshot(self._xy)
+
+    def click(self, x, y):
+        self._input("click", lambda: self.driver.click(x, y), (x, y), xy=[x, y])
+
+    def hotkey(self, *keys):
+        self._input("hotkey", lambda: self.driver.hotkey(*keys), keys=list(keys))
+
+    def press(self, key):
+        self._input("press", lambda: self.driver.press(key), key=key)
+
+    def type(self, text, interval=0.0):
+        self._input("type", lambda: self.driver.type(text, interval=interval), text=text)
+
+    def screenshot(self, region, roi=False):
+        image = self.driver.screenshot(region)
+        fields = {"roi": True} if roi else {}
+        self.recorder.event("grab", region=[int(v) for v in region],
+                            frame=self.recorder.frame(image), **fields)
+        return image
+
+    def screen_bounds(self):
+        return self.driver.screen_bounds()
+
+    def screen_layout(self, window_title=None):
+        return self.driver.screen_layout(window_title)
+
+    def get_clipboard(self):
+        text = self.driver.get_clipboard()
+        self.recorder.event("clipboard", text=text)
+        return text
+
+    def set_clipboard(self, text):
+        self.recorder.event("set_clipboard", text=text)
+        self.driver.set_clipboard(text)
+
+
+def recording_path(directory, prefix="tnlcopy"):
+    os.makedirs(directory, exist_ok=True)
+    name = f"{prefix}-{datetime.now().strftime('%Y%m%d-%H%M%S')}{EXTENSION}"
+    return os.path.join(directory, name)
+
+
+class Recording:
+    """A loaded recording: meta, events and lazily decoded frames."""
+
+    def __init__(self, path):
+        self.path = path
+        self._zip = None
+        if zipfile.is_zipfile(path):
+            self._zip = zipfile.ZipFile(path)
+            with self._zip.open("events.jsonl") as f:
+                self.events = [json.loads(line) for line in io.TextIOWrapper(f, encoding="utf-8")]
+        else:
+            # 녹화가 끝나지 못한 파일: 옆 파일의 이벤트만 읽는다 (화면 없음)
+            with open(events_path(path), "r", encoding="utf-8") as f:
+                self.events = [json.loads(line) for line in f if line.endswith("\n")]
+        # 녹화 시작 정보와 실행 엔진이 남긴 설정(config)을 합친다
+        self.meta = {}
+        for event in self.events:
+            if event["ev"] in ("meta", "config"):
+                self.meta.update(event)
+        self.frame = functools.lru_cache(maxsize=64)(self._frame)
+
+    @property
+    def complete(self):
+        """False for an interrupted recording that has events but no frames."""
+        return self._zip is not None
+
+    def frame_count(self):
+        if self._zip is None:
+            return 0
+        return sum(1 for name in self._zip.namelist() if name.startswith("frames/"))
+
+    def _frame(self, key):
+        from PIL import Image
+
+        with self._zip.open(f"frames/{key}.png") as f:
+            image = Image.open(f)
+            image.load()
+        return image
+
+    def marks(self):
+        return [e for e in self.events if e["ev"] == "mark"]
+
+    def date_durations(self):
+        """{date: recorded seconds} from one date mark to the next."""
+        end = self.events[-1]["t"] if self.events else 0.0
+        marks = self.marks()
+        durations = {}
+        for mark, nxt in zip(marks, marks[1:] + [None]):
+            if mark["kind"] == "date":
+                durations[mark["date"]] = round((nxt["t"] if nxt else end) - mark["t"], 3)
+        return durations
+
+    def close(self):
+        if self._zip is not None:
+            self._zip.close()
+
+
+class ReplayDriver(InputDriver):
+    """Plays a Recording back: inputs advance the timeline, grabs read it.
+
+    ``mismatches`` counts inputs that did not match the recording and
+    ``misses`` regions that no recorded grab covered.
+    """
+
+    def __init__(self, recording, pause=0.0, clock=time.monotonic, sleep=time.sleep):
+        self.recording = recording
+        self.pause = pause
+        self.clock = clock
+        self.sleep = sleep
+        self.inputs = []
+        self._grabs = {}        # region -> ([(segment, dt)], [frame]) in time order
+        self._clipboard = []
+        segment, seg_start = -1, 0.0
+        for event in recording.events:
+            ev = event["ev"]
+            if ev in INPUTS:
+                self.inputs.append(event)
+                segment, seg_start = len(self.inputs) - 1, event["t"]
+            elif ev == "grab":
+                times, frames = self._grabs.setdefault(tuple(event["region"]), ([], []))
+                times.append((segment, event["t"] - seg_start))
+                frames.append(event["frame"])
+            elif ev == "clipboard":
+                self._clipboard.append(event["text"])
+        self._sources = {}
+        self.cursor = 0
+        self.segment = -1
+        self.seg_start = clock()
+        self.mismatches = 0
+        self.misses = 0
+        self.clipboard = ""
+
+    def _advance(self, ev, **fields):
+        expected = dict(fields, ev=ev)
+        for i in range(self.cursor, min(self.cursor + LOOKAHEAD, len(self.inputs))):
+            recorded = self.inputs[i]
+            if all(recorded.get(k) == v for k, v in expected.items()):
+                if i > self.cursor:
+                    self.mismatches += i - self.cursor
+                self.cursor = i + 1
+                self.segment, self.seg_start = i, self.clock()
+                break
+        else:
+            # 녹화에 없는 입력 (재시도 등): 화면은 직전 입력 뒤 그대로 흐른다
+            self.mismatches += 1
+        if self.pause:
+            self.sleep(self.pause)
+
+    def click(self, x, y):
+        self._advance("click", xy=[x, y])
+
+    def hotkey(self, *keys):
+        self._advance("hotkey", keys=list(keys))
+
+    def press(self, key):
+        self._advance("press", key=key)
+
+    def type(self, text, interval=0.0):
+        self._advance("type", text=text)
+
+    def _covering(self, region):
+        """Recorded regions containing ``region`` (cached)."""
+        if region not in self._sources:
+            left, top, width, height = region
+            self._sources[region] = [
+                r for r in self._grabs
+                if r[0] <= left and r[1] <= top
+                and left + width <= r[0] + r[2] and top + height <= r[1] + r[3]]
+        return self._sources[region]
+
+    def screenshot(self, region):
+        from PIL import Image
+
+        region = tuple(int(v) for v in region)
+        now = (self.segment, self.clock() - self.seg_start)
+        before = after = None
+        for source in self._covering(region):
+            times, frames = self._grabs[source]
+            i = bisect.bisect_right(times, now) - 1
+            if i >= 0 and (before is None or times[i] > before[0]):
+                before = (times[i], frames[i], source)
+            if i + 1 < len(times) and (after is None or times[i + 1] < after[0]):
+                after = (times[i + 1], frames[i + 1], source)
+        # 같은 입력 구간의 캡처를 우선한다. 재생이 녹화보다 빨라 아직 캡처가
+        # 없던 시점이면 그 구간의 첫 캡처가 이전 구간의 오래된 캡처보다 정확하다
+        if before is not None and before[0][0] == self.segment:
+            best = before
+        elif after is not None and after[0][0] == self.segment:
+            best = after
+        else:
+            best = before or after
+        if best is None:
+            self.misses += 1
+            return Image.new("RGB", region[2:], (0, 0, 0))
+        _, key, source = best
+        image = self.recording.frame(key)
+        if source == region:
+            return image
+        left, top = region[0] - source[0], region[1] - source[1]
+        return image.crop((left, top, left + region[2], top + region[3]))
+
+    def screen_bounds(self):
+        return tuple(self.recording.meta.get("bounds") or (0, 0, 1920, 1080))
+
+    def screen_layout(self, window_title=None):
+        return self.recording.meta.get("layout") or super().screen_layout(window_title)
+
+    def get_clipboard(self):
+        if self._clipboard:
+            return self._clipboard.pop(0)
+        return self.clipboard
+
+    def set_clipboard(self, text):
+        self.clipboard = text
+
+
+def replay(recording, waits=None, pause=None, entry_modes=None, workflow=None, verify=True,
+           log=None):
+    """Run the recorded setup/dates through CopyRunner on a ReplayDriver.
+
+    Settings left as None come from the recording. Returns a summary
+    dict with per-date recorded and replayed seconds and outcomes.
+    """
+    from tnl_engine import CopyRunner, StepFailed
+
+    meta = recording.meta
+    driver = ReplayDriver(recording, meta.get("pause", 0.0) if pause is None else pause)
+    runner = CopyRunner(driver, {k: tuple(v) for k, v in meta["coords"].items()},
+                        meta.get("waits") if waits is None else waits, meta.get("wait_regions"),
+                        log=log or _quiet,
+                        entry_modes=meta.get("entry_modes") if entry_modes is None else entry_modes,
+                        workflow=meta.get("workflow") if workflow is None else workflow,
+                        verify=verify)
+    recorded = recording.date_durations()
+    dates = {}
+    start = time.perf_counter()
+    for mark in recording.marks():
+        if mark["kind"] == "setup":
+            runner.setup(mark["ref_date"])
+            continue
+        date = mark["date"]
+        t0 = time.perf_counter()
+        outcome = "ok"
+        try:
+            runner.process_date(date)
+        except StepFailed as e:
+            outcome = f"failed:{e.step}"
+        dates[date] = {"recorded_s": recorded.get(date), "outcome": outcome,
+                       "replay_s": round(time.perf_counter() - t0, 3),
+                       "retried": list(runner.retried)}
+    return {"dates": dates, "total_s": round(time.perf_counter() - start, 3),
+            "recorded_s": round(sum(v for v in recorded.values() if v), 3),
+            "mismatches": driver.mismatches, "misses": driver.misses}
+
+
+def _quiet(message, level="INFO"):
+    pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="녹화한 작업을 ERP 없이 재생")
+    parser.add_argument("recording", help="녹화 파일 (.tnlrec)")
+    parser.add_argument("--info", action="store_true", help="재생하지 않고 녹화 내용만 요약")
+    parser.add_argument("--config", default=CONFIG_PATH,
+                        help="타이밍 프로필을 읽을 설정 파일 (tnlcopy_config.json)")
+    parser.add_argument("--profile", help="설정 파일의 타이밍 프로필 이름")
+    parser.add_argument("--waits", help="대기 설정 JSON 파일 (녹화 당시 대기 대신 사용)")
+    parser.add_argument("--pause", type=float, help="입력 동작마다의 대기 (초)")
+    parser.add_argument("--no-verify", action="store_true", help="단계 확인/재시도 없이 재생")
+    args = parser.parse_args(argv)
+    if args.profile and not os.path.exists(args.config):
+        parser.error(f"--profile 에 필요한 설정 파일이 없습니다: {args.config} (--config 로 지정)")
+
+    recording = Recording(args.recording)
+    try:
+        meta = recording.meta
+        if args.info:
+            counts = {}
+            for event in recording.events:
+                counts[event["ev"]] = counts.get(event["ev"], 0) + 1
+            frames = recording.frame_count()
+            print(f"녹화: {meta.get('started')}  형식 {meta.get('version')}  "
+                  f"{os.path.getsize(args.recording) / 1024:.0f}KB"
+                  + ("" if recording.complete else "  (중단된 녹화: 이벤트만 있음)"))
+            print("이벤트: " + ", ".join(f"{ev} {n}" for ev, n in sorted(counts.items())))
+            print(f"화면: 캡처 {counts.get('grab', 0)}회, 저장 {frames}장")
+            for date, seconds in recording.date_durations().items():
+                print(f"  {date}  {seconds:.2f}s")
+            return 0
+        if not recording.complete:
+            print("녹화가 끝나지 못해 화면이 없습니다. --info 로 이벤트만 볼 수 있습니다.")
+            return 2
+
+        waits, pause = None, args.pause
+        if args.profile:
+            from tnl_wait import resolve_timing
+
+            with open(args.config, "r", encoding="utf-8") as f:
+                config = json.load(f)
+            profiles = config.get("timing_profiles", {})
+            if args.profile not in profiles:
+                print(f"타이밍 프로필 '{args.profile}' 이 없습니다.")
+                return 2
+            waits, profile_pause = resolve_timing(meta.get("waits"), profiles, args.profile)
+            if pause is None:
+                pause = profile_pause
+        if args.waits:
+            with open(args.waits, "r", encoding="utf-8") as f:
+                waits = json.load(f)
+
+        result = replay(recording, waits=waits, pause=pause, verify=not args.no_verify)
+    finally:
+        recording.close()
+
+    print(f"{'날짜':<12}{'녹화':>8}{'재생':>8}  결과")
+    for date, row in result["dates"].items():
+        recorded = f"{row['recorded_s']:8.2f}" if row["recorded_s"] is not None else f"{'-':>8}"
+        retried = f" (재시도 {', '.join(row['retried'])})" if row["retried"] else ""
+        print(f"{date:<12}{recorded}{row['replay_s']:8.2f}  {row['outcome']}{retried}")
+    print(f"합계: 녹화 {result['recorded_s']:.2f}s, 재생 {result['total_s']:.2f}s, "
+          f"입력 불일치 {result['mismatches']}, 화면 없음 {result['misses']}")
+    failed = any(row["outcome"] != "ok" for row in result["dates"].values())
+    return 1 if failed or result["mismatches"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,230 @@
+"""여러 ERP 창을 번갈아 구동하는 스케줄러.
+
+날짜 하나의 시간 대부분은 ERP 응답(조회 결과, 확인 팝업)을 기다리는 시간이다.
+창마다 좌표와 날짜 목록을 따로 두고 창별 작업 스레드를 돌리면, 한 창이 조회
+결과를 기다리는 동안 다른 창에 입력할 수 있다. 마우스/키보드는 하나이므로
+입력 구간(클릭, 입력, 키)은 공유 잠금으로 직렬화하고 대기만 겹친다.
+
+키 입력(press)은 포커스된 창으로 가므로, 직전 입력이 다른 창이었으면 창마다
+지정한 activate 좌표(제목 표시줄 등 눌러도 안전한 곳)를 먼저 클릭한다.
+
+조회 결과/확인 팝업 감시 영역의 기본값은 좌표 주변을 넓게 잡으므로 옆 창까지
+덮을 수 있다. 창이 여러 개이면 창마다 rect([left, top, width, height], 창 영역)를
+지정해 기본 영역을 그 안으로 자르거나, wait_regions 로 grid/popup 영역을 직접
+지정해야 한다.
+
+창 목록 파일 예:
+
+    [{"name": "A", "activate": [400, 12], "rect": [0, 0, 960, 1040], "ref_date": "2025-08-01",
+      "dates": ["2025-08-04", "2025-08-05"], "coords": {"일자 입력란": [...], ...}},
+     {"name": "B", "activate": [1360, 12], ...}]
+
+    python tnl_scheduler.py windows.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+from tnl_control import Aborted, Control
+from tnl_engine import CopyRunner, StepFailed, _default_log
+from tnl_ledger import LEDGER_PATH, Ledger
+from tnl_recovery import create_recovery
+
+CONFIG_PATH = os.path.join(os.path.expanduser("~"), "Desktop", "tnlcopy_config.json")
+
+# 창 활성화 클릭 후 포커스가 옮겨질 때까지의 대기 (초)
+ACTIVATE_SETTLE = 0.2
+
+
+class Window:
+    """One ERP window: its coordinates, activation point and date queue."""
+
+    def __init__(self, name, coords, dates, ref_date, activate=None, wait_regions=None,
+                 employee="", rect=None):
+        self.name = name
+        self.coords = {k: tuple(v) for k, v in coords.items()}
+        self.dates = list(dates)
+        self.ref_date = ref_date
+        self.activate = tuple(activate) if activate else None
+        self.wait_regions = wait_regions or {}
+        self.employee = employee
+        self.rect = tuple(rect) if rect else None
+
+    def has_own_regions(self):
+        """True if no probe region can spill over a neighbouring window."""
+        return self.rect is not None or all(k in self.wait_regions for k in ("grid", "popup"))
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["name"], data["coords"], data.get("dates", []), data["ref_date"],
+                   data.get("activate"), data.get("wait_regions"), data.get("employee", ""),
+                   data.get("rect"))
+
+
+class InputArbiter:
+    """Serializes input between windows and re-activates on a switch."""
+
+    def __init__(self, driver, settle=ACTIVATE_SETTLE, sleep=time.sleep):
+        self.driver = driver
+        self.settle = settle
+        self.sleep = sleep
+        self.owner = None
+        self.switches = 0
+        self._lock = threading.Lock()
+
+    def slot(self, window):
+        @contextmanager
+        def acquire(needs_focus=False):
+            with self._lock:
+                if needs_focus and self.owner != window.name and window.activate:
+                    self.driver.click(*window.activate)
+                    self.sleep(self.settle)
+                if self.owner != window.name:
+                    self.switches += 1
+                self.owner = window.name
+                yield
+
+        return acquire
+
+
+class InterleavedScheduler:
+    """Runs every window's date queue concurrently over one input device.
+
+    ``run()`` returns {window name: {"done", "failed", "skipped", "error",
+    "elapsed"}}. ``recovery`` is the config's 'recovery' section; each
+    window gets its own popup recovery.
+    ``stop()`` ends every window before its next input.
+    """
+
+    def __init__(self, driver, windows, waits=None, log=None, tracer=None, ledger=None,
+                 entry_modes=None, workflow=None, recovery=None):
+        if len(windows) > 1 and not all(w.activate for w in windows):
+            raise ValueError("창이 여러 개이면 창마다 activate 좌표가 필요합니다.")
+        if len(windows) > 1 and not all(w.has_own_regions() for w in windows):
+            raise ValueError("창이 여러 개이면 창마다 rect 또는 wait_regions(grid, popup)가 필요합니다.")
+        self.driver = driver
+        self.windows = windows
+        self.waits = waits
+        self.log = log or _default_log
+        self.tracer = tracer
+        self.ledger = ledger
+        self.entry_modes = entry_modes
+        self.workflow = workflow
+        self.recovery = recovery
+        self.arbiter = InputArbiter(driver)
+        self.control = Control()
+        self.results = {}
+
+    def stop(self):
+        self.control.abort()
+
+    def run(self):
+        threads = []
+        for window in self.windows:
+            self.results[window.name] = {"done": [], "failed": [], "skipped": 0, "error": None,
+                                       "elapsed": 0.0}
+            thread = threading.Thread(target=self._run_window, args=(window,),
+                                      name=f"tnl-window-{window.name}", daemon=True)
+            thread.start()
+            threads.append(thread)
+        for thread in threads:
+            thread.join()
+        return self.results
+
+    def _run_window(self, window):
+        result = self.results[window.name]
+        start = time.perf_counter()
+
+        def log(message, level="INFO"):
+            self.log(f"[{window.name}] {message}", level)
+
+        try:
+            dates = window.dates
+            if self.ledger is not None:
+                dates = self.ledger.pending(window.dates, window.ref_date, window.employee)
+                result["skipped"] = len(window.dates) - len(dates)
+            if not dates:
+                return
+            if self.tracer is not None:
+                self.tracer.context["window"] = window.name
+            slot = self.arbiter.slot(window)
+            recovery = create_recovery(self.driver, self.recovery, log=log, input_slot=slot)
+            runner = CopyRunner(self.driver, window.coords, self.waits, window.wait_regions,
+                                log=log, tracer=self.tracer, entry_modes=self.entry_modes,
+                                workflow=self.workflow, input_slot=slot,
+                                control=self.control, verify=True, recovery=recovery,
+                                bounds=window.rect)
+            runner.setup(window.ref_date)
+            for date in dates:
+                if self.control.aborted:
+                    break
+                try:
+                    runner.process_date(date)
+                except StepFailed:
+                    result["failed"].append(date)
+                    continue
+                if self.ledger is not None:
+                    self.ledger.mark_done(date, window.ref_date, window.employee)
+                result["done"].append(date)
+                log(f"날짜 {date} 처리 완료")
+        except Aborted:
+            log("작업이 중단되었습니다.", "WARNING")
+        except Exception as e:
+            result["error"] = str(e)
+            log(f"작업 중 오류 발생: {e}", "ERROR")
+        finally:
+            result["elapsed"] = round(time.perf_counter() - start, 2)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="여러 ERP 창 동시 구동")
+    parser.add_argument("windows", help="창 목록 JSON 파일")
+    parser.add_argument("--config", default=CONFIG_PATH, help="설정 파일 (대기/입력 방식/작업 순서)")
+    parser.add_argument("--ledger", default=LEDGER_PATH, help="완료 기록 원장")
+    args = parser.parse_args(argv)
+
+    import pyautogui
+
+    from tnl_driver import PyAutoGUIDriver
+    from tnl_trace import Tracer
+    from tnl_wait import resolve_timing
+
+    with open(args.windows, "r", encoding="utf-8") as f:
+        windows = [Window.from_dict(w) for w in json.load(f)]
+    config = {}
+    if os.path.exists(args.config):
+        with open(args.config, "r", encoding="utf-8") as f:
+            config = json.load(f)
+
+    driver = PyAutoGUIDriver(pyautogui)
+    waits, pause = resolve_timing(config.get("waits"), config.get("timing_profiles", {}),
+                                  config.get("timing_profile", ""))
+    if pause is not None:
+        driver.pause = pause
+    tracer = Tracer()
+    ledger = Ledger(args.ledger)
+    scheduler = InterleavedScheduler(driver, windows, waits, tracer=tracer, ledger=ledger,
+                                     entry_modes=config.get("entry_modes"),
+                                     workflow=config.get("workflow"),
+                                     recovery=config.get("recovery"))
+    print(f"{len(windows)}개 창 작업을 3초 후 시작합니다.")
+    time.sleep(3)
+    try:
+        results = scheduler.run()
+    finally:
+        tracer.close()
+        ledger.close()
+    for name, result in results.items():
+        status = result["error"] or "ok"
+        print(f"{name:<8}완료 {len(result['done'])}  실패 {len(result['failed'])}  "
+              f"건너뜀 {result['skipped']}  {result['elapsed']:.1f}s  {status}")
+    return 1 if any(r["error"] or r["failed"] for r in results.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
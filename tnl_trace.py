@@ -0,0 +1,228 @@
+"""단계별 타이밍 스팬을 JSONL 로 기록하는 트레이서.
+
+사람이 읽는 tnlcopy.log 와 별도로, work_process 의 모든 단계/입력/대기를
+한 줄짜리 JSON 레코드로 남긴다. 레코드 필드:
+
+    kind    : step | input | sleep | wait
+    name    : 단계 이름 또는 입력 동작 (click, press ...)
+    date    : 처리 중인 날짜
+    target  : 좌표 대상 이름과 [x, y]
+    t0, t1  : time.monotonic() 시작/종료 시각, dur = t1 - t0
+    outcome : ok | timeout | error
+    pause   : input 레코드에 포함된 pyautogui.PAUSE (초)
+
+파일은 로그 폴더(설정의 logging.dir 또는 TNLCOPY_LOG_DIR, 기본: 현재 폴더)의
+tnlcopy_trace.jsonl 이다. 크기가 max_bytes 를 넘으면 tnlcopy_trace.jsonl.1,
+.2 ... 로 회전하고 최근 backup_count 개만 남긴다.
+
+기록된 파일은 다음처럼 요약할 수 있다:
+
+    python tnl_trace.py                  # 로그 폴더의 tnlcopy_trace.jsonl
+    python tnl_trace.py D:/logs/tnlcopy_trace.jsonl.1
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from tnl_driver import InputDriver
+from tnl_logging import log_dir
+
+TRACE_FILE = "tnlcopy_trace.jsonl"
+MAX_BYTES = 10 * 1024 * 1024
+BACKUP_COUNT = 3
+
+
+def trace_path():
+    """tnlcopy_trace.jsonl in the log folder (see tnl_logging.log_dir)."""
+    return os.path.join(log_dir(), TRACE_FILE)
+
+
+class Tracer:
+    """Writes compact JSONL span records to ``path`` (rotated by size).
+
+    A bare file name is placed in the log folder; ``path=None`` records
+    nothing.
+    """
+
+    def __init__(self, path=TRACE_FILE, max_bytes=MAX_BYTES, backup_count=BACKUP_COUNT):
+        if path and not os.path.dirname(path):
+            path = os.path.join(log_dir(), path)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.run = datetime.now().strftime("%Y%m%d-%H%M%S")
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._file = None
+        self._size = 0
+        if path:
+            self._open()
+
+    def _open(self):
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._size = self._file.tell()
+
+    def _rotate(self):
+        self._file.close()
+        for index in range(self.backup_count - 1, 0, -1):
+            source = f"{self.path}.{index}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{index + 1}")
+        if self.backup_count:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self._open()
+
+    @property
+    def context(self):
+        """Fields added to every record; kept per thread (one per ERP window)."""
+        if not hasattr(self._local, "context"):
+            self._local.context = {}
+        return self._local.context
+
+    def emit(self, kind, name, t0, t1, outcome="ok", **fields):
+        if self._file is None:
+            return
+        record = {"run": self.run, "kind": kind, "name": name}
+        record.update(self.context)
+        record.update(fields)
+        record.update(t0=round(t0, 4), t1=round(t1, 4), dur=round(t1 - t0, 4), outcome=outcome)
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+        size = len(line.encode("utf-8"))
+        with self._lock:
+            if self._file is None:
+                return
+            if self.max_bytes and self._size and self._size + size > self.max_bytes:
+                self._rotate()
+            self._file.write(line)
+            self._size += size
+
+    @contextmanager
+    def span(self, kind, name, **fields):
+        """Time the enclosed block; the yielded dict may set ``outcome``."""
+        state = {"outcome": "ok"}
+        t0 = time.monotonic()
+        try:
+            yield state
+        except BaseException:
+            state["outcome"] = "error"
+            raise
+        finally:
+            self.emit(kind, name, t0, time.monotonic(), state["outcome"], **fields)
+
+    def sleep(self, seconds, sleep=time.sleep):
+        """``sleep`` (time.sleep) recorded as an explicit sleep span."""
+        t0 = time.monotonic()
+        sleep(seconds)
+        self.emit("sleep", "sleep", t0, time.monotonic())
+
+    def flush(self):
+        if self._file is not None:
+            with self._lock:
+                self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            with self._lock:
+                self._file.close()
+            self._file = None
+
+
+class NullTracer(Tracer):
+    """Tracer that records nothing."""
+
+    def __init__(self):
+        super().__init__(path=None)
+
+    def sleep(self, seconds, sleep=time.sleep):
+        sleep(seconds)
+
+
+class TracingDriver(InputDriver):
+    """Wraps an InputDriver and records every action as an ``input`` span."""
+
+    def __init__(self, driver, tracer, pause=0.0):
+        self.driver = driver
+        self.tracer = tracer
+        self.pause = pause
+
+    def click(self, x, y):
+        with self.tracer.span("input", "click", xy=[x, y], pause=self.pause):
+            self.driver.click(x, y)
+
+    def hotkey(self, *keys):
+        with self.tracer.span("input", "hotkey", keys=list(keys), pause=self.pause):
+            self.driver.hotkey(*keys)
+
+    def press(self, key):
+        with self.tracer.span("input", "press", key=key, pause=self.pause):
+            self.driver.press(key)
+
+    def type(self, text, interval=0.0):
+        with self.tracer.span("input", "type", chars=len(text), pause=self.pause):
+            self.driver.type(text, interval=interval)
+
+    def screenshot(self, region):
+        # 대기 조건 폴링마다 호출되므로 별도 스팬 없이 그대로 전달
+        return self.driver.screenshot(region)
+
+    def screen_bounds(self):
+        return self.driver.screen_bounds()
+
+    def screen_layout(self, window_title=None):
+        return self.driver.screen_layout(window_title)
+
+    def get_clipboard(self):
+        return self.driver.get_clipboard()
+
+    def set_clipboard(self, text):
+        self.driver.set_clipboard(text)
+
+
+def summarize(lines):
+    """Split each date's time into PAUSE, input, explicit sleep and waits.
+
+    Returns {date: {"total", "pause", "input", "sleep", "wait"}} in seconds.
+    """
+    dates = {}
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        rec = json.loads(line)
+        date = rec.get("date")
+        if date is None:
+            continue
+        row = dates.setdefault(date, {"total": 0.0, "pause": 0.0, "input": 0.0,
+                                      "sleep": 0.0, "wait": 0.0})
+        kind, dur = rec["kind"], rec["dur"]
+        if kind == "step":
+            row["total"] += dur
+        elif kind == "input":
+            pause = min(rec.get("pause", 0.0), dur)
+            row["pause"] += pause
+            row["input"] += dur - pause
+        elif kind in ("sleep", "wait"):
+            row[kind] += dur
+    return dates
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    path = argv[0] if argv else trace_path()
+    with open(path, "r", encoding="utf-8") as f:
+        dates = summarize(f)
+    print(f"{'날짜':<12}{'전체':>8}{'PAUSE':>8}{'입력':>8}{'sleep':>8}{'대기':>8}")
+    for date, row in dates.items():
+        print(f"{date:<12}" + "".join(f"{row[k]:8.2f}" for k in
+                                      ("total", "pause", "input", "sleep", "wait")))
+
+
+if __name__ == "__main__":
+    main()
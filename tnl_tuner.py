@@ -0,0 +1,238 @@
+"""단계별 대기 시간 자동 조정기.
+
+작업 순서를 반복 실행하면서 단계별 대기(settle)와 입력 동작 대기(pause)를
+이진 탐색으로 줄여, 검증을 통과하는 가장 짧은 값에 안전 여유를 더한다.
+결과는 tnlcopy_config.json 의 'timing_profiles' 에 이름을 붙여 저장하며,
+'timing_profile' 로 선택한 프로필이 작업 시작 시 적용된다.
+
+    # 모의 화면 (Linux 는 xvfb-run -a)
+    python tnl_tuner.py --profile sim-fast --query 0.8 --jitter 0.2
+
+    # 실제 ERP (감독 모드: 시도마다 결과를 사람이 확인)
+    python tnl_tuner.py --profile erp-evening --supervised --dates 2025-08-04 --ref-date 2025-08-01
+
+실제 ERP 에서는 다시 복사해도 되는 날짜만 사용하고, 매크로 GUI 를 닫은 상태에서
+실행한다 (GUI 의 설정 저장이 프로필을 덮어쓸 수 있다).
+
+시도마다 매크로와 같은 설정 파일의 입력 방식(entry_modes), 작업 순서(workflow),
+감시 영역(wait_regions)으로 실행해야 측정한 대기가 실제 작업에 맞는다. 모의
+화면은 좌표가 다르므로 감시 영역만 빼고 쓴다.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+from tnl_engine import CopyRunner
+from tnl_wait import wait_settings
+
+CONFIG_PATH = os.path.join(os.path.expanduser("~"), "Desktop", "tnlcopy_config.json")
+
+# 조정 대상 대기 (tnl_wait.DEFAULT_WAITS 의 settle) + 입력 동작 대기
+TUNABLE_WAITS = ["focus", "entry", "query", "select", "popup_open", "popup_close"]
+# 매크로가 CopyRunner 에 넘기는 설정 파일 항목
+RUNNER_SETTINGS = ("wait_regions", "entry_modes", "workflow")
+
+
+def runner_settings(config):
+    """CopyRunner keyword arguments taken from the config, as the macro uses them."""
+    return {key: config.get(key) for key in RUNNER_SETTINGS}
+
+
+class SimulatedTrial:
+    """Runs candidate timings against a FakeTNLScreen and checks its records."""
+
+    def __init__(self, dates, ref_date, latency=None, jitter=0.0, settings=None):
+        from tnl_fake_erp import FakeERPDriver, FakeTNLScreen
+
+        self.dates = dates
+        self.ref_date = ref_date
+        # 감시 영역은 실제 ERP 화면 좌표라 모의 화면에는 맞지 않는다
+        self.settings = {k: v for k, v in (settings or {}).items() if k != "wait_regions"}
+        self.screen = FakeTNLScreen(latency=latency, jitter=jitter).start()
+        self.driver = FakeERPDriver(self.screen)
+        self.coords = self.screen.targets()
+
+    def __call__(self, waits, pause):
+        self.screen.reset()
+        self.driver.pause = pause
+        runner = CopyRunner(self.driver, self.coords, waits, log=_quiet, **self.settings)
+        runner.setup(self.ref_date)
+        for date in self.dates:
+            runner.process_date(date)
+        # 마지막 처리 반영 대기 후 결과 확인
+        time.sleep(max(self.screen.latency.values()) * 1.5 + 0.1)
+        state = self.screen.snapshot()
+        expected = {(d, self.ref_date) for d in self.dates}
+        done = {(d, r) for _, d, r in state["records"]}
+        return expected <= done and not state["errors"]
+
+    def close(self):
+        self.screen.stop()
+
+
+class SupervisedTrial:
+    """Runs candidate timings on the real desktop; a person judges each run."""
+
+    def __init__(self, dates, ref_date, coords, settings=None):
+        import pyautogui
+
+        from tnl_driver import PyAutoGUIDriver
+
+        self.dates = dates
+        self.ref_date = ref_date
+        self.coords = coords
+        self.settings = settings or {}
+        self.driver = PyAutoGUIDriver(pyautogui)
+
+    def __call__(self, waits, pause):
+        settles = ", ".join(f"{k}={v['settle']:.2f}" for k, v in waits.items())
+        input(f"\n시도: pause={pause:.2f}, {settles}\nERP 화면을 준비하고 Enter 를 누르세요...")
+        time.sleep(2)
+        self.driver.pause = pause
+        runner = CopyRunner(self.driver, self.coords, waits, log=_quiet, **self.settings)
+        runner.setup(self.ref_date)
+        for date in self.dates:
+            runner.process_date(date)
+        answer = input("모든 날짜가 정상 복사되었습니까? [y/N] ")
+        return answer.strip().lower() == "y"
+
+    def close(self):
+        pass
+
+
+def _quiet(message, level="INFO"):
+    pass
+
+
+def search_min(passes, lo, hi, resolution):
+    """Smallest value in [lo, hi] for which ``passes`` holds (hi assumed to pass)."""
+    if passes(lo):
+        return lo
+    while hi - lo > resolution:
+        mid = (lo + hi) / 2
+        if passes(mid):
+            hi = mid
+        else:
+            lo = mid
+    return hi
+
+
+def tune(trial, waits=None, pause=0.5, resolution=0.02, margin=0.25, min_margin=0.05,
+         repeats=1, report=print):
+    """Binary-search each settle (and the input pause) down to its minimum.
+
+    Returns a profile dict {"waits", "pause", "margin"} with the safety
+    margin applied, or raises RuntimeError when the starting timings fail.
+    """
+    best = {}
+    for step in TUNABLE_WAITS:
+        timeout, settle = wait_settings(waits, step)
+        best[step] = {"timeout": timeout, "settle": settle}
+    best_pause = pause
+
+    def run(candidate, candidate_pause):
+        return all(trial(candidate, candidate_pause) for _ in range(repeats))
+
+    if not run(best, best_pause):
+        raise RuntimeError("현재 대기 설정으로도 검증에 실패했습니다. 기준값을 늘리세요.")
+
+    for step in TUNABLE_WAITS:
+        def passes(value, step=step):
+            candidate = {k: dict(v) for k, v in best.items()}
+            candidate[step]["settle"] = value
+            return run(candidate, best_pause)
+
+        best[step]["settle"] = search_min(passes, 0.0, best[step]["settle"], resolution)
+        report(f"  {step:<12} settle -> {best[step]['settle']:.3f}s")
+
+    best_pause = search_min(lambda value: run(best, value), 0.0, best_pause, resolution)
+    report(f"  {'pause':<12}        -> {best_pause:.3f}s")
+
+    # 안전 여유: 측정값 × (1 + margin) 과 측정값 + min_margin 중 큰 값
+    def padded(value):
+        return round(max(value * (1 + margin), value + min_margin), 3)
+
+    profile = {
+        "waits": {step: {"timeout": cfg["timeout"],
+                         "settle": min(padded(cfg["settle"]), cfg["timeout"])}
+                  for step, cfg in best.items()},
+        "pause": padded(best_pause),
+        "margin": margin,
+    }
+    if not run(profile["waits"], profile["pause"]):
+        raise RuntimeError("여유를 더한 최종 설정이 검증에 실패했습니다.")
+    return profile
+
+
+def save_profile(config_path, name, profile, activate=False):
+    """Store ``profile`` under 'timing_profiles'[name] in the config file."""
+    config = {}
+    if os.path.exists(config_path):
+        with open(config_path, "r", encoding="utf-8") as f:
+            config = json.load(f)
+    config.setdefault("timing_profiles", {})[name] = profile
+    if activate:
+        config["timing_profile"] = name
+    tmp = config_path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(config, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, config_path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="T&L 단계별 대기 시간 자동 조정")
+    parser.add_argument("--profile", required=True, help="저장할 타이밍 프로필 이름")
+    parser.add_argument("--config", default=CONFIG_PATH, help="설정 파일 (tnlcopy_config.json)")
+    parser.add_argument("--supervised", action="store_true", help="실제 ERP 에서 감독 모드로 측정")
+    parser.add_argument("--dates", nargs="+", default=["2025-08-04", "2025-08-05"],
+                        help="시도마다 처리할 날짜")
+    parser.add_argument("--ref-date", default="2025-08-01", help="복사 기준일자")
+    parser.add_argument("--pause", type=float, default=0.5, help="입력 동작 대기 시작값")
+    parser.add_argument("--margin", type=float, default=0.25, help="안전 여유 비율")
+    parser.add_argument("--resolution", type=float, default=0.02, help="탐색 정밀도(초)")
+    parser.add_argument("--repeats", type=int, default=1, help="후보마다 반복 검증 횟수")
+    parser.add_argument("--query", type=float, default=0.8, help="모의 화면 조회 지연(초)")
+    parser.add_argument("--popup", type=float, default=0.2, help="모의 화면 팝업 지연(초)")
+    parser.add_argument("--commit", type=float, default=0.3, help="모의 화면 처리 지연(초)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="모의 화면 지연 변동 비율")
+    parser.add_argument("--activate", action="store_true", help="저장 후 기본 프로필로 선택")
+    args = parser.parse_args(argv)
+
+    config = {}
+    if os.path.exists(args.config):
+        with open(args.config, "r", encoding="utf-8") as f:
+            config = json.load(f)
+
+    if args.supervised:
+        coords = {k: tuple(v) for k, v in config.get("coords", {}).items()}
+        if not coords:
+            parser.error("설정 파일에 좌표가 없습니다. 매크로에서 좌표를 먼저 설정하세요.")
+        trial = SupervisedTrial(args.dates, args.ref_date, coords, runner_settings(config))
+    else:
+        latency = {"query": args.query, "popup": args.popup, "commit": args.commit}
+        trial = SimulatedTrial(args.dates, args.ref_date, latency, args.jitter,
+                               runner_settings(config))
+
+    print(f"타이밍 프로필 '{args.profile}' 측정을 시작합니다.")
+    try:
+        profile = tune(trial, config.get("waits"), args.pause, args.resolution,
+                       args.margin, repeats=args.repeats)
+    except RuntimeError as e:
+        print(f"측정 실패: {e}")
+        return 1
+    finally:
+        trial.close()
+
+    profile["mode"] = "supervised" if args.supervised else "simulated"
+    profile["measured_at"] = datetime.now().isoformat(timespec="seconds")
+    save_profile(args.config, args.profile, profile, args.activate)
+    print(f"'{args.profile}' 프로필을 {args.config} 에 저장했습니다.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
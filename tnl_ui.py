@@ -0,0 +1,93 @@
+"""작업 스레드 → Tk 화면 갱신 채널과 줄 수 제한 로그 창.
+
+Tk 위젯은 메인 스레드에서만 만져야 하므로, 작업 스레드(와 단축키 후킹
+스레드)는 화면 갱신을 UIChannel 에 넣기만 하고 Tk 메인 루프가 일정한
+간격(기본 50ms)마다 한꺼번에 처리한다.
+
+    - key 를 준 갱신(진행률 등)은 한 프레임 안에서 마지막 값만 반영
+    - 로그 줄은 프레임마다 모아서 한 번에 삽입
+    - 로그 창은 최근 N 줄만 유지 (전체 기록은 tnlcopy.log 에만)
+"""
+
+import collections
+import threading
+
+FRAME_INTERVAL_MS = 50
+LOG_LINES = 500
+
+
+class BoundedLog:
+    """Keeps a Tk Text widget at the last ``max_lines`` lines."""
+
+    def __init__(self, text, max_lines=LOG_LINES):
+        self.text = text
+        self.max_lines = max_lines
+
+    def append(self, lines):
+        if not lines:
+            return
+        self.text.insert("end", "".join(lines))
+        # 마지막 줄 뒤의 빈 줄을 빼고 센 줄 수
+        count = int(self.text.index("end-1c").split(".")[0]) - 1
+        excess = count - self.max_lines
+        if excess > 0:
+            self.text.delete("1.0", f"{excess + 1}.0")
+        self.text.see("end")
+
+
+class UIChannel:
+    """Queue of UI updates drained by the Tk main loop at a fixed rate."""
+
+    def __init__(self, root, log_view=None, interval_ms=FRAME_INTERVAL_MS, log_lines=LOG_LINES):
+        self.root = root
+        self.log_view = log_view
+        self.interval_ms = interval_ms
+        self._lock = threading.Lock()
+        self._calls = collections.deque()
+        self._latest = {}
+        # 화면이 밀려도 최근 log_lines 줄만 쌓아 두므로 메모리가 일정하다
+        self._lines = collections.deque(maxlen=log_lines)
+        self._job = None
+
+    def start(self):
+        if self._job is None:
+            self._job = self.root.after(self.interval_ms, self._drain)
+        return self
+
+    def stop(self):
+        if self._job is not None:
+            self.root.after_cancel(self._job)
+            self._job = None
+
+    def post(self, fn, *args, key=None, **kwargs):
+        """Run ``fn(*args, **kwargs)`` on the Tk thread at the next frame.
+
+        Calls with the same ``key`` are coalesced: only the newest one
+        runs, in the position of the first.
+        """
+        with self._lock:
+            if key is None:
+                self._calls.append((fn, args, kwargs))
+                return
+            if key not in self._latest:
+                self._calls.append(key)
+            self._latest[key] = (fn, args, kwargs)
+
+    def log(self, line):
+        with self._lock:
+            self._lines.append(line)
+
+    def _drain(self):
+        # 다음 프레임을 먼저 예약해 둔다: 게시된 함수가 모달 대화상자처럼
+        # 오래 걸려도(중첩 이벤트 루프) 그동안의 갱신이 계속 반영된다
+        self._job = self.root.after(self.interval_ms, self._drain)
+        with self._lock:
+            calls, self._calls = self._calls, collections.deque()
+            latest, self._latest = self._latest, {}
+            lines = list(self._lines)
+            self._lines.clear()
+        if self.log_view is not None:
+            self.log_view.append(lines)
+        for call in calls:
+            fn, args, kwargs = latest[call] if isinstance(call, str) else call
+            fn(*args, **kwargs)
@@ -0,0 +1,178 @@
+"""조건 기반 대기 엔진.
+
+고정된 time.sleep 대신 화면에서 관찰 가능한 조건(결과 그리드 갱신 완료,
+확인 팝업 출현/소멸 등)이 충족되는 즉시 다음 단계로 넘어간다.
+모든 대기는 timeout(최대 대기)과 settle(조건이 연속으로 유지되어야 하는
+최소 시간)을 가진다.
+
+조회 직후 그리드는 결과 대신 "조회 중..." 문구나 빈 그리드를 잠시 보여 준다.
+이 화면도 기준 화면과 다르고 settle 동안 멈춰 있을 수 있으므로, 감시 영역을
+캡처한 로딩 화면 이미지를 설정의 wait_regions.loading 에 등록해 두면 그 화면과
+같은 동안에는 갱신 완료로 보지 않는다:
+
+    "wait_regions": {"grid": [100, 300, 600, 240],
+                     "loading": {"grid": ["grid_loading.png", "grid_blank.png"]}}
+"""
+
+import time
+
+# 단계별 기본 대기 설정 (초)
+#   timeout: 조건이 충족되지 않아도 다음 단계로 넘어가는 최대 시간
+#   settle : 조건이 연속으로 유지되어야 하는 최소 시간
+DEFAULT_WAITS = {
+    "focus": {"timeout": 0.5, "settle": 0.2},        # 입력란 클릭 후 포커스 이동
+    "entry": {"timeout": 0.5, "settle": 0.2},        # 입력 완료 후 값 반영
+    "query": {"timeout": 6.0, "settle": 0.3},        # 조회 결과 그리드 갱신
+    "select": {"timeout": 0.5, "settle": 0.2},       # 사원 선택
+    "popup_open": {"timeout": 3.0, "settle": 0.15},  # 확인 팝업 출현
+    "popup_close": {"timeout": 3.0, "settle": 0.15}, # 확인 팝업 소멸
+}
+
+# 영역 비교 임계값 (32x32 그레이스케일 평균 절대 차이, 0~255)
+CHANGE_THRESHOLD = 3.0   # 이 값보다 크면 "변화함"
+STABLE_THRESHOLD = 1.0   # 이 값 이하이면 "안정됨"
+
+POLL_INTERVAL = 0.05
+
+
+def wait_until(condition, timeout=5.0, settle=0.0, interval=POLL_INTERVAL,
+               clock=time.monotonic, sleep=time.sleep):
+    """Poll ``condition`` until it has held continuously for ``settle`` seconds.
+
+    Returns True as soon as the condition is satisfied, or False once
+    ``timeout`` elapses. A condition of None only waits out ``settle``.
+    """
+    if condition is None:
+        condition = _always
+    start = clock()
+    deadline = start + max(timeout, settle)
+    held_since = None
+    while True:
+        now = clock()
+        if condition():
+            if held_since is None:
+                held_since = now
+            if now - held_since >= settle:
+                return True
+        else:
+            held_since = None
+        if now >= deadline:
+            return False
+        sleep(interval)
+
+
+def _always():
+    return True
+
+
+def wait_settings(waits, step):
+    """Return (timeout, settle) for ``step``, falling back to the defaults."""
+    cfg = dict(DEFAULT_WAITS.get(step, {"timeout": 1.0, "settle": 0.0}))
+    cfg.update((waits or {}).get(step, {}))
+    return float(cfg["timeout"]), float(cfg["settle"])
+
+
+def resolve_timing(waits, profiles, name):
+    """Overlay the named timing profile on ``waits``.
+
+    Returns (waits, pause); pause is None when the profile does not set it.
+    """
+    merged = {step: dict(cfg) for step, cfg in (waits or {}).items()}
+    profile = (profiles or {}).get(name) if name else None
+    if not profile:
+        return merged, None
+    for step, cfg in profile.get("waits", {}).items():
+        merged.setdefault(step, {}).update(cfg)
+    return merged, profile.get("pause")
+
+
+def region_signature(image, size=(32, 32)):
+    """Downscaled grayscale bytes used to compare two captures cheaply."""
+    return image.convert("L").resize(size).tobytes()
+
+
+def image_signature(path):
+    """Signature of a saved capture (e.g. a loading placeholder)."""
+    from PIL import Image
+
+    with Image.open(path) as image:
+        return region_signature(image)
+
+
+def signature_distance(a, b):
+    """Mean absolute difference between two signatures (0~255)."""
+    if a is None or b is None or len(a) != len(b):
+        return 255.0
+    return sum(abs(x - y) for x, y in zip(a, b)) / len(a)
+
+
+def region_around(xy, width, height, dx=0, dy=0):
+    """(left, top, width, height) box centred on ``xy`` shifted by dx/dy."""
+    x, y = xy
+    return (int(x - width // 2 + dx), int(y - height // 2 + dy), int(width), int(height))
+
+
+def bounding_region(points, pad=0):
+    """Smallest (left, top, width, height) box containing every point."""
+    xs = [p[0] for p in points]
+    ys = [p[1] for p in points]
+    left, top = min(xs) - pad, min(ys) - pad
+    return (int(left), int(top), int(max(xs) + pad - left), int(max(ys) + pad - top))
+
+
+def clip_region(region, bounds):
+    """Part of ``region`` inside ``bounds``; ``bounds`` itself if they do not overlap."""
+    left, top = max(region[0], bounds[0]), max(region[1], bounds[1])
+    right = min(region[0] + region[2], bounds[0] + bounds[2])
+    bottom = min(region[1] + region[3], bounds[1] + bounds[3])
+    if right <= left or bottom <= top:
+        return tuple(int(v) for v in bounds)
+    return (int(left), int(top), int(right - left), int(bottom - top))
+
+
+class RegionProbe:
+    """Samples one screen region and reports change and stability.
+
+    Typical use: ``rebase()`` before an action, then wait on
+    ``settled_after_change`` so the step moves on once the region has
+    changed from the baseline and stopped changing. A frame matching one
+    of the ``loading`` signatures never counts as settled.
+    """
+
+    def __init__(self, grab, region, change_threshold=CHANGE_THRESHOLD,
+                 stable_threshold=STABLE_THRESHOLD, loading=None):
+        self.grab = grab
+        self.region = tuple(region)
+        self.loading = list(loading or [])
+        self.change_threshold = change_threshold
+        self.stable_threshold = stable_threshold
+        self.base = None
+        self.last = None
+
+    def sample(self):
+        return region_signature(self.grab(self.region))
+
+    def rebase(self):
+        self.base = self.sample()
+        self.last = self.base
+        return self.base
+
+    def changed(self):
+        sig = self.sample()
+        self.last = sig
+        return signature_distance(sig, self.base) > self.change_threshold
+
+    def stable(self):
+        sig = self.sample()
+        prev, self.last = self.last, sig
+        return signature_distance(prev, sig) <= self.stable_threshold
+
+    def settled_after_change(self):
+        sig = self.sample()
+        prev, self.last = self.last, sig
+        if signature_distance(sig, self.base) <= self.change_threshold:
+            return False
+        # 로딩 화면(조회 중 문구, 빈 그리드)은 바뀌었어도 아직 결과가 아니다
+        if any(signature_distance(sig, ref) <= self.change_threshold for ref in self.loading):
+            return False
+        return signature_distance(prev, sig) <= self.stable_threshold
@@ -0,0 +1,174 @@
+"""선언적 작업 순서 정의와 실행 계획 컴파일러.
+
+날짜 하나를 처리하는 순서를 데이터(단계 목록)로 정의하고, 이를 실행 계획
+(한 번만 실행하는 setup + 날짜마다 반복하는 loop)으로 컴파일한다.
+컴파일 과정에서:
+
+    - 날짜와 무관한 단계(once, 또는 {date} 가 없는 enter)는 루프 밖으로 올린다
+    - 바로 뒤(또는 앞)에서 같은 입력란을 다시 포커스하는 focus 클릭은 제거한다
+    - 연속된 sleep 은 하나로 합치고, 앞 단계의 후행 대기(after)로 흡수한다
+
+단계 형식:
+
+    {"step": "query", "op": "click", "target": "조회 버튼",
+     "wait": "query", "probe": "grid", "timeout": 6.0, "settle": 0.3}
+
+    op     : enter | click | focus | press | sleep
+    step   : 단계 이름 (타이밍/트레이스 집계용)
+    target : 좌표 이름 (enter, click, focus)
+    text   : enter 로 입력할 값, {date} {ref_date} 치환
+    key    : press 할 키
+    wait   : 동작 후 대기 이름 (tnl_wait.DEFAULT_WAITS), probe 로 화면 변화 감시
+    once   : True 이면 루프 밖에서 한 번만 실행
+    retries    : 단계 확인(대기 조건) 실패 시 재시도 횟수 (CopyRunner verify;
+                 press 는 기본 0 - 같은 키를 다시 보내면 포커스된 엉뚱한 곳에 간다)
+    retry_from : 재시도할 때 다시 시작할 앞 단계 이름 (생략 시 그 단계만)
+
+계획 확인:
+
+    python tnl_workflow.py [workflow.json]
+"""
+
+import json
+import sys
+
+OPS = ("enter", "click", "focus", "press", "sleep")
+
+# tnlcopy6 / streamlit_app 의 날짜별 작업 순서
+DEFAULT_WORKFLOW = [
+    {"step": "ref_date_entry", "op": "enter", "target": "복사 기준일자 입력란", "text": "{ref_date}"},
+    {"step": "date_entry", "op": "enter", "target": "일자 입력란", "text": "{date}"},
+    {"step": "query", "op": "click", "target": "조회 버튼", "wait": "query", "probe": "grid",
+     "retries": 2},
+    {"step": "select", "op": "click", "target": "사원 선택란", "wait": "select"},
+    # 팝업이 안 뜨면 사원 선택이 안 된 것일 수 있으므로 선택부터 다시
+    {"step": "ref_copy", "op": "click", "target": "이전실적복사 버튼", "wait": "popup_open", "probe": "popup",
+     "retry_from": "select"},
+    # 확인(enter)과 복사 클릭은 다시 보내면 엉뚱한 곳을 확인하거나 두 번 복사할 수
+    # 있으므로 재시도하지 않고 바로 실패 처리(화면 복구)한다
+    {"step": "confirm", "op": "press", "key": "enter", "wait": "popup_close", "probe": "popup",
+     "retries": 0},
+    {"step": "copy", "op": "click", "target": "복사 버튼", "wait": "popup_open", "probe": "popup",
+     "retries": 0},
+    {"step": "confirm", "op": "press", "key": "enter", "wait": "popup_close", "probe": "popup",
+     "retries": 0},
+]
+
+
+class Plan:
+    """Compiled workflow: ``setup`` runs once, ``loop`` once per date."""
+
+    def __init__(self, setup, loop):
+        self.setup = setup
+        self.loop = loop
+
+    def describe(self):
+        lines = []
+        for section, ops in (("setup", self.setup), ("loop", self.loop)):
+            lines.append(f"[{section}]")
+            for op in ops:
+                detail = op.get("target") or op.get("key") or op.get("seconds") or ""
+                extra = []
+                if op.get("wait"):
+                    extra.append(f"wait={op['wait']}")
+                if op.get("after"):
+                    extra.append(f"after={op['after']:g}s")
+                lines.append(f"  {op['step']:<16}{op['op']:<7}{detail!s:<18}{' '.join(extra)}")
+        return "\n".join(lines)
+
+
+def normalize_step(raw):
+    op = dict(raw)
+    kind = op.get("op")
+    if kind not in OPS:
+        raise ValueError(f"알 수 없는 동작: {kind!r}")
+    if kind in ("enter", "click", "focus") and not op.get("target"):
+        raise ValueError(f"{kind} 단계에 target 이 없습니다: {raw}")
+    if kind == "enter" and "text" not in op:
+        raise ValueError(f"enter 단계에 text 가 없습니다: {raw}")
+    if kind == "press" and not op.get("key"):
+        raise ValueError(f"press 단계에 key 가 없습니다: {raw}")
+    if kind == "sleep":
+        op["seconds"] = float(op.get("seconds", 0.0))
+    if "retries" in op:
+        op["retries"] = int(op["retries"])
+        if op["retries"] < 0:
+            raise ValueError(f"retries 는 0 이상이어야 합니다: {raw}")
+    op.setdefault("step", kind)
+    op.setdefault("after", 0.0)
+    return op
+
+
+def is_invariant(op):
+    if op.get("once"):
+        return True
+    return op["op"] == "enter" and "{date}" not in op["text"]
+
+
+def fold_sleeps(ops):
+    """Merge adjacent sleeps and fold them into the preceding op's ``after``."""
+    out = []
+    for op in ops:
+        if op["op"] == "sleep":
+            if op["seconds"] <= 0:
+                continue
+            prev = out[-1] if out else None
+            if prev is not None and prev["op"] == "sleep" and prev.get("once") == op.get("once"):
+                out[-1] = dict(prev, seconds=prev["seconds"] + op["seconds"])
+                continue
+            if prev is not None and not op.get("once") and not prev.get("once"):
+                out[-1] = dict(prev, after=prev["after"] + op["seconds"])
+                continue
+        out.append(op)
+    return out
+
+
+def drop_redundant_focus(ops):
+    """Remove focus clicks made redundant by a neighbouring focus/enter."""
+    out = []
+    for i, op in enumerate(ops):
+        if op["op"] == "focus":
+            nxt = ops[i + 1] if i + 1 < len(ops) else None
+            prev = out[-1] if out else None
+            if nxt is not None and nxt["op"] in ("enter", "focus") and nxt["target"] == op["target"]:
+                continue
+            if (prev is not None and prev["op"] in ("enter", "focus")
+                    and prev["target"] == op["target"] and not prev.get("wait")):
+                continue
+        out.append(op)
+    return out
+
+
+def compile_workflow(steps):
+    """Compile a list of step dicts into a Plan."""
+    ops = drop_redundant_focus(fold_sleeps([normalize_step(s) for s in steps]))
+    setup, loop = [], []
+    for op in ops:
+        (setup if is_invariant(op) else loop).append(op)
+    plan = Plan(drop_redundant_focus(setup), drop_redundant_focus(loop))
+    for section in (plan.setup, plan.loop):
+        check_retry_from(section)
+    return plan
+
+
+def check_retry_from(ops):
+    """retry_from must name an earlier step of the same section."""
+    seen = set()
+    for op in ops:
+        target = op.get("retry_from")
+        if target and target != op["step"] and target not in seen:
+            raise ValueError(f"{op['step']} 의 retry_from 단계가 앞에 없습니다: {target!r}")
+        seen.add(op["step"])
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    steps = DEFAULT_WORKFLOW
+    if argv:
+        with open(argv[0], "r", encoding="utf-8") as f:
+            steps = json.load(f)
+    print(compile_workflow(steps).describe())
+
+
+if __name__ == "__main__":
+    main()
@@ -6,8 +6,34 @@ from tkinter import simpledialog, messagebox
 import json
 import os
 
+from tnl_driver import PyAutoGUIDriver
+from tnl_engine import CopyRunner
+
 CONFIG_PATH = os.path.join(os.path.expanduser("~"), "Desktop", "tnlcopy_coords.json")
 
+COORD_LABELS = {
+    "date_xy": "일자 입력란",
+    "serch_xy": "조회 버튼",
+    "ref_date_xy": "복사 기준일자 입력란",
+    "select_xy": "사원 선택란",
+    "ref_copy_xy": "이전실적복사 버튼",
+    "copy_xy": "복사 버튼",
+}
+
+# 날짜별 작업 순서 (tnl_workflow 형식). 이 버전은 이전실적복사 후 팝업 확인 없이
+# 바로 복사를 누른다.
+WORKFLOW = [
+    {"op": "sleep", "seconds": 2, "once": True},
+    {"step": "ref_date_entry", "op": "enter", "target": "복사 기준일자 입력란", "text": "{ref_date}"},
+    {"step": "date_entry", "op": "enter", "target": "일자 입력란", "text": "{date}"},
+    {"step": "query", "op": "click", "target": "조회 버튼", "wait": "query", "probe": "grid"},
+    {"step": "select", "op": "click", "target": "사원 선택란", "wait": "select"},
+    {"step": "ref_copy", "op": "click", "target": "이전실적복사 버튼"},
+    {"op": "sleep", "seconds": 1},
+    {"step": "copy", "op": "click", "target": "복사 버튼", "wait": "popup_open", "probe": "popup"},
+    {"step": "confirm", "op": "press", "key": "enter", "wait": "popup_close", "probe": "popup"},
+]
+
 def save_coords(coords):
     with open(CONFIG_PATH, "w", encoding="utf-8") as f:
         json.dump(coords, f, ensure_ascii=False, indent=2)
@@ -93,47 +119,11 @@ if __name__ == "__main__":
     date_inputs, ref_date = get_user_input()
     dates = parse_dates(date_inputs)
 
-    date_xy = tuple(coords["date_xy"])
-    serch_xy = tuple(coords["serch_xy"])
-    ref_date_xy = tuple(coords["ref_date_xy"])
-    select_xy = tuple(coords["select_xy"])
-    ref_copy_xy = tuple(coords["ref_copy_xy"])
-    copy_xy = tuple(coords["copy_xy"])
-
-    # 복사 기준일자 입력 (한 번만)
-    time.sleep(2)
-    pyautogui.click(*ref_date_xy)
-    time.sleep(2)
-    pyautogui.hotkey('ctrl', 'a')
-    time.sleep(1)
-    pyautogui.press('delete')
-    time.sleep(1)
-    for char in ref_date:
-        pyautogui.press(char)
-        time.sleep(0.1)
-    time.sleep(1)
-
+    runner = CopyRunner(PyAutoGUIDriver(pyautogui),
+                        {COORD_LABELS[key]: tuple(xy) for key, xy in coords.items()},
+                        workflow=WORKFLOW)
+    runner.setup(ref_date)
 
     # 날짜별 반복 작업
     for date in dates:
-        pyautogui.click(*date_xy)
-        time.sleep(2)
-        pyautogui.hotkey('ctrl', 'a')
-        time.sleep(1)
-        pyautogui.press('delete')
-        time.sleep(1)
-        for char in date:
-            pyautogui.press(char)
-            time.sleep(0.1)
-        time.sleep(1)
-
-        pyautogui.click(*serch_xy)
-        time.sleep(2)
-        pyautogui.click(*select_xy)
-        time.sleep(1)
-        pyautogui.click(*ref_copy_xy)
-        time.sleep(1)
-        pyautogui.click(*copy_xy)
-        time.sleep(1)
-        pyautogui.press('enter')
-        time.sleep(1)
\ No newline at end of file
+        runner.process_date(date)